@@ -3,15 +3,42 @@ Backend para REFUGIO CRIPTO Dashboard
 Usa las MISMAS APIs que el bot para obtener precios en tiempo real
 """
 
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
 import sqlite3
 from datetime import datetime, timedelta
 import os
 import requests
 import json
+import hashlib
+import zlib
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from core.price_cache import QuoteCache
+from core.ticker_snapshot import TickerSnapshotStore, LOOKUP_OK, LOOKUP_NOT_LISTED
+from core.latency_tracker import LatencyTracker
+from core.hedging import HedgeBudget, hedged_call
+from core.http_sessions import get_session_registry, http_get
+from core.quote_refresher import QuoteTable, QuoteRefresher
+from core.async_price_engine import AsyncPriceEngine, AsyncEngineRunner, aiohttp
+from core.rate_limiter import get_rate_limiter
+from core.circuit_breaker import get_circuit_breakers, is_breaker_failure
+from core.instrument_index import get_instrument_index
+from core.api_balancer import get_api_balancer
+from core.price_extractors import compile_price_paths, decode_json
+from core.signal_stream import StreamHub
+from core.signal_versions import SignalVersionTracker
+from core.compression import IDENTITY, ResponseCompressor
+from core.db_connection import get_connection_pool
+from core.db_schema import signal_columns
+from core.signal_pages import (
+    PageQueryError, build_page_query, decode_cursor, encode_cursor, parse_filters, parse_limit
+)
+from core.wire_format import (
+    FORMAT_ROWS, OPERATION_FIELDS, WireFormatError,
+    encode_operations, negotiate_format, parse_fields
+)
 
 app = Flask(__name__)
 
@@ -46,10 +73,21 @@ def add_cors_headers(response):
 
 DATABASE_PATH = 'signals.db'
 
-# Caché de precios
-PRICE_CACHE = {}
-CACHE_EXPIRY = {}
+# Caché de precios (TTL + LRU + single-flight + stale-while-revalidate)
 CACHE_TTL = 30  # 30 segundos
+CACHE_STALE_TTL = 120  # Precio viejo servido mientras se refresca en segundo plano
+CACHE_MAX_SYMBOLS = 512
+PRICE_CACHE = QuoteCache(ttl=CACHE_TTL, stale_ttl=CACHE_STALE_TTL, max_entries=CACHE_MAX_SYMBOLS)
+
+# Resolución de precios en paralelo
+PRICE_WORKERS = 8  # Búsquedas simultáneas de precio
+PRICE_DEADLINE = 8  # Segundos máximos por petición para resolver todos los precios
+PRICE_EXECUTOR = ThreadPoolExecutor(max_workers=PRICE_WORKERS, thread_name_prefix='price')
+
+# Sesiones keep-alive por exchange: pool del tamaño de la concurrencia máxima
+HTTP_SESSIONS = get_session_registry()
+HTTP_SESSIONS.configure(pool_size=PRICE_WORKERS * 2)
+PREWARM_CONNECTIONS = os.environ.get('PREWARM_CONNECTIONS', '0') == '1'
 
 # Configuración de APIs (mismas que el bot)
 APIS_CONFIG = {
@@ -58,164 +96,431 @@ APIS_CONFIG = {
         'url_template': 'https://fapi.binance.com/fapi/v1/ticker/price?symbol={symbol}',
         'format_symbol': lambda s: s.replace('/USDT:USDT', 'USDT').replace('/', ''),
         'price_path': 'price',
-        'timeout': 3
+        'timeout': 3,
+        'rate_limit': 1200,  # req/min
+        'bulk_url': 'https://fapi.binance.com/fapi/v1/ticker/price',
+        'bulk_list_path': '',
+        'bulk_symbol_key': 'symbol',
+        'bulk_price_key': 'price',
+        'bulk_weight': 2
     },
     'mexc_futures': {
         'name': 'MEXC Futures',
         'url_template': 'https://contract.mexc.com/api/v1/contract/ticker?symbol={symbol}',
         'format_symbol': lambda s: s.replace('/USDT:USDT', '_USDT').replace('/', '_'),
         'price_path': 'data.0.lastPrice',
-        'timeout': 5
+        'timeout': 5,
+        'rate_limit': 600,  # req/min
+        'bulk_url': 'https://contract.mexc.com/api/v1/contract/ticker',
+        'bulk_list_path': 'data',
+        'bulk_symbol_key': 'symbol',
+        'bulk_price_key': 'lastPrice'
     },
     'gate_futures': {
         'name': 'Gate.io Futures',
         'url_template': 'https://api.gateio.ws/api/v4/futures/usdt/tickers?contract={symbol}',
         'format_symbol': lambda s: s.replace('/USDT:USDT', '_USDT').replace('/', '_'),
         'price_path': 'last_price',
-        'timeout': 5
+        'timeout': 5,
+        'rate_limit': 600,  # req/min
+        'bulk_url': 'https://api.gateio.ws/api/v4/futures/usdt/tickers',
+        'bulk_list_path': '',
+        'bulk_symbol_key': 'contract',
+        'bulk_price_key': 'last'
     },
     'okx_futures': {
         'name': 'OKX Futures',
         'url_template': 'https://www.okx.com/api/v5/market/ticker?instId={symbol}',
-        'format_symbol': lambda s: s.replace('/USDT:USDT', '-USDT').replace('/', '-'),
+        'format_symbol': lambda s: s.replace('/USDT:USDT', '-USDT-SWAP').replace('/', '-'),
         'price_path': 'data.0.last',
-        'timeout': 4
+        'timeout': 4,
+        'rate_limit': 600,  # req/min
+        'bulk_url': 'https://www.okx.com/api/v5/market/tickers?instType=SWAP',
+        'bulk_list_path': 'data',
+        'bulk_symbol_key': 'instId',
+        'bulk_price_key': 'last'
     },
     'kucoin_futures': {
         'name': 'KuCoin Futures',
         'url_template': 'https://api-futures.kucoin.com/api/v1/ticker?symbol={symbol}',
         'format_symbol': lambda s: s.split('/')[0] + 'USDTM',
         'price_path': 'data.price',
-        'timeout': 5
+        'timeout': 5,
+        'rate_limit': 600,  # req/min
+        'bulk_url': 'https://api-futures.kucoin.com/api/v1/allTickers',
+        'bulk_list_path': 'data',
+        'bulk_symbol_key': 'symbol',
+        'bulk_price_key': 'price'
     },
     'bybit_futures': {
         'name': 'Bybit Futures',
         'url_template': 'https://api.bybit.com/v5/market/tickers?category=linear&symbol={symbol}',
         'format_symbol': lambda s: s.replace('/USDT:USDT', 'USDT').replace('/', ''),
         'price_path': 'result.list.0.lastPrice',
-        'timeout': 4
+        'timeout': 4,
+        'rate_limit': 600,  # req/min
+        'bulk_url': 'https://api.bybit.com/v5/market/tickers?category=linear',
+        'bulk_list_path': 'result.list',
+        'bulk_symbol_key': 'symbol',
+        'bulk_price_key': 'lastPrice'
     }
 }
 
-# Cargar mapeo de tokens a APIs
+# price_path compilado una vez por exchange (config['extract_price'])
+compile_price_paths(APIS_CONFIG)
+
+# Rate limiting: token bucket por exchange (RATE_LIMIT_STORE=<ruta.db> lo comparte entre procesos)
+RATE_LIMITER = get_rate_limiter()
+for _api_id, _config in APIS_CONFIG.items():
+    RATE_LIMITER.register(_api_id, _config['rate_limit'])
+
+# Circuit breaker por exchange: una caída cuesta un timeout, no uno por símbolo
+BREAKERS = get_circuit_breakers()
+for _api_id, _config in APIS_CONFIG.items():
+    BREAKERS.get(_api_id, slow_call_seconds=_config['timeout'] * 0.75)
+
+# Índice de contratos listados por exchange (INSTRUMENT_INDEX_REFRESH=1 lo descarga periódicamente)
+INSTRUMENT_INDEX = get_instrument_index()
+if os.environ.get('INSTRUMENT_INDEX_REFRESH', '0') == '1':
+    INSTRUMENT_INDEX.start_auto_refresh()
+
+# Balanceador: reparte los tokens sin mapeo según capacidad (rate_limit * margen libre)
+BALANCER = get_api_balancer()
+
+def native_symbol(api_id, mexc_symbol):
+    """Símbolo nativo del exchange según el índice (o el formateador si no está indexado)"""
+    native = INSTRUMENT_INDEX.native_symbol(api_id, mexc_symbol)
+    if native is None:
+        native = APIS_CONFIG[api_id]['format_symbol'](mexc_symbol)
+    return native
+
+def admit_request(api_id, weight=1):
+    """Breaker cerrado (o prueba half-open) y tokens disponibles antes de una petición"""
+    if not BREAKERS.allow_request(api_id):
+        return False
+    if not RATE_LIMITER.try_acquire(api_id, weight):
+        BREAKERS.release_probe(api_id)  # La prueba half-open no salió: no dejarla tomada
+        return False
+    return True
+
+def release_request(api_id):
+    """Devuelve lo que tomó admit_request si la petición se canceló sin respuesta"""
+    BREAKERS.release_probe(api_id)
+    RATE_LIMITER.release(api_id)
+
+def snapshot_can_fetch(api_id):
+    """Breaker y rate limiter para la petición bulk"""
+    return admit_request(api_id, APIS_CONFIG[api_id].get('bulk_weight', 1))
+
+def snapshot_on_fetch(api_id, response, response_time):
+    """Registra la respuesta bulk en el rate limiter y el breaker"""
+    RATE_LIMITER.update_from_response(api_id, response)
+    if is_breaker_failure(response.status_code):
+        BREAKERS.record_failure(api_id)
+    else:
+        BREAKERS.record_success(api_id, response_time)
+
+# Modo snapshot: una petición bulk por exchange en lugar de una por símbolo
+SNAPSHOT_MODE = os.environ.get('PRICE_SNAPSHOT_MODE', '1') == '1'
+SNAPSHOT_TTL = 10  # segundos
+TICKER_SNAPSHOTS = TickerSnapshotStore(
+    APIS_CONFIG,
+    ttl=SNAPSHOT_TTL,
+    http_get=http_get,
+    can_fetch=snapshot_can_fetch,
+    on_fetch=snapshot_on_fetch,
+    on_error=BREAKERS.record_failure,
+    resolve_symbol=native_symbol
+)
+
+# Hedging: si la API asignada no responde en su p90, consultar la siguiente en paralelo
+HEDGE_MODE = os.environ.get('PRICE_HEDGE_MODE', '1') == '1'
+HEDGE_BUDGET_RATIO = float(os.environ.get('PRICE_HEDGE_BUDGET', '0.1'))  # Hedges por petición primaria
+HEDGE_MAX_PER_LOOKUP = 1
+HEDGE_DEFAULT_DELAY = 1.0  # segundos (hasta tener muestras de latencia)
+HEDGE_MIN_DELAY = 0.05
+HEDGE_BUDGET = HedgeBudget(ratio=HEDGE_BUDGET_RATIO, burst=5)
+HEDGE_EXECUTOR = ThreadPoolExecutor(max_workers=PRICE_WORKERS * 2, thread_name_prefix='hedge')
+LATENCY_TRACKER = LatencyTracker(track_symbols=True)
+LATENCY_REASSIGN_FACTOR = 3.0  # La API asignada pierde el primer lugar si es 3x más lenta que la mejor
+
+if PREWARM_CONNECTIONS:
+    threading.Thread(
+        target=HTTP_SESSIONS.prewarm,
+        args=([config['url_template'] for config in APIS_CONFIG.values()],),
+        daemon=True
+    ).start()
+
+# Refresher en segundo plano: /api/operations solo lee la tabla de cotizaciones
+QUOTE_REFRESHER_ENABLED = os.environ.get('QUOTE_REFRESHER', '0') == '1'
+QUOTE_REFRESH_INTERVAL = float(os.environ.get('QUOTE_REFRESH_INTERVAL', '5'))
+QUOTE_UNRESOLVED_TTL = float(os.environ.get('QUOTE_UNRESOLVED_TTL', '60'))  # Símbolos sin precio no se repiten
+
+# Motor asyncio (opcional, requiere aiohttp) para /api/async/*
+ASYNC_ENGINE = None
+ASYNC_ENGINE_RUNNER = None
+
+def async_snapshot_lookup(api_id, mexc_symbol):
+    """(resuelto, precio) desde el ticker bulk, igual que fetch_price_via"""
+    if not (SNAPSHOT_MODE and TICKER_SNAPSHOTS.supports(api_id)):
+        return False, None
+    price, status = TICKER_SNAPSHOTS.lookup(api_id, mexc_symbol)
+    if status == LOOKUP_OK:
+        return True, price
+    return status == LOOKUP_NOT_LISTED, None
+
+def async_on_response(api_id, response, response_time, mexc_symbol):
+    """Respuesta del motor asyncio: rate limiter, breaker y latencias como fetch_price_from_api"""
+    failed = is_breaker_failure(response.status)
+    LATENCY_TRACKER.record(api_id, response_time, symbol=mexc_symbol.split('/')[0], ok=not failed)
+    RATE_LIMITER.update_from_response(api_id, response)
+    if failed:
+        BREAKERS.record_failure(api_id)
+    else:
+        BREAKERS.record_success(api_id, response_time)
+
+def async_on_error(api_id, mexc_symbol, timed_out):
+    symbol = mexc_symbol.split('/')[0]
+    if timed_out:
+        LATENCY_TRACKER.record(api_id, APIS_CONFIG[api_id]['timeout'], symbol=symbol, ok=False)
+    else:
+        LATENCY_TRACKER.record_error(api_id, symbol=symbol)
+    BREAKERS.record_failure(api_id)
+
+if aiohttp is not None:
+    ASYNC_ENGINE = AsyncPriceEngine(
+        APIS_CONFIG,
+        api_order=lambda mexc_symbol: get_apis_to_try(mexc_symbol.split('/')[0]),
+        resolve_symbol=native_symbol,
+        snapshot_lookup=async_snapshot_lookup,
+        admit=admit_request,
+        release=release_request,
+        on_response=async_on_response,
+        on_error=async_on_error
+    )
+    ASYNC_ENGINE_RUNNER = AsyncEngineRunner(ASYNC_ENGINE)
+
+# Mapeo de tokens a APIs (se recarga en caliente si el archivo cambia)
+TOKEN_API_MAPPING_PATH = 'token_api_mapping.json'
+TOKEN_API_MAPPING_CHECK_INTERVAL = 5  # segundos entre comprobaciones del archivo
 TOKEN_API_MAPPING = {}
-try:
-    if os.path.exists('token_api_mapping.json'):
-        with open('token_api_mapping.json', 'r') as f:
+_token_mapping_mtime = None
+_token_mapping_checked = 0.0
+
+def load_token_api_mapping():
+    """Carga el mapeo de tokens si el archivo cambió desde la última carga"""
+    global TOKEN_API_MAPPING, _token_mapping_mtime
+    try:
+        mtime = os.path.getmtime(TOKEN_API_MAPPING_PATH)
+    except OSError:
+        if _token_mapping_mtime is None:
+            print(f"⚠️  {TOKEN_API_MAPPING_PATH} no encontrado")
+        return
+    if mtime == _token_mapping_mtime:
+        return
+    try:
+        with open(TOKEN_API_MAPPING_PATH, 'r') as f:
             data = json.load(f)
-            TOKEN_API_MAPPING = data.get('mapping', {})
+        reloaded = _token_mapping_mtime is not None
+        TOKEN_API_MAPPING = data.get('mapping', {})
+        _token_mapping_mtime = mtime
+        if reloaded:
+            print(f"🔄 Mapeo de tokens recargado: {len(TOKEN_API_MAPPING)} tokens")
+        else:
             print(f"✅ Mapeo de tokens cargado: {len(TOKEN_API_MAPPING)} tokens")
-    else:
-        print("⚠️  token_api_mapping.json no encontrado")
-except Exception as e:
-    print(f"❌ Error cargando mapeo de tokens: {e}")
+    except Exception as e:
+        print(f"❌ Error cargando mapeo de tokens: {e}")
+
+def reload_routing_if_changed():
+    """Recarga mapeo e índice de instrumentos sin reiniciar (como mucho cada pocos segundos)"""
+    global _token_mapping_checked
+    now = time.monotonic()
+    if now - _token_mapping_checked >= TOKEN_API_MAPPING_CHECK_INTERVAL:
+        _token_mapping_checked = now
+        load_token_api_mapping()
+    INSTRUMENT_INDEX.maybe_reload()
 
-def get_nested_value(data, path):
-    """Obtiene valor anidado usando notación de puntos"""
+load_token_api_mapping()
+
+def get_current_price(symbol):
+    """
+    Obtiene precio actual pasando por la caché de precios
+    Misses concurrentes del mismo símbolo hacen una sola llamada a las APIs
+    """
+    try:
+        return PRICE_CACHE.get(symbol, fetch_price_from_apis)
+    except Exception as e:
+        print(f"❌ Error obteniendo precio para {symbol}: {e}")
+        return None
+
+def get_apis_to_try(symbol):
+    """Lista de APIs a intentar: primero la asignada, luego el resto como fallback"""
+    reload_routing_if_changed()
+    
+    # Obtener API asignada para este token (los tokens sin mapeo los reparte el balanceador)
+    assigned_api = TOKEN_API_MAPPING.get(symbol)
+    if assigned_api is None:
+        assigned_api, _ = BALANCER.assign_api_to_token(symbol, candidates=list(APIS_CONFIG.keys()))
+    
+    # Fallback ordenado por coste esperado (latencia EWMA + tasa de error)
+    fallback = LATENCY_TRACKER.rank(
+        [api_id for api_id in APIS_CONFIG.keys() if api_id != assigned_api],
+        symbol
+    )
+    
+    # La asignada va primero salvo que se haya vuelto mucho más lenta que la mejor
+    apis_to_try = list(fallback)
+    if assigned_api and assigned_api in APIS_CONFIG:
+        if fallback and LATENCY_TRACKER.score(assigned_api, symbol) > LATENCY_REASSIGN_FACTOR * LATENCY_TRACKER.score(fallback[0], symbol):
+            apis_to_try.insert(1, assigned_api)
+        else:
+            apis_to_try.insert(0, assigned_api)
+    
+    # Exchanges que no listan el contrato (según el índice) ni se intentan
+    apis_to_try = INSTRUMENT_INDEX.filter_listed(apis_to_try, symbol)
+    
+    # Exchanges con el breaker abierto quedan fuera; half-open al final
+    return BREAKERS.order(apis_to_try)
+
+def fetch_price_from_api(api_id, symbol):
+    """Obtiene precio de UNA API con su endpoint de ticker individual"""
+    config = APIS_CONFIG[api_id]
     try:
-        # Si data es una lista, acceder al primer elemento
-        if isinstance(data, list):
-            if len(data) == 0:
-                return None
-            data = data[0]
-        
-        # Si data no es un diccionario, retornar None
-        if not isinstance(data, dict):
+        # Formatear símbolo para esta API
+        formatted_symbol = native_symbol(api_id, f"{symbol}/USDT:USDT")
+        url = config['url_template'].format(symbol=formatted_symbol)
+        
+        # Circuit breaker: no esperar timeouts de un exchange caído
+        if not BREAKERS.allow_request(api_id):
+            print(f"   🔌 {config['name']}: Circuit breaker abierto")
+            return None
+        
+        # Verificar rate limiting (consume el peso antes de salir)
+        if not RATE_LIMITER.try_acquire(api_id):
+            BREAKERS.release_probe(api_id)  # La prueba half-open no salió: no dejarla tomada
+            print(f"   🚫 {config['name']}: Rate limit alcanzado")
             return None
         
-        keys = path.split('.')
-        current = data
+        print(f"   📡 Intentando {config['name']} para {symbol}...")
         
-        for key in keys:
-            if key.isdigit():
-                # Acceso a índice de lista
-                if isinstance(current, list):
-                    current = current[int(key)]
-                else:
-                    return None
+        # Realizar petición
+        start_time = time.time()
+        response = http_get(url, timeout=config['timeout'])
+        response_time = time.time() - start_time
+        LATENCY_TRACKER.record(api_id, response_time, symbol=symbol,
+                               ok=not is_breaker_failure(response.status_code))
+        RATE_LIMITER.update_from_response(api_id, response)
+        if is_breaker_failure(response.status_code):
+            BREAKERS.record_failure(api_id)
+        else:
+            BREAKERS.record_success(api_id, response_time)
+        
+        if response.status_code == 200:
+            # Extraer precio con el extractor compilado del exchange
+            price = config['extract_price'](decode_json(response.content))
+            
+            # Validar precio
+            if price is not None and price > 0:
+                print(f"   ✅ {symbol}: ${price:.6f} (desde {config['name']})")
+                return price
             else:
-                # Acceso a clave de diccionario
-                if isinstance(current, dict):
-                    current = current.get(key)
-                    if current is None:
-                        return None
+                if price == 0:
+                    print(f"   ⚠️  {config['name']}: Precio es 0 (token no disponible)")
                 else:
-                    return None
-        
-        return float(current) if current is not None else None
-    except (KeyError, IndexError, ValueError, TypeError, AttributeError):
+                    print(f"   ⚠️  {config['name']}: Precio inválido ({price})")
+        else:
+            print(f"   ⚠️  {config['name']}: HTTP {response.status_code}")
+            
+    except requests.exceptions.Timeout:
+        LATENCY_TRACKER.record(api_id, config['timeout'], symbol=symbol, ok=False)
+        BREAKERS.record_failure(api_id)
+        print(f"   ⚠️  {config['name']}: Timeout")
+    except requests.exceptions.RequestException as e:
+        LATENCY_TRACKER.record_error(api_id, symbol=symbol)
+        BREAKERS.record_failure(api_id)
+        print(f"   ⚠️  {config['name']}: Error de conexión")
+    except Exception as e:
+        print(f"   ⚠️  {config['name']}: Error - {str(e)[:50]}")
+    
+    return None
+
+def get_current_prices(symbols, deadline=None):
+    """
+    Obtiene precios de varios símbolos en paralelo bajo un deadline global
+    Deduplica símbolos; los que no se resuelven a tiempo quedan en None
+    """
+    if deadline is None:
+        deadline = PRICE_DEADLINE
+    
+    unique_symbols = list(dict.fromkeys(symbols))
+    if not unique_symbols:
+        return {}
+    
+    print(f"\n🔍 Obteniendo precios para {len(unique_symbols)} símbolos (deadline {deadline}s)...")
+    futures = {PRICE_EXECUTOR.submit(get_current_price, symbol): symbol for symbol in unique_symbols}
+    done, not_done = wait(futures, timeout=deadline)
+    
+    prices = {}
+    for future in done:
+        prices[futures[future]] = future.result()
+    
+    for future in not_done:
+        # La búsqueda sigue en segundo plano y llenará la caché para la próxima petición
+        future.cancel()
+        prices[futures[future]] = None
+        print(f"   ⏱️  {futures[future]}: Deadline alcanzado, se marca como stale")
+    
+    return prices
+
+def get_hedge_delay(api_id):
+    """Tiempo a esperar antes de lanzar un hedge: p90 observado de la API"""
+    p90 = LATENCY_TRACKER.percentile(api_id, 0.9)
+    if p90 is None:
+        p90 = min(HEDGE_DEFAULT_DELAY, APIS_CONFIG[api_id]['timeout'])
+    return max(HEDGE_MIN_DELAY, p90)
+
+def fetch_price_via(api_id, symbol, cancel_event=None):
+    """Precio desde una API: snapshot bulk si está disponible, si no ticker individual"""
+    if cancel_event is not None and cancel_event.is_set():
         return None
+    
+    if SNAPSHOT_MODE and TICKER_SNAPSHOTS.supports(api_id):
+        price, status = TICKER_SNAPSHOTS.lookup(api_id, f"{symbol}/USDT:USDT")
+        if status == LOOKUP_OK:
+            return price
+        if status == LOOKUP_NOT_LISTED:
+            # El exchange no lista el contrato: no gastar una petición individual
+            return None
+    
+    return fetch_price_from_api(api_id, symbol)
 
-def get_current_price(symbol):
+def fetch_price_from_apis(symbol):
     """
     Obtiene precio actual usando las APIs del bot
     Usa el mapeo de tokens y fallback automático
+    En modo snapshot resuelve desde el ticker bulk de cada exchange
+    En modo hedging lanza la siguiente API en paralelo si la actual tarda más que su p90
     """
     try:
-        # Obtener API asignada para este token
-        assigned_api = TOKEN_API_MAPPING.get(symbol)
-        
-        # Crear lista de APIs a intentar
-        apis_to_try = []
-        if assigned_api and assigned_api in APIS_CONFIG:
-            apis_to_try.append(assigned_api)
-        
-        # Agregar otras APIs como fallback
-        for api_id in APIS_CONFIG.keys():
-            if api_id not in apis_to_try:
-                apis_to_try.append(api_id)
-        
-        # Intentar obtener precio de cada API
-        for api_id in apis_to_try:
-            try:
-                config = APIS_CONFIG[api_id]
-                
-                # Formatear símbolo para esta API
-                formatted_symbol = config['format_symbol'](f"{symbol}/USDT:USDT")
-                url = config['url_template'].format(symbol=formatted_symbol)
-                
-                print(f"   📡 Intentando {config['name']} para {symbol}...")
-                
-                # Realizar petición
-                response = requests.get(url, timeout=config['timeout'])
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    price = None
-                    
-                    # Extraer precio
-                    try:
-                        if '.' in config['price_path']:
-                            price = get_nested_value(data, config['price_path'])
-                        else:
-                            # Manejar tanto diccionarios como listas
-                            if isinstance(data, list) and len(data) > 0:
-                                price = float(data[0].get(config['price_path'], 0))
-                            elif isinstance(data, dict):
-                                price = float(data.get(config['price_path'], 0))
-                            else:
-                                price = 0
-                    except (ValueError, TypeError):
-                        price = None
-                    
-                    # Validar precio
-                    if price is not None and price > 0:
-                        print(f"   ✅ {symbol}: ${price:.6f} (desde {config['name']})")
-                        return price
-                    else:
-                        if price == 0:
-                            print(f"   ⚠️  {config['name']}: Precio es 0 (token no disponible)")
-                        else:
-                            print(f"   ⚠️  {config['name']}: Precio inválido ({price})")
-                else:
-                    print(f"   ⚠️  {config['name']}: HTTP {response.status_code}")
-                    
-            except requests.exceptions.Timeout:
-                print(f"   ⚠️  {config['name']}: Timeout")
-            except requests.exceptions.RequestException as e:
-                print(f"   ⚠️  {config['name']}: Error de conexión")
-            except Exception as e:
-                print(f"   ⚠️  {config['name']}: Error - {str(e)[:50]}")
+        apis_to_try = get_apis_to_try(symbol)
+        
+        if HEDGE_MODE:
+            price, api_id = hedged_call(
+                apis_to_try,
+                lambda api_id, cancel_event: fetch_price_via(api_id, symbol, cancel_event),
+                get_hedge_delay,
+                HEDGE_EXECUTOR,
+                budget=HEDGE_BUDGET,
+                max_hedges=HEDGE_MAX_PER_LOOKUP
+            )
+            if price is not None:
+                return price
+        else:
+            # Intentar obtener precio de cada API
+            for api_id in apis_to_try:
+                price = fetch_price_via(api_id, symbol)
+                if price is not None:
+                    return price
         
         print(f"   ❌ {symbol}: No se pudo obtener precio de ninguna API")
         return None
@@ -224,81 +529,404 @@ def get_current_price(symbol):
         print(f"❌ Error obteniendo precio para {symbol}: {e}")
         return None
 
+def refresh_prices(symbols):
+    """
+    Consulta precios frescos (sin pasar por el TTL de la caché) para el refresher
+    Publica también en la caché para que get_current_price los aproveche
+    """
+    futures = {PRICE_EXECUTOR.submit(fetch_price_from_apis, symbol): symbol for symbol in symbols}
+    done, not_done = wait(futures, timeout=PRICE_DEADLINE)
+    
+    prices = {}
+    for future in done:
+        symbol = futures[future]
+        prices[symbol] = future.result()
+        if prices[symbol] is not None:
+            PRICE_CACHE.set(symbol, prices[symbol])
+    for future in not_done:
+        future.cancel()
+    return prices
+
+def clean_symbol(symbol):
+    """'BTC/USDT:USDT' -> 'BTC'"""
+    return symbol.replace(':USDT', '').replace('/USDT', '')
+
+# Conexiones persistentes de solo lectura (la API nunca escribe en signals.db)
+DB_POOL = get_connection_pool(DATABASE_PATH, read_only=True, size=PRICE_WORKERS, row_factory=sqlite3.Row)
+
 def get_db_connection():
-    """Conecta a la base de datos"""
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """Conexión de solo lectura prestada del pool (usar con `with`)"""
+    return DB_POOL.connection()
 
-def get_active_signals():
-    """Obtiene todas las señales activas con precios actuales"""
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Obtener columnas disponibles
-        cursor.execute("PRAGMA table_info(signals)")
-        columns_info = cursor.fetchall()
-        columns = [col[1] for col in columns_info]
+# Paginación de señales (keyset sobre created_at, id)
+SIGNALS_PAGE_SIZE = 20
+SIGNALS_PAGE_MAX = 200
+PAGE_PARAMS = ('limit', 'cursor', 'symbol', 'side', 'status')
+SIGNAL_FIELDS = [
+    'id', 'symbol', 'signal_type', 'entry', 'tp1', 'sl', 
+    'confidence', 'status', 'created_at', 'ma_type', 'ma_length'
+]
+
+def row_to_signal(row):
+    """Fila de la DB -> señal normalizada para la API"""
+    signal = dict(row)
+    
+    # Limpiar símbolo
+    signal['symbol'] = clean_symbol(signal['symbol'])
+    
+    # Convertir a mayúsculas
+    signal['type'] = signal['signal_type'].upper()
+    
+    # Asegurar valores numéricos
+    signal['entry'] = float(signal['entry']) if signal['entry'] else 0
+    signal['tp'] = float(signal['tp1']) if signal['tp1'] else 0
+    signal['sl'] = float(signal['sl']) if signal['sl'] else 0
+    signal['confidence'] = float(signal['confidence']) if signal['confidence'] else 50
+    
+    return signal
+
+def load_signal_page(filters=None, cursor=None, limit=SIGNALS_PAGE_SIZE):
+    """
+    Lee una página de señales (sin precios)
+    Retorna (señales, cursor de la página siguiente o None)
+    """
+    with get_db_connection() as conn:
+        # Columnas disponibles (esquema cacheado: PRAGMA table_info una sola vez por proceso)
+        columns = signal_columns(conn, DATABASE_PATH)
+        fields = [field for field in SIGNAL_FIELDS if field in columns]
         
         # Construir consulta
-        select_fields = [
-            'id', 'symbol', 'signal_type', 'entry', 'tp1', 'sl', 
-            'confidence', 'status', 'created_at', 'ma_type', 'ma_length'
-        ]
-        
-        query = f"""
-            SELECT {', '.join(select_fields)}
-            FROM signals
-            WHERE status = 'active'
-            ORDER BY created_at DESC
-            LIMIT 20
-        """
-        
-        cursor.execute(query)
-        
-        signals = []
-        for row in cursor.fetchall():
-            signal = dict(row)
-            
-            # Limpiar símbolo
-            symbol = signal['symbol'].replace(':USDT', '').replace('/USDT', '')
-            signal['symbol'] = symbol
-            
-            # Convertir a mayúsculas
-            signal['type'] = signal['signal_type'].upper()
-            
-            # Asegurar valores numéricos
-            signal['entry'] = float(signal['entry']) if signal['entry'] else 0
-            signal['tp'] = float(signal['tp1']) if signal['tp1'] else 0
-            signal['sl'] = float(signal['sl']) if signal['sl'] else 0
-            signal['confidence'] = float(signal['confidence']) if signal['confidence'] else 50
-            
-            # OBTENER PRECIO ACTUAL DESDE LAS APIs
-            print(f"\n🔍 Obteniendo precio para {symbol}...")
-            current_price = get_current_price(symbol)
-            
-            if current_price:
-                signal['current'] = current_price
-            else:
-                # Fallback a precio de entrada
-                signal['current'] = signal['entry']
-                print(f"⚠️  {symbol}: Usando precio de entrada = {signal['entry']}")
-            
-            signals.append(signal)
+        query, params = build_page_query(fields, filters or {'status': 'active'}, cursor, limit)
+        rows = conn.execute(query, params).fetchall()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]['created_at'], rows[-1]['id'])
+    
+    return [row_to_signal(row) for row in rows], next_cursor
+
+def load_active_signals():
+    """Lee las señales activas más recientes de la base de datos (primera página, sin precios)"""
+    return load_signal_page()[0]
+
+def attach_prices(signals, prices):
+    """Agrega el precio actual a cada señal (precio de entrada + stale si no hay)"""
+    for signal in signals:
+        current_price = prices.get(signal['symbol'])
         
-        conn.close()
-        print(f"\n✅ {len(signals)} señales cargadas con precios actuales\n")
-        return signals
+        if current_price:
+            signal['current'] = current_price
+            signal['stale'] = False
+        else:
+            # Fallback a precio de entrada
+            signal['current'] = signal['entry']
+            signal['stale'] = True
+            print(f"⚠️  {signal['symbol']}: Usando precio de entrada = {signal['entry']}")
+    
+    return signals
+
+def get_active_signals():
+    """Obtiene las señales activas (primera página) con precios actuales"""
+    try:
+        return enrich_with_prices(load_active_signals())
     
     except Exception as e:
         print(f"❌ Error obteniendo señales: {e}")
         return []
 
+def enrich_with_prices(signals):
+    """
+    Agrega precios actuales SOLO a las señales recibidas (p. ej. una página)
+    Las señales cerradas no consultan precio
+    """
+    active = [signal for signal in signals if signal['status'] == 'active']
+    symbols = [signal['symbol'] for signal in active]
+    
+    if QUOTE_REFRESHER.is_running():
+        # Precios publicados por el refresher: la petición no toca los exchanges
+        prices = QUOTE_TABLE.get_prices(symbols)
+        missing = [symbol for symbol in symbols if symbol not in prices]
+        if missing:
+            QUOTE_REFRESHER.watch(missing)
+    else:
+        # OBTENER PRECIOS ACTUALES DESDE LAS APIs (en paralelo, un lookup por símbolo)
+        prices = get_current_prices(symbols)
+        QUOTE_TABLE.update_many(prices)  # Alimenta la versión de /api/operations?since=
+    
+    attach_prices(active, prices)
+    print(f"\n✅ {len(signals)} señales cargadas con precios actuales\n")
+    return signals
+
+async def get_current_prices_async(symbols):
+    """Variante async de get_current_prices usando el motor asyncio"""
+    prices = {}
+    mexc_symbols = {}
+    for symbol in dict.fromkeys(symbols):
+        cached = PRICE_CACHE.get_if_fresh(symbol)
+        if cached is not None:
+            prices[symbol] = cached
+        else:
+            mexc_symbols[f"{symbol}/USDT:USDT"] = symbol
+    
+    if not mexc_symbols:
+        return prices
+    
+    results = await ASYNC_ENGINE_RUNNER.run_async(
+        ASYNC_ENGINE.get_current_prices(list(mexc_symbols), deadline=PRICE_DEADLINE)
+    )
+    
+    for mexc_symbol, price in results.items():
+        symbol = mexc_symbols[mexc_symbol]
+        prices[symbol] = price
+        if price is not None:
+            PRICE_CACHE.set(symbol, price)
+    return prices
+
+async def get_active_signals_async():
+    """Variante async de get_active_signals (no ocupa un hilo esperando a los exchanges)"""
+    try:
+        signals = load_active_signals()
+        symbols = [signal['symbol'] for signal in signals]
+        
+        if QUOTE_REFRESHER.is_running():
+            prices = QUOTE_TABLE.get_prices(symbols)
+        else:
+            prices = await get_current_prices_async(symbols)
+        
+        return attach_prices(signals, prices)
+    
+    except Exception as e:
+        print(f"❌ Error obteniendo señales (async): {e}")
+        return []
+
+# Refresher de cotizaciones en segundo plano (opcional, no aplica en serverless)
+QUOTE_TABLE = QuoteTable()
+QUOTE_REFRESHER = QuoteRefresher(
+    DATABASE_PATH,
+    refresh_prices,
+    QUOTE_TABLE,
+    interval=QUOTE_REFRESH_INTERVAL,
+    normalize_symbol=clean_symbol,
+    unresolved_ttl=QUOTE_UNRESOLVED_TTL
+)
+if QUOTE_REFRESHER_ENABLED:
+    QUOTE_REFRESHER.start()
+
+# Versión monótona (commits en la DB + cambios de cotización) para /api/operations?since=
+SIGNAL_VERSIONS = SignalVersionTracker(DATABASE_PATH, load_active_signals, QUOTE_TABLE)
+
+def sync_quote_table():
+    """
+    Sin refresher: publica en QUOTE_TABLE los precios de la caché
+    Solo los símbolos sin precio fresco pasan por get_current_prices (y los exchanges)
+    """
+    prices = {symbol: PRICE_CACHE.get_if_fresh(symbol) for symbol in SIGNAL_VERSIONS.symbols()}
+    expired = [symbol for symbol, price in prices.items() if price is None]
+    if expired:
+        prices.update(get_current_prices(expired))
+    QUOTE_TABLE.update_many(prices)
+
+def current_data_version():
+    """
+    Versión publicada de señales + cotizaciones (base de ?since= y de los ETag)
+    Solo lee la DB si hubo commits y el seq guardado de QUOTE_TABLE: no consulta exchanges
+    """
+    return SIGNAL_VERSIONS.current()
+
+def quote_epoch():
+    """
+    Parte del ETag que vence con los precios
+    Sin refresher QUOTE_TABLE.seq solo avanza en un fallo de caché: la ventana del TTL
+    entra al validador para que, cumplido el TTL, la revalidación republique precios
+    """
+    if QUOTE_REFRESHER.is_running():
+        return ()
+    return ('q', int(time.time() // CACHE_TTL))
+
+def publish_data_version():
+    """Tras un fallo de caché: sin refresher publica los precios y retorna la versión resultante"""
+    if not QUOTE_REFRESHER.is_running():
+        sync_quote_table()
+    return SIGNAL_VERSIONS.current()
+
+def get_operations_delta(since):
+    """
+    Cambios desde la versión `since` (None si hace falta la lista completa)
+    Llamar después de publish_data_version() para que los precios estén publicados
+    """
+    delta = SIGNAL_VERSIONS.delta(since)
+    if delta is None:
+        return None
+    
+    prices = QUOTE_TABLE.get_prices(signal['symbol'] for signal in delta['upsert'])
+    delta['upsert'] = attach_prices(delta['upsert'], prices)
+    return delta
+
+def stream_prices(symbols):
+    """Precios para el stream: tabla del refresher si corre, si no la caché de precios"""
+    if QUOTE_REFRESHER.is_running():
+        return QUOTE_TABLE.get_prices(symbols)
+    return get_current_prices(symbols)
+
+# Compresión negociada (gzip, brotli si está instalado) de respuestas grandes
+COMPRESSION_ENABLED = os.environ.get('RESPONSE_COMPRESSION', '1') == '1'
+COMPRESSOR = ResponseCompressor(
+    min_size=int(os.environ.get('COMPRESSION_MIN_SIZE', '1024')),
+    gzip_level=int(os.environ.get('COMPRESSION_GZIP_LEVEL', '6')),
+    brotli_quality=int(os.environ.get('COMPRESSION_BROTLI_QUALITY', '5'))
+)
+
+@app.after_request
+def compress_response(response):
+    """Comprime respuestas según Accept-Encoding (no toca streams, 304 ni contenido ya comprimido)"""
+    if not COMPRESSION_ENABLED or request.method == 'HEAD':
+        return response
+    if response.status_code != 200 or response.direct_passthrough or response.is_streamed:
+        return response
+    if response.mimetype == 'text/event-stream' or 'Content-Encoding' in response.headers:
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    if response.content_length is not None and response.content_length < COMPRESSOR.min_size:
+        return response
+    encoding = COMPRESSOR.negotiate(request.accept_encodings)
+    if encoding is None:
+        return response
+    
+    data = response.get_data()
+    if len(data) < COMPRESSOR.min_size:
+        return response
+    response.set_data(COMPRESSOR.compress(data, encoding))
+    response.headers['Content-Encoding'] = encoding
+    # ETag fuerte distinto por codificación (los bytes cambian)
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(f"{etag}-{encoding}")
+    return response
+
+# Validadores HTTP: ETag fuerte = arranque del proceso + recurso + versión de datos
+# (las versiones se reinician con el proceso, el prefijo evita reutilizar un ETag viejo)
+ETAG_EPOCH = format(int(time.time()), 'x')
+API_CACHE_CONTROL = 'no-cache'  # El navegador guarda la respuesta pero revalida siempre
+
+def make_etag(resource, version, *variant):
+    return '-'.join(str(part) for part in (ETAG_EPOCH, resource, version) + variant)
+
+def not_modified(etag, cache_control=API_CACHE_CONTROL):
+    """304 sin cuerpo si el cliente ya tiene esta versión (en cualquier codificación), si no None"""
+    variants = [etag] + [f"{etag}-{encoding}" for encoding in COMPRESSOR.encodings]
+    matched = next((tag for tag in variants if request.if_none_match.contains(tag)), None)
+    if matched is None:
+        return None
+    response = Response(status=304)
+    response.set_etag(matched)
+    response.headers['Cache-Control'] = cache_control
+    response.vary.add('Accept-Encoding')
+    return response
+
+def with_etag(response, etag, cache_control=API_CACHE_CONTROL):
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = cache_control
+    return response
+
+def render_operations(payload, fmt, fields):
+    """Respuesta de /api/operations en el formato negociado (encoder rápido si está instalado)"""
+    body, mimetype = encode_operations(payload, fmt, fields)
+    response = Response(body, mimetype=mimetype)
+    response.vary.add('Accept')
+    return response
+
+# Stream SSE: un único productor para todos los dashboards conectados
+STREAM_INTERVAL = float(os.environ.get('STREAM_INTERVAL', str(QUOTE_REFRESH_INTERVAL)))
+STREAM_HEARTBEAT = 15  # segundos
+STREAM_HUB = StreamHub(
+    load_active_signals,
+    stream_prices,
+    attach_prices,
+    db_path=DATABASE_PATH,
+    interval=STREAM_INTERVAL,
+    heartbeat=STREAM_HEARTBEAT
+)
+
 @app.route('/api/operations', methods=['GET'])
 def get_operations():
-    """Endpoint: GET /api/operations - Retorna operaciones con precios actuales"""
+    """
+    Endpoint: GET /api/operations - Retorna operaciones con precios actuales
+    Con ?since=<versión> retorna solo lo que cambió desde esa versión
+    Formato: ?format=json|columnar|msgpack (o header Accept) y ?fields=id,symbol,...
+    Paginación: ?limit=&cursor= con filtros ?symbol=&side=long|short&status=active|closed|all
+    (cada respuesta paginada trae next_cursor; ?since= no aplica a páginas)
+    """
     try:
+        fmt = negotiate_format(request.args.get('format'), request.accept_mimetypes)
+        fields = parse_fields(request.args.get('fields'), OPERATION_FIELDS)
+        
+        paged = any(param in request.args for param in PAGE_PARAMS)
+        if paged:
+            filters = parse_filters(request.args)
+            limit = parse_limit(request.args.get('limit'), SIGNALS_PAGE_SIZE, SIGNALS_PAGE_MAX)
+            page_cursor = request.args.get('cursor') or None
+            if page_cursor:
+                decode_cursor(page_cursor)
+    except (WireFormatError, PageQueryError) as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'timestamp': datetime.now().isoformat()
+        }), getattr(e, 'status', 400)
+    
+    try:
+        # Versión ANTES de leer: si algo cambia durante la lectura, el próximo delta lo trae
+        version = current_data_version()
+        since = request.args.get('since', type=int)
+        variant = () if since is None else ('since', since)
+        if fmt != FORMAT_ROWS or fields:
+            variant += (fmt, zlib.crc32(','.join(fields or ()).encode()))
+        if paged:
+            variant += ('page', zlib.crc32(request.query_string))
+            if filters['status'] != 'active':
+                # Las páginas con señales cerradas cambian con commits que no mueven la versión
+                variant += ('db', SIGNAL_VERSIONS.commit_mark())
+        variant += quote_epoch()
+        
+        # Sondeo sin cambios: 304 sin tocar la DB ni los exchanges
+        cached = not_modified(make_etag('operations', version, *variant))
+        if cached is not None:
+            return cached
+        
+        # Fallo de caché: recién ahora se publican precios (y la versión puede avanzar)
+        version = publish_data_version()
+        
+        if paged:
+            # Solo la página pedida consulta precios
+            signals, next_cursor = load_signal_page(filters, page_cursor, limit)
+            enrich_with_prices(signals)
+            return with_etag(render_operations({
+                'success': True,
+                'delta': False,
+                'version': version,
+                'data': signals,
+                'count': len(signals),
+                'next_cursor': next_cursor,
+                'has_more': next_cursor is not None,
+                'timestamp': datetime.now().isoformat()
+            }, fmt, fields), make_etag('operations', version, *variant))
+        
+        if since is not None:
+            delta = get_operations_delta(since)
+            if delta is not None:
+                return with_etag(render_operations({
+                    'success': True,
+                    'delta': True,
+                    'version': delta['version'],
+                    'data': delta['upsert'],
+                    'removed': delta['remove'],
+                    'prices': delta['prices'],
+                    'count': len(delta['upsert']),
+                    'timestamp': datetime.now().isoformat()
+                }, fmt, fields), make_etag('operations', delta['version'], *variant))
+        
         print("\n" + "="*80)
         print("📡 SOLICITUD: /api/operations")
         print("="*80)
@@ -306,12 +934,14 @@ def get_operations():
         # ✅ OBTENER SEÑALES ACTIVAS (funciona en Vercel y localhost)
         signals = get_active_signals()
         
-        return jsonify({
+        return with_etag(render_operations({
             'success': True,
+            'delta': False,
+            'version': version,
             'data': signals,
             'count': len(signals),
             'timestamp': datetime.now().isoformat()
-        })
+        }, fmt, fields), make_etag('operations', version, *variant))
     
     except Exception as e:
         print(f"❌ Error: {e}")
@@ -321,11 +951,24 @@ def get_operations():
             'timestamp': datetime.now().isoformat()
         }), 500
 
-@app.route('/api/statistics', methods=['GET'])
-def get_statistics():
-    """Endpoint: GET /api/statistics - Retorna estadísticas COMPLETAS"""
-    try:
-        conn = get_db_connection()
+@app.route('/api/stream', methods=['GET'])
+def stream_operations():
+    """Endpoint: GET /api/stream - Snapshot inicial y luego solo cambios (Server-Sent Events)"""
+    # '<época>-<seq>': un id de antes de reiniciar (u otro formato) recibe un snapshot completo
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('lastEventId')
+    
+    return Response(
+        STREAM_HUB.subscribe(last_event_id),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'  # Sin buffering en nginx / ngrok
+        }
+    )
+
+def get_signal_counts():
+    """Conteos de señales para /api/statistics"""
+    with get_db_connection() as conn:
         cursor = conn.cursor()
         
         # TOTAL DE SEÑALES (todas)
@@ -343,38 +986,114 @@ def get_statistics():
         # LONG vs SHORT (activas)
         cursor.execute("SELECT COUNT(*) FROM signals WHERE signal_type = 'LONG' AND (status = 'active' OR resultado IS NULL)")
         long_count = cursor.fetchone()[0]
-        
+    
         cursor.execute("SELECT COUNT(*) FROM signals WHERE signal_type = 'SHORT' AND (status = 'active' OR resultado IS NULL)")
         short_count = cursor.fetchone()[0]
+    
+    return {
+        'total_signals': total_signals,
+        'active_operations': active_signals,
+        'closed_signals': closed_signals,
+        'long_count': long_count,
+        'short_count': short_count
+    }
+
+def build_statistics(counts, signals):
+    """Combina los conteos con el potencial calculado sobre las señales activas"""
+    total_potential = 0
+    for signal in signals:
+        if signal['type'] == 'LONG':
+            potential = ((signal['tp'] - signal['current']) / signal['current'] * 100) if signal['current'] > 0 else 0
+        elif signal['type'] == 'SHORT':
+            potential = ((signal['current'] - signal['tp']) / signal['current'] * 100) if signal['current'] > 0 else 0
+        else:
+            potential = 0
+        total_potential += potential
+    
+    avg_potential = total_potential / len(signals) if signals else 0
+    
+    statistics = dict(counts)
+    statistics['total_potential_gain'] = round(total_potential, 2)
+    statistics['avg_potential_gain'] = round(avg_potential, 2)
+    return statistics
+
+@app.route('/api/statistics', methods=['GET'])
+def get_statistics():
+    """Endpoint: GET /api/statistics - Retorna estadísticas COMPLETAS"""
+    try:
+        # La versión solo sigue señales activas y precios: los contadores también
+        # cambian con commits sobre señales cerradas, así que el ETag lleva commit_mark()
+        version = current_data_version()
+        variant = ('db', SIGNAL_VERSIONS.commit_mark()) + quote_epoch()
+        cached = not_modified(make_etag('statistics', version, *variant))
+        if cached is not None:
+            return cached
+        
+        etag = make_etag('statistics', publish_data_version(), *variant)
         
-        conn.close()
+        counts = get_signal_counts()
         
         # Obtener señales activas para calcular potencial
         signals = get_active_signals()
         
-        total_potential = 0
-        for signal in signals:
-            if signal['type'] == 'LONG':
-                potential = ((signal['tp'] - signal['current']) / signal['current'] * 100) if signal['current'] > 0 else 0
-            elif signal['type'] == 'SHORT':
-                potential = ((signal['current'] - signal['tp']) / signal['current'] * 100) if signal['current'] > 0 else 0
-            else:
-                potential = 0
-            total_potential += potential
+        return with_etag(jsonify({
+            'success': True,
+            'data': build_statistics(counts, signals),
+            'timestamp': datetime.now().isoformat()
+        }), etag)
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'timestamp': datetime.now().isoformat()
+        }), 500
+
+@app.route('/api/async/operations', methods=['GET'])
+async def get_operations_async():
+    """Endpoint: GET /api/async/operations - Igual que /api/operations con el motor asyncio"""
+    if ASYNC_ENGINE is None:
+        return jsonify({
+            'success': False,
+            'error': 'Motor asyncio no disponible (instalar aiohttp)',
+            'timestamp': datetime.now().isoformat()
+        }), 503
+    
+    try:
+        signals = await get_active_signals_async()
         
-        avg_potential = total_potential / len(signals) if signals else 0
+        return jsonify({
+            'success': True,
+            'data': signals,
+            'count': len(signals),
+            'timestamp': datetime.now().isoformat()
+        })
+    
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'timestamp': datetime.now().isoformat()
+        }), 500
+
+@app.route('/api/async/statistics', methods=['GET'])
+async def get_statistics_async():
+    """Endpoint: GET /api/async/statistics - Igual que /api/statistics con el motor asyncio"""
+    if ASYNC_ENGINE is None:
+        return jsonify({
+            'success': False,
+            'error': 'Motor asyncio no disponible (instalar aiohttp)',
+            'timestamp': datetime.now().isoformat()
+        }), 503
+    
+    try:
+        counts = get_signal_counts()
+        signals = await get_active_signals_async()
         
         return jsonify({
             'success': True,
-            'data': {
-                'total_signals': total_signals,
-                'active_operations': active_signals,
-                'closed_signals': closed_signals,
-                'long_count': long_count,
-                'short_count': short_count,
-                'total_potential_gain': round(total_potential, 2),
-                'avg_potential_gain': round(avg_potential, 2)
-            },
+            'data': build_statistics(counts, signals),
             'timestamp': datetime.now().isoformat()
         })
     
@@ -389,11 +1108,10 @@ def get_statistics():
 def health():
     """Endpoint: GET /api/health - Verifica estado"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM signals WHERE status = 'active'")
-        count = cursor.fetchone()[0]
-        conn.close()
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COUNT(*) FROM signals WHERE status = 'active'")
+            count = cursor.fetchone()[0]
         
         return jsonify({
             'status': 'OK',
@@ -401,6 +1119,21 @@ def health():
             'active_signals': count,
             'apis_configured': len(APIS_CONFIG),
             'tokens_mapped': len(TOKEN_API_MAPPING),
+            'instrument_index': INSTRUMENT_INDEX.get_stats(),
+            'price_cache': PRICE_CACHE.get_stats(),
+            'snapshot_mode': SNAPSHOT_MODE,
+            'ticker_snapshots': TICKER_SNAPSHOTS.get_stats(),
+            'hedging': HEDGE_BUDGET.get_stats() if HEDGE_MODE else None,
+            'api_latency': LATENCY_TRACKER.get_stats(),
+            'http_sessions': HTTP_SESSIONS.hosts(),
+            'quote_refresher': QUOTE_REFRESHER.get_stats(),
+            'stream': STREAM_HUB.get_stats(),
+            'signal_versions': SIGNAL_VERSIONS.get_stats(),
+            'compression': COMPRESSOR.get_stats(),
+            'db_pool': DB_POOL.get_stats(),
+            'circuit_breakers': BREAKERS.get_stats(),
+            'rate_limits': {api_id: RATE_LIMITER.get_usage(api_id) for api_id in APIS_CONFIG},
+            'balancer': BALANCER.get_stats(),
             'timestamp': datetime.now().isoformat()
         })
     except:
@@ -410,13 +1143,51 @@ def health():
             'timestamp': datetime.now().isoformat()
         }), 500
 
+# Dashboard en memoria: se relee del disco solo si cambia el mtime del archivo
+DASHBOARD_PATH = 'index.html'
+DASHBOARD_CHECK_INTERVAL = 2  # segundos entre comprobaciones del mtime
+DASHBOARD_CACHE_CONTROL = 'public, max-age=60'
+_dashboard = {'variants': None, 'etag': None, 'mtime': None, 'checked': 0.0}
+_dashboard_lock = threading.Lock()
+
+def load_dashboard():
+    """
+    ({codificación: bytes}, etag) del dashboard; lanza FileNotFoundError si no existe
+    Las variantes comprimidas se generan al cargar (o al cambiar el archivo), no por petición
+    """
+    with _dashboard_lock:
+        now = time.monotonic()
+        if _dashboard['variants'] is not None and now - _dashboard['checked'] < DASHBOARD_CHECK_INTERVAL:
+            return _dashboard['variants'], _dashboard['etag']
+        _dashboard['checked'] = now
+        
+        mtime = os.path.getmtime(DASHBOARD_PATH)
+        if mtime != _dashboard['mtime']:
+            with open(DASHBOARD_PATH, 'rb') as f:
+                html = f.read()
+            _dashboard['variants'] = COMPRESSOR.precompress(html)
+            _dashboard['etag'] = hashlib.sha1(html).hexdigest()[:16]
+            _dashboard['mtime'] = mtime
+        return _dashboard['variants'], _dashboard['etag']
+
 @app.route('/', methods=['GET'])
 def serve_dashboard():
-    """Sirve el dashboard HTML"""
+    """Sirve el dashboard HTML (desde memoria, con ETag y variante precomprimida)"""
     try:
-        with open('index.html', 'r', encoding='utf-8') as f:
-            html_content = f.read()
-        return html_content
+        variants, etag = load_dashboard()
+        cached = not_modified(etag, DASHBOARD_CACHE_CONTROL)
+        if cached is not None:
+            return cached
+        
+        encoding = COMPRESSOR.negotiate(request.accept_encodings) if COMPRESSION_ENABLED else None
+        if encoding is None:
+            response = Response(variants[IDENTITY], mimetype='text/html')
+        else:
+            response = Response(variants[encoding], mimetype='text/html')
+            response.headers['Content-Encoding'] = encoding
+            etag = f"{etag}-{encoding}"
+        response.vary.add('Accept-Encoding')
+        return with_etag(response, etag, DASHBOARD_CACHE_CONTROL)
     except FileNotFoundError:
         return jsonify({
             'error': 'Dashboard no encontrado',
@@ -13,6 +13,8 @@ import hashlib
 from datetime import datetime
 import json
 
+from core.db_connection import checkpoint
+
 class SignalsSyncMonitor:
     def __init__(self):
         self.db_path = 'signals.db'
@@ -120,6 +122,9 @@ class SignalsSyncMonitor:
                 print(f"❌ {self.db_path} no encontrado")
                 return False
             
+            # Volcar el WAL al archivo principal: git solo sube signals.db
+            checkpoint(self.db_path)
+            
             # Agregar signals.db
             print("📤 Agregando signals.db a Git...")
             result = subprocess.run(
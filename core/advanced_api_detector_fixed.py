@@ -2,13 +2,28 @@
 import requests
 import time
 from typing import Dict, List, Optional, Tuple
-from datetime import datetime, timedelta
+from datetime import datetime
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from core.ticker_snapshot import TickerSnapshotStore, LOOKUP_OK, LOOKUP_NOT_LISTED
+from core.latency_tracker import LatencyTracker
+from core.hedging import HedgeBudget, hedged_call
+from core.http_sessions import get_session_registry, http_get
+from core.async_price_engine import AsyncPriceEngine
+from core.rate_limiter import get_rate_limiter
+from core.circuit_breaker import get_circuit_breakers, is_breaker_failure
+from core.instrument_index import get_instrument_index
+from core.price_extractors import compile_price_paths, decode_json
+from core.failure_memory import FailureMemory
 
 class AdvancedAPIDetectorFixed:
     """Detector avanzado de APIs con fallback automático mejorado + BALANCEO"""
 
-    def __init__(self):
+    def __init__(self, snapshot_mode: bool = True, snapshot_ttl: float = 10,
+                 hedge_mode: bool = True, hedge_budget_ratio: float = 0.1, max_hedges: int = 1,
+                 prewarm_connections: bool = False):
         # Importar balanceador
         from core.api_balancer import get_api_balancer
         self.balancer = get_api_balancer()
@@ -24,7 +39,12 @@ class AdvancedAPIDetectorFixed:
                 'format_symbol': self._format_binance_futures,
                 'price_path': 'price',
                 'timeout': 3,
-                'weight': 1
+                'weight': 1,
+                'bulk_url': 'https://fapi.binance.com/fapi/v1/ticker/price',
+                'bulk_list_path': '',
+                'bulk_symbol_key': 'symbol',
+                'bulk_price_key': 'price',
+                'bulk_weight': 2
             },
             
             # 🥈 PRIORIDAD 2 - Bybit Futures USDT-M (600 req/min)
@@ -36,7 +56,12 @@ class AdvancedAPIDetectorFixed:
                 'format_symbol': self._format_bybit_futures,
                 'price_path': 'result.list.0.lastPrice',
                 'timeout': 4,
-                'weight': 1
+                'weight': 1,
+                'bulk_url': 'https://api.bybit.com/v5/market/tickers?category=linear',
+                'bulk_list_path': 'result.list',
+                'bulk_symbol_key': 'symbol',
+                'bulk_price_key': 'lastPrice',
+                'bulk_weight': 1
             },
             
             # 🥉 PRIORIDAD 3 - OKX Futures USDT-M (600 req/min)
@@ -48,7 +73,12 @@ class AdvancedAPIDetectorFixed:
                 'format_symbol': self._format_okx_futures,
                 'price_path': 'data.0.last',
                 'timeout': 4,
-                'weight': 1
+                'weight': 1,
+                'bulk_url': 'https://www.okx.com/api/v5/market/tickers?instType=SWAP',
+                'bulk_list_path': 'data',
+                'bulk_symbol_key': 'instId',
+                'bulk_price_key': 'last',
+                'bulk_weight': 1
             },
             
             # ⚠️ PRIORIDAD 4 - KuCoin Futures USDT-M (600 req/min)
@@ -60,7 +90,12 @@ class AdvancedAPIDetectorFixed:
                 'format_symbol': self._format_kucoin_futures,
                 'price_path': 'data.price',
                 'timeout': 5,
-                'weight': 1
+                'weight': 1,
+                'bulk_url': 'https://api-futures.kucoin.com/api/v1/allTickers',
+                'bulk_list_path': 'data',
+                'bulk_symbol_key': 'symbol',
+                'bulk_price_key': 'price',
+                'bulk_weight': 1
             },
             
             # 🔄 PRIORIDAD 5 - Gate.io Futures USDT-M (600 req/min)
@@ -72,7 +107,12 @@ class AdvancedAPIDetectorFixed:
                 'format_symbol': self._format_gate_futures,
                 'price_path': 'last_price',
                 'timeout': 5,
-                'weight': 1
+                'weight': 1,
+                'bulk_url': 'https://api.gateio.ws/api/v4/futures/usdt/tickers',
+                'bulk_list_path': '',
+                'bulk_symbol_key': 'contract',
+                'bulk_price_key': 'last',
+                'bulk_weight': 1
             },
             
             # 🔄 PRIORIDAD 6 - MEXC Futures USDT-M (600 req/min)
@@ -84,7 +124,12 @@ class AdvancedAPIDetectorFixed:
                 'format_symbol': self._format_mexc_futures,
                 'price_path': 'data.0.lastPrice',
                 'timeout': 5,
-                'weight': 1
+                'weight': 1,
+                'bulk_url': 'https://contract.mexc.com/api/v1/contract/ticker',
+                'bulk_list_path': 'data',
+                'bulk_symbol_key': 'symbol',
+                'bulk_price_key': 'lastPrice',
+                'bulk_weight': 1
             },
             
             # 🔄 PRIORIDAD 7 - Bitfinex Futures USDT-M (600 req/min)
@@ -124,19 +169,56 @@ class AdvancedAPIDetectorFixed:
             }
         }
         
-        # Control de rate limiting
-        self.api_usage = {}  # Contador de uso por API
-        self.api_reset_time = {}  # Tiempo de reset por API
-        self.failed_combinations = set()  # Combinaciones fallidas
+        # price_path compilado una vez por exchange (config['extract_price'])
+        compile_price_paths(self.apis)
+        
+        # Control de rate limiting: token bucket por exchange (compartido con app.py)
+        self.rate_limiter = get_rate_limiter()
+        self.breakers = get_circuit_breakers()  # Circuit breaker por exchange (compartido con app.py)
+        # Estado compartido entre hilos:
+        # - failures: combinaciones fallidas con TTL, acotada y con lock striping
+        # - token_api_mapping / api_health: copy-on-write, lecturas sin lock
+        self.failures = FailureMemory(ttl=300)  # Reintentar después de 5 minutos
         self.token_api_mapping = {}  # Mapeo de tokens a APIs
         self.api_health = {}  # Estado de salud de APIs
-        self.failure_timestamps = {}  # Timestamps de fallos para retry
+        self._mapping_lock = threading.Lock()
+        self._async_engine_lock = threading.Lock()
+        
+        # Índice de contratos listados por exchange (compartido con app.py)
+        self.instruments = get_instrument_index()
         
         # Inicializar contadores
-        for api_id in self.apis.keys():
-            self.api_usage[api_id] = 0
-            self.api_reset_time[api_id] = datetime.now()
-            self.api_health[api_id] = {'status': 'healthy', 'last_check': datetime.now(), 'avg_response_time': 0.0, 'response_count': 0}
+        for api_id, config in self.apis.items():
+            self.rate_limiter.register(api_id, config['rate_limit'])
+            self.breakers.get(api_id, slow_call_seconds=config['timeout'] * 0.75)
+            self.api_health[api_id] = {'status': 'healthy', 'last_check': datetime.now()}
+        
+        # Latencias (EWMA + percentiles + tasa de error, por exchange y símbolo) y hedging
+        self.latency = LatencyTracker(track_symbols=True)
+        self.priority_bias = 0.15  # Penalización del score por cada nivel de prioridad
+        self.hedge_mode = hedge_mode
+        self.max_hedges = max_hedges
+        self.hedge_budget = HedgeBudget(ratio=hedge_budget_ratio, burst=5)
+        self._hedge_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='detector-hedge')
+        
+        # Snapshot bulk por exchange (una petición para todos los símbolos)
+        self.snapshot_mode = snapshot_mode
+        self.snapshots = TickerSnapshotStore(
+            self.apis,
+            ttl=snapshot_ttl,
+            can_fetch=self._acquire_snapshot_weight,
+            on_fetch=self._on_snapshot_fetch,
+            on_error=self.breakers.record_failure,
+            resolve_symbol=self._native_symbol
+        )
+        
+        # Motor asyncio (se crea al primer uso de las variantes *_async)
+        self._async_engine = None
+        
+        # Sesiones keep-alive compartidas con app.py (una por host de exchange)
+        self.http_sessions = get_session_registry()
+        if prewarm_connections:
+            self.http_sessions.prewarm(config['url_template'] for config in self.apis.values())
         
         print("🚀 Detector avanzado CORREGIDO inicializado")
         print(f"📊 APIs configuradas: {len(self.apis)}")
@@ -185,8 +267,8 @@ class AdvancedAPIDetectorFixed:
         return mexc_symbol.replace('/USDT:USDT', 'USDT').replace('/', '')
     
     def _format_okx_futures(self, mexc_symbol: str) -> str:
-        """BTC-USDT"""
-        return mexc_symbol.replace('/USDT:USDT', '-USDT').replace('/', '-')
+        """BTC-USDT-SWAP"""
+        return mexc_symbol.replace('/USDT:USDT', '-USDT-SWAP').replace('/', '-')
     
     def _format_kucoin_futures(self, mexc_symbol: str) -> str:
         """BTCUSDTM"""
@@ -211,118 +293,124 @@ class AdvancedAPIDetectorFixed:
         """BTC_USDT"""
         return mexc_symbol.replace('/USDT:USDT', '_USDT').replace('/', '_')
     
+    def _native_symbol(self, api_id: str, mexc_symbol: str) -> str:
+        """Símbolo nativo del índice de instrumentos (o el formateador si no está indexado)"""
+        native = self.instruments.native_symbol(api_id, mexc_symbol)
+        if native is None:
+            native = self.apis[api_id]['format_symbol'](mexc_symbol)
+        return native
+    
+    def _is_unlisted(self, api_id: str, mexc_symbol: str) -> bool:
+        """El índice confirma que el exchange NO lista el contrato"""
+        return self.instruments.is_listed(api_id, mexc_symbol) is False
+    
     def _can_use_api(self, api_id: str) -> bool:
-        """Verifica si se puede usar una API (rate limiting)"""
-        now = datetime.now()
-        config = self.apis[api_id]
-        
-        # Reset contador si ha pasado un minuto
-        if now - self.api_reset_time[api_id] >= timedelta(minutes=1):
-            self.api_usage[api_id] = 0
-            self.api_reset_time[api_id] = now
-        
-        # Verificar límite (usar 80% del límite para seguridad)
-        safe_limit = int(config['rate_limit'] * 0.8)
-        return self.api_usage[api_id] < safe_limit
+        """Verifica si se puede usar una API (rate limiting, sin consumir tokens)"""
+        return self.rate_limiter.can_use(api_id, self.apis[api_id]['weight'])
+    
+    def _acquire_api(self, api_id: str, weight: int = 1) -> bool:
+        """Consume el peso de una petición del token bucket de la API"""
+        return self.rate_limiter.try_acquire(api_id, weight)
+    
+    def _acquire_snapshot_weight(self, api_id: str) -> bool:
+        """Consume el peso de la petición bulk antes de descargar el snapshot"""
+        if not self.breakers.allow_request(api_id):
+            return False
+        if not self._acquire_api(api_id, self.apis[api_id].get('bulk_weight', 1)):
+            self.breakers.release_probe(api_id)  # La prueba half-open no salió: no dejarla tomada
+            return False
+        return True
+    
+    def _record_response(self, api_id: str, response, response_time: float):
+        """Registra una respuesta en el rate limiter y el circuit breaker"""
+        self.rate_limiter.update_from_response(api_id, response)
+        if is_breaker_failure(response.status_code):
+            self.breakers.record_failure(api_id)
+        else:
+            self.breakers.record_success(api_id, response_time)
     
-    def _increment_api_usage(self, api_id: str, weight: int = 1):
-        """Incrementa el contador de uso de una API"""
-        self.api_usage[api_id] += weight
+    def _on_snapshot_fetch(self, api_id: str, response, response_time: float):
+        """Ajusta rate limit y breaker con la respuesta bulk"""
+        self._record_response(api_id, response, response_time)
+    
+    def _priority_bias(self) -> Dict[str, float]:
+        """Multiplicador del score por prioridad: a igual latencia gana la de mejor prioridad"""
+        return {api_id: 1 + self.priority_bias * (config['priority'] - 1) for api_id, config in self.apis.items()}
+    
+    def _sorted_fallback_apis(self, mexc_symbol: str = None) -> List[str]:
+        """APIs por coste esperado (latencia EWMA + errores), sin las de breaker abierto (half-open al final)"""
+        self.instruments.maybe_reload()
+        sorted_apis = sorted(self.apis, key=lambda api_id: self.apis[api_id]['priority'])
+        api_ids = self.latency.rank(sorted_apis, mexc_symbol, bias=self._priority_bias())
+        if mexc_symbol is not None:
+            # Exchanges que no listan el contrato ni se prueban
+            api_ids = self.instruments.filter_listed(api_ids, mexc_symbol)
+        return self.breakers.order(api_ids)
     
     def _should_retry_failed_combination(self, mexc_symbol: str, api_id: str) -> bool:
         """Verifica si se debe reintentar una combinación fallida después de un tiempo"""
-        combination_key = f"{mexc_symbol}_{api_id}"
-        
-        if combination_key not in self.failure_timestamps:
-            return True
-        
-        # Reintentar después de 5 minutos
-        last_failure = self.failure_timestamps[combination_key]
-        return datetime.now() - last_failure >= timedelta(minutes=5)
+        return self.failures.should_retry(mexc_symbol, api_id)
     
     def _mark_combination_failed(self, mexc_symbol: str, api_id: str):
         """Marca una combinación como fallida con timestamp"""
-        combination_key = f"{mexc_symbol}_{api_id}"
-        self.failure_timestamps[combination_key] = datetime.now()
-        self.failed_combinations.add((mexc_symbol, api_id))
+        self.failures.mark_failed(mexc_symbol, api_id)
     
-    def _get_nested_value(self, data: dict, path: str):
-        """Obtiene valor anidado usando notación de puntos"""
-        try:
-            # Si data es una lista, acceder al primer elemento
-            if isinstance(data, list):
-                if len(data) == 0:
-                    return None
-                data = data[0]
-            
-            # Si data no es un diccionario, retornar None
-            if not isinstance(data, dict):
-                return None
-            
-            keys = path.split('.')
-            current = data
-            
-            for key in keys:
-                if key.isdigit():
-                    # Acceso a índice de lista
-                    if isinstance(current, list):
-                        current = current[int(key)]
-                    else:
-                        return None
-                else:
-                    # Acceso a clave de diccionario
-                    if isinstance(current, dict):
-                        current = current.get(key)
-                        if current is None:
-                            return None
-                    else:
-                        return None
-            
-            return float(current) if current is not None else None
-        except (KeyError, IndexError, ValueError, TypeError, AttributeError):
-            return None
+    def _set_token_api(self, mexc_symbol: str, api_id: str):
+        """Actualiza el mapeo copiándolo (los lectores nunca ven un dict a medio modificar)"""
+        with self._mapping_lock:
+            mapping = dict(self.token_api_mapping)
+            mapping[mexc_symbol] = api_id
+            self.token_api_mapping = mapping
+    
+    def _mark_healthy(self, api_id: str):
+        """Reemplaza el estado de salud de la API de una sola vez"""
+        self.api_health[api_id] = {'status': 'healthy', 'last_check': datetime.now()}
     
     def _test_api_endpoint(self, api_id: str, mexc_symbol: str) -> Tuple[Optional[float], str]:
         """Prueba un endpoint específico"""
         try:
             config = self.apis[api_id]
             
-            # Verificar rate limiting
-            if not self._can_use_api(api_id):
+            # Índice de instrumentos: el exchange no lista el contrato, no gastar petición
+            if self._is_unlisted(api_id, mexc_symbol):
+                return None, f"{config['name']}: HTTP 400 (no listado en el índice)"
+            
+            # Modo snapshot: resolver desde el ticker bulk en memoria
+            if self.snapshot_mode and self.snapshots.supports(api_id):
+                price, lookup_status = self.snapshots.lookup(api_id, mexc_symbol)
+                if lookup_status == LOOKUP_OK:
+                    return price, config['name']
+                if lookup_status == LOOKUP_NOT_LISTED:
+                    return None, f"{config['name']}: HTTP 400 (no listado en snapshot)"
+            
+            # Circuit breaker: no esperar timeouts de un exchange caído
+            if not self.breakers.allow_request(api_id):
+                return None, f"{config['name']}: Circuit breaker abierto"
+            
+            # Verificar rate limiting (consume el peso antes de salir)
+            if not self._acquire_api(api_id, config['weight']):
+                self.breakers.release_probe(api_id)  # La prueba half-open no salió: no dejarla tomada
                 return None, f"{config['name']}: Rate limit alcanzado"
             
             # Formatear símbolo
-            formatted_symbol = config['format_symbol'](mexc_symbol)
+            formatted_symbol = self._native_symbol(api_id, mexc_symbol)
             url = config['url_template'].format(symbol=formatted_symbol)
             
             # Realizar petición
             start_time = time.time()
-            response = requests.get(url, timeout=config['timeout'])
+            response = http_get(url, timeout=config['timeout'])
             response_time = time.time() - start_time
-            self._increment_api_usage(api_id, config['weight'])
+            self.latency.record(api_id, response_time, symbol=mexc_symbol,
+                                ok=not is_breaker_failure(response.status_code))
+            self._record_response(api_id, response, response_time)
             
             if response.status_code == 200:
-                data = response.json()
-                
-                # Extraer precio usando el path configurado
-                if '.' in config['price_path']:
-                    price = self._get_nested_value(data, config['price_path'])
-                else:
-                    # Para arrays simples como Gate.io
-                    if isinstance(data, list) and len(data) > 0:
-                        price = float(data[0].get(config['price_path'], 0))
-                    else:
-                        price = float(data.get(config['price_path'], 0))
+                # Extraer precio con el extractor compilado del exchange
+                price = config['extract_price'](decode_json(response.content))
                 
                 if price and price > 0:
-                    # Actualizar salud y tiempo de respuesta
-                    self.api_health[api_id]['status'] = 'healthy'
-                    self.api_health[api_id]['last_check'] = datetime.now()
-                    old_avg = self.api_health[api_id]['avg_response_time']
-                    count = self.api_health[api_id]['response_count'] + 1
-                    new_avg = (old_avg * (count - 1) + response_time) / count
-                    self.api_health[api_id]['avg_response_time'] = new_avg
-                    self.api_health[api_id]['response_count'] = count
+                    # Actualizar salud (la latencia ya quedó en self.latency)
+                    self._mark_healthy(api_id)
                     return price, config['name']
                 else:
                     return None, f"{config['name']}: Precio inválido ({price})"
@@ -330,8 +418,12 @@ class AdvancedAPIDetectorFixed:
                 return None, f"{config['name']}: HTTP {response.status_code}"
                 
         except requests.exceptions.Timeout:
+            self.latency.record(api_id, config['timeout'], symbol=mexc_symbol, ok=False)
+            self.breakers.record_failure(api_id)
             return None, f"{config['name']}: Timeout"
         except requests.exceptions.RequestException as e:
+            self.latency.record_error(api_id, symbol=mexc_symbol)
+            self.breakers.record_failure(api_id)
             return None, f"{config['name']}: Error de conexión"
         except Exception as e:
             return None, f"{config['name']}: Error - {str(e)}"
@@ -348,6 +440,10 @@ class AdvancedAPIDetectorFixed:
         try:
             assigned_api, was_reassigned = self.balancer.assign_api_to_token(mexc_symbol)
 
+            if assigned_api and self._is_unlisted(assigned_api, mexc_symbol):
+                print(f"   🗂️  {self.apis[assigned_api]['name']} no lista {mexc_symbol} (índice), usando fallback")
+                assigned_api = None
+
             if assigned_api:
                 api_name = self.apis[assigned_api]['name']
                 status = "🔄 Reasignado" if was_reassigned else "✅ Asignado"
@@ -372,10 +468,10 @@ class AdvancedAPIDetectorFixed:
         # 2. FALLBACK: Sistema tradicional si balanceador falla
         print(f"   🔄 Balanceador falló, usando fallback tradicional...")
 
-        # Probar APIs en orden de prioridad
-        sorted_apis = sorted(self.apis.items(), key=lambda x: (x[1]['priority'], self.api_health.get(x[0], {}).get('avg_response_time', 0.0)))
+        # Probar APIs en orden de prioridad (sin exchanges con breaker abierto)
+        for api_id in self._sorted_fallback_apis(mexc_symbol):
+            config = self.apis[api_id]
 
-        for api_id, config in sorted_apis:
             # Saltar si está marcado como fallido recientemente
             if not self._should_retry_failed_combination(mexc_symbol, api_id):
                 continue
@@ -389,11 +485,8 @@ class AdvancedAPIDetectorFixed:
 
             if price is not None:
                 # Éxito - guardar mapeo y limpiar fallos anteriores
-                self.token_api_mapping[mexc_symbol] = api_id
-                combination_key = f"{mexc_symbol}_{api_id}"
-                if combination_key in self.failure_timestamps:
-                    del self.failure_timestamps[combination_key]
-                self.failed_combinations.discard((mexc_symbol, api_id))
+                self._set_token_api(mexc_symbol, api_id)
+                self.failures.clear(mexc_symbol, api_id)
 
                 print(f"✅ {mexc_symbol} → {config['name']} (${price:.6f}) [Fallback]")
                 return api_id
@@ -414,6 +507,10 @@ class AdvancedAPIDetectorFixed:
             if api_id is None:
                 return None, "Token no disponible en ningún exchange"
         
+        # Hedging: si la API no responde en su p90, consultar la siguiente en paralelo
+        if self.hedge_mode:
+            return self._get_price_hedged(mexc_symbol, api_id)
+        
         # Usar API específica con fallback
         price, status = self._test_api_endpoint(api_id, mexc_symbol)
         
@@ -429,6 +526,148 @@ class AdvancedAPIDetectorFixed:
         
         return price, status
     
+    def _get_hedge_delay(self, api_id: str) -> float:
+        """Tiempo a esperar antes de lanzar un hedge: p90 observado de la API"""
+        p90 = self.latency.percentile(api_id, 0.9)
+        if p90 is None:
+            p90 = min(1.0, self.apis[api_id]['timeout'])
+        return max(0.05, p90)
+    
+    def _get_price_hedged(self, mexc_symbol: str, api_id: str) -> Tuple[Optional[float], str]:
+        """Precio con la API asignada primero y hedge hacia la siguiente mejor"""
+        candidates = [api_id]
+        for other_api in self._sorted_fallback_apis(mexc_symbol):
+            if other_api == api_id:
+                continue
+            if not self._should_retry_failed_combination(mexc_symbol, other_api):
+                continue
+            if not self._can_use_api(other_api):
+                continue
+            candidates.append(other_api)
+        
+        result, winner = hedged_call(
+            candidates,
+            lambda candidate, cancel_event: self._test_api_endpoint(candidate, mexc_symbol),
+            self._get_hedge_delay,
+            self._hedge_executor,
+            budget=self.hedge_budget,
+            max_hedges=self.max_hedges,
+            is_valid=lambda r: r is not None and r[0] is not None
+        )
+        
+        if winner is None:
+            self._mark_combination_failed(mexc_symbol, api_id)
+            status = result[1] if result else f"{mexc_symbol}: Ninguna API respondió"
+            return None, status
+        
+        if winner != api_id:
+            print(f"⚡ {mexc_symbol}: {self.apis[winner]['name']} ganó el hedge a {self.apis[api_id]['name']}")
+        return result
+    
+    def get_async_engine(self) -> AsyncPriceEngine:
+        """Motor asyncio con la misma configuración de APIs (requiere aiohttp)"""
+        if self._async_engine is None:
+            with self._async_engine_lock:
+                if self._async_engine is None:
+                    self._async_engine = AsyncPriceEngine(
+                        self.apis,
+                        api_order=self._async_api_order,
+                        resolve_symbol=self._native_symbol,
+                        snapshot_lookup=self._async_snapshot_lookup,
+                        admit=self._admit_request,
+                        release=self._release_request,
+                        on_response=self._on_async_response,
+                        on_error=self._on_async_error
+                    )
+        return self._async_engine
+    
+    def _async_api_order(self, mexc_symbol: str) -> List[str]:
+        """Mismo orden que el camino síncrono: la API mapeada primero y luego el fallback"""
+        api_ids = self._sorted_fallback_apis(mexc_symbol)
+        mapped = self.token_api_mapping.get(mexc_symbol)
+        if mapped in api_ids:
+            api_ids.remove(mapped)
+            api_ids.insert(0, mapped)
+        return api_ids
+    
+    def _async_snapshot_lookup(self, api_id: str, mexc_symbol: str) -> Tuple[bool, Optional[float]]:
+        """(resuelto, precio) desde el ticker bulk, igual que _test_api_endpoint"""
+        if not (self.snapshot_mode and self.snapshots.supports(api_id)):
+            return False, None
+        price, lookup_status = self.snapshots.lookup(api_id, mexc_symbol)
+        if lookup_status == LOOKUP_OK:
+            return True, price
+        return lookup_status == LOOKUP_NOT_LISTED, None
+    
+    def _admit_request(self, api_id: str, weight: float) -> bool:
+        """Circuit breaker + rate limiter antes de una petición del motor asyncio"""
+        if not self.breakers.allow_request(api_id):
+            return False
+        if not self._acquire_api(api_id, weight):
+            self.breakers.release_probe(api_id)  # La prueba half-open no salió: no dejarla tomada
+            return False
+        return True
+    
+    def _release_request(self, api_id: str):
+        """Petición admitida y cancelada sin respuesta (deadline del motor asyncio)"""
+        self.breakers.release_probe(api_id)
+        self.rate_limiter.release(api_id)
+    
+    def _on_async_response(self, api_id: str, response, response_time: float, mexc_symbol: str):
+        """Respuesta aiohttp (status en vez de status_code): latencias, rate limiter y breaker"""
+        failed = is_breaker_failure(response.status)
+        self.latency.record(api_id, response_time, symbol=mexc_symbol, ok=not failed)
+        self.rate_limiter.update_from_response(api_id, response)
+        if failed:
+            self.breakers.record_failure(api_id)
+        else:
+            self.breakers.record_success(api_id, response_time)
+    
+    def _on_async_error(self, api_id: str, mexc_symbol: str, timed_out: bool):
+        if timed_out:
+            self.latency.record(api_id, self.apis[api_id]['timeout'], symbol=mexc_symbol, ok=False)
+        else:
+            self.latency.record_error(api_id, symbol=mexc_symbol)
+        self.breakers.record_failure(api_id)
+    
+    async def get_current_price_async(self, mexc_symbol: str, api_id: str = None) -> Tuple[Optional[float], str]:
+        """Variante async de get_current_price (no bloquea un hilo por petición)"""
+        return await self.get_async_engine().get_current_price(mexc_symbol, api_id)
+    
+    async def detect_best_api_for_token_async(self, mexc_symbol: str) -> Optional[str]:
+        """Variante async de detect_best_api_for_token: prueba todas las APIs a la vez"""
+        api_id = await self.get_async_engine().detect_best_api_for_token(mexc_symbol)
+        if api_id is not None:
+            self._set_token_api(mexc_symbol, api_id)
+        return api_id
+    
+    def get_prices_from_snapshot(self, mexc_symbols: List[str]) -> Dict[str, Tuple[Optional[float], str]]:
+        """
+        Resuelve el precio de muchos símbolos desde los snapshots bulk
+        Como mucho una petición por exchange, sin importar cuántas señales haya
+        """
+        sorted_apis = sorted(
+            (api_id for api_id in self.apis if self.snapshots.supports(api_id)),
+            key=lambda api_id: self.apis[api_id]['priority']
+        )
+        
+        results = {}
+        for mexc_symbol in mexc_symbols:
+            candidates = self.instruments.filter_listed(sorted_apis, mexc_symbol)
+            assigned_api = self.token_api_mapping.get(mexc_symbol)
+            if assigned_api in candidates:
+                candidates.remove(assigned_api)
+                candidates.insert(0, assigned_api)
+            
+            results[mexc_symbol] = (None, "Token no disponible en ningún snapshot")
+            for api_id in candidates:
+                price, lookup_status = self.snapshots.lookup(api_id, mexc_symbol)
+                if lookup_status == LOOKUP_OK:
+                    results[mexc_symbol] = (price, self.apis[api_id]['name'])
+                    break
+        
+        return results
+    
     def get_detection_stats(self) -> Dict:
         """Obtiene estadísticas del detector"""
         now = datetime.now()
@@ -436,12 +675,14 @@ class AdvancedAPIDetectorFixed:
         # Calcular uso actual de APIs
         api_usage_stats = {}
         for api_id, config in self.apis.items():
-            usage_pct = (self.api_usage[api_id] / (config['rate_limit'] * 0.8)) * 100
+            usage = self.rate_limiter.get_usage(api_id)
             api_usage_stats[api_id] = {
                 'name': config['name'],
-                'usage': self.api_usage[api_id],
+                'usage': usage['used'],
                 'limit': config['rate_limit'],
-                'usage_pct': round(usage_pct, 1),
+                'usage_pct': usage['usage_pct'],
+                'available': usage['available'],
+                'rejections': usage['rejections'],
                 'can_use': self._can_use_api(api_id),
                 'health': self.api_health[api_id]['status']
             }
@@ -449,9 +690,15 @@ class AdvancedAPIDetectorFixed:
         return {
             'total_apis': len(self.apis),
             'tokens_mapped': len(self.token_api_mapping),
-            'failed_combinations': len(self.failed_combinations),
+            'failed_combinations': len(self.failures),
             'api_usage': api_usage_stats,
             'token_mappings': self.token_api_mapping.copy(),
+            'hedging': self.hedge_budget.get_stats() if self.hedge_mode else None,
+            'circuit_breakers': self.breakers.get_stats(),
+            'latency': self.latency.get_stats(),
+            'routing_order': self._sorted_fallback_apis(),
+            'balancer': self.balancer.get_stats(),
+            'instrument_index': self.instruments.get_stats(),
             'timestamp': now.isoformat()
         }
     
@@ -473,9 +720,10 @@ class AdvancedAPIDetectorFixed:
         """Muestra asignación de API solo cuando se asigna a una señal específica"""
         if api_id and api_id in self.apis:
             api_name = self.apis[api_id]['name']
-            usage = self.api_usage.get(api_id, 0)
+            usage_stats = self.rate_limiter.get_usage(api_id)
+            usage = usage_stats['used']
             limit = self.apis[api_id]['rate_limit']
-            usage_pct = (usage / (limit * 0.8)) * 100
+            usage_pct = usage_stats['usage_pct']
             
             print(f"\n📈 API ASIGNADA PARA SEGUIMIENTO:")
             print(f"   🎯 Token: {mexc_symbol}")
@@ -484,10 +732,13 @@ class AdvancedAPIDetectorFixed:
 
 # Instancia global
 _advanced_api_detector_fixed = None
+_advanced_api_detector_fixed_lock = threading.Lock()
 
 def get_advanced_api_detector_fixed() -> AdvancedAPIDetectorFixed:
     """Singleton para el detector avanzado corregido"""
     global _advanced_api_detector_fixed
     if _advanced_api_detector_fixed is None:
-        _advanced_api_detector_fixed = AdvancedAPIDetectorFixed()
+        with _advanced_api_detector_fixed_lock:
+            if _advanced_api_detector_fixed is None:
+                _advanced_api_detector_fixed = AdvancedAPIDetectorFixed()
     return _advanced_api_detector_fixed
\ No newline at end of file
@@ -0,0 +1,160 @@
+# core/api_balancer.py - Balanceador de tokens entre exchanges (rendezvous hashing ponderado por capacidad)
+import hashlib
+import math
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from core.circuit_breaker import get_circuit_breakers
+from core.instrument_index import base_asset, get_instrument_index
+from core.rate_limiter import get_rate_limiter
+
+
+def _hash_unit(token: str, api_id: str) -> float:
+    """Hash estable de (token, exchange) en el intervalo (0, 1)"""
+    digest = hashlib.blake2b(f"{token}:{api_id}".encode(), digest_size=8).digest()
+    return (int.from_bytes(digest, 'big') + 0.5) / 2 ** 64
+
+
+def rendezvous_score(token: str, api_id: str, weight: float) -> float:
+    """
+    Score de rendezvous hashing ponderado: el exchange con mayor score gana
+    Cada exchange recibe una fracción de tokens proporcional a su peso, y
+    cambiar el peso de uno solo mueve tokens desde/hacia ESE exchange.
+    """
+    return -weight / math.log(_hash_unit(token, api_id))
+
+
+class ApiBalancer:
+    """
+    Asigna cada token a un exchange y mantiene la asignación
+
+    - Nuevas asignaciones: rendezvous hashing con peso = rate_limit * margen
+      libre actual del token bucket (los exchanges con más capacidad reciben
+      más tokens)
+    - Las asignaciones son estables: un token solo se mueve si su exchange
+      deja de listarlo, tiene el breaker abierto o se satura
+    - Saturación: se mueve solo la fracción de tokens necesaria para volver
+      bajo el umbral, empezando por los de menor afinidad con ese exchange
+    """
+
+    def __init__(self, rate_limiter=None, breakers=None, instruments=None,
+                 saturation: float = 0.85, min_headroom: float = 0.05):
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.breakers = breakers or get_circuit_breakers()
+        self.instruments = instruments or get_instrument_index()
+        self.saturation = saturation  # Fracción del bucket usada a partir de la cual se reparte carga
+        self.min_headroom = min_headroom
+
+        self.assignments = {}  # token base -> api_id
+        self.reassignments = 0
+        self._episodes = {}  # api_id -> {'base': tokens al saturarse, 'moved': tokens movidos}
+        self._lock = threading.Lock()
+
+    def _usage_fraction(self, api_id: str) -> float:
+        return self.rate_limiter.get_usage(api_id)['usage_pct'] / 100
+
+    def _weight(self, api_id: str, limits: Dict[str, float]) -> float:
+        headroom = max(self.min_headroom, 1.0 - self._usage_fraction(api_id))
+        return limits[api_id] * headroom
+
+    def _eligible(self, token: str, api_ids: List[str]) -> List[str]:
+        return [
+            api_id for api_id in api_ids
+            if self.breakers.get(api_id).is_available()
+            and self.instruments.is_listed(api_id, token) is not False
+        ]
+
+    def _pick(self, token: str, api_ids: List[str], limits: Dict[str, float]) -> Optional[str]:
+        """Exchange ganador por rendezvous entre los no saturados (o entre todos si lo están)"""
+        unsaturated = [api_id for api_id in api_ids if self._usage_fraction(api_id) < self.saturation]
+        pool = unsaturated or api_ids
+        if not pool:
+            return None
+        return max(pool, key=lambda api_id: rendezvous_score(token, api_id, self._weight(api_id, limits)))
+
+    def _must_shed(self, token: str, api_id: str, usage: float) -> bool:
+        """Indica si el token está entre los que deben salir de un exchange saturado"""
+        tokens = [t for t, assigned in self.assignments.items() if assigned == api_id]
+        episode = self._episodes.get(api_id)
+        if episode is None:
+            episode = {'base': len(tokens), 'moved': 0}
+            self._episodes[api_id] = episode
+
+        excess = (usage - self.saturation) / usage if usage > 0 else 0.0
+        quota = max(1, math.ceil(episode['base'] * excess)) - episode['moved']
+        if quota <= 0:
+            return False
+
+        # Menor afinidad primero (el orden no depende del peso del exchange)
+        tokens.sort(key=lambda t: rendezvous_score(t, api_id, 1.0))
+        return token in tokens[:quota]
+
+    def assign_api_to_token(self, symbol: str, candidates: List[str] = None) -> Tuple[Optional[str], bool]:
+        """
+        Retorna (api_id asignada, fue_reasignado)
+        `symbol` puede venir como 'BTC/USDT:USDT' o 'BTC'
+        """
+        token = base_asset(symbol)
+        limits = self.rate_limiter.limits()
+        api_ids = [api_id for api_id in (candidates or limits) if api_id in limits]
+
+        with self._lock:
+            for api_id in list(self._episodes):
+                if self._usage_fraction(api_id) < self.saturation:
+                    del self._episodes[api_id]
+
+            eligible = self._eligible(token, api_ids)
+            current = self.assignments.get(token)
+
+            if current is not None and current in eligible:
+                usage = self._usage_fraction(current)
+                if usage < self.saturation or not self._must_shed(token, current, usage):
+                    return current, False
+
+            chosen = self._pick(token, [api_id for api_id in eligible if api_id != current] or eligible, limits)
+            if chosen is None:
+                return None, False
+
+            self.assignments[token] = chosen
+            reassigned = current is not None and chosen != current
+            if reassigned:
+                self.reassignments += 1
+                if current in self._episodes:
+                    self._episodes[current]['moved'] += 1
+            return chosen, reassigned
+
+    def release(self, symbol: str):
+        """Olvida la asignación de un token (p. ej. señal cerrada)"""
+        with self._lock:
+            self.assignments.pop(base_asset(symbol), None)
+
+    def get_distribution(self) -> Dict[str, int]:
+        with self._lock:
+            distribution = {}
+            for api_id in self.assignments.values():
+                distribution[api_id] = distribution.get(api_id, 0) + 1
+            return distribution
+
+    def get_stats(self) -> Dict:
+        limits = self.rate_limiter.limits()
+        return {
+            'tokens_assigned': len(self.assignments),
+            'api_distribution': self.get_distribution(),
+            'reassignments': self.reassignments,
+            'saturated': [api_id for api_id in limits if self._usage_fraction(api_id) >= self.saturation],
+            'weights': {api_id: round(self._weight(api_id, limits), 1) for api_id in limits}
+        }
+
+
+# Instancia global
+_api_balancer = None
+_api_balancer_lock = threading.Lock()
+
+def get_api_balancer() -> ApiBalancer:
+    """Singleton del balanceador (compartido por app.py y el detector)"""
+    global _api_balancer
+    if _api_balancer is None:
+        with _api_balancer_lock:
+            if _api_balancer is None:
+                _api_balancer = ApiBalancer()
+    return _api_balancer
@@ -0,0 +1,241 @@
+# core/async_price_engine.py - Motor de precios asyncio (cientos de peticiones a exchanges en vuelo sin un hilo por cada una)
+import asyncio
+import atexit
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Tuple
+
+from core.price_extractors import compile_price_path, decode_json
+
+try:
+    import aiohttp
+except ImportError:  # Dependencia opcional: sin aiohttp se usa el camino síncrono
+    aiohttp = None
+
+
+class AsyncPriceEngine:
+    """
+    Variante asyncio de get_current_price / detect_best_api_for_token
+
+    Una sola aiohttp.ClientSession (pool keep-alive compartido) sirve todas las
+    peticiones a exchanges; esperar a uno lento no bloquea ningún hilo. (Las
+    vistas async de Flask igual ocupan un hilo del servidor WSGI por petición
+    HTTP entrante: el ahorro es en las peticiones salientes.) Las URLs
+    salen de `apis_config`, así que se puede apuntar a un servidor HTTP local
+    para pruebas.
+
+    Pasa por los mismos controles que el camino síncrono (los provee quien lo crea):
+    - api_order(mexc_symbol): APIs en el orden del camino síncrono (asignada,
+      latencia, índice de instrumentos, breakers abiertos fuera)
+    - snapshot_lookup(api_id, mexc_symbol) -> (resuelto, precio): ticker bulk
+      en memoria antes de gastar una petición individual
+    - admit(api_id, peso): circuit breaker + rate limiter antes de salir
+    - release(api_id): devuelve lo que tomó admit si la petición se cancela
+      antes de tener respuesta (deadline de get_current_prices)
+    - on_response(api_id, response, latencia, mexc_symbol) / on_error(api_id,
+      mexc_symbol, timeout): alimentan rate limiter, breakers y latencias
+    """
+
+    def __init__(self, apis_config: Dict, api_order: Callable[[str], List[str]] = None,
+                 max_connections: int = 200, max_per_host: int = 50,
+                 resolve_symbol: Callable[[str, str], Optional[str]] = None,
+                 snapshot_lookup: Callable[[str, str], Tuple[bool, Optional[float]]] = None,
+                 admit: Callable[[str, float], bool] = None,
+                 release: Callable[[str], None] = None,
+                 on_response: Callable = None, on_error: Callable[[str, str, bool], None] = None):
+        if aiohttp is None:
+            raise RuntimeError("aiohttp no está instalado (pip install aiohttp)")
+
+        self.apis_config = apis_config
+        self.api_order = api_order
+        self.token_api_mapping = {}  # Detectadas por detect_best_api_for_token
+        self.resolve_symbol = resolve_symbol  # (api_id, mexc_symbol) -> símbolo nativo (índice de instrumentos)
+        self.snapshot_lookup = snapshot_lookup
+        self.admit = admit
+        self.release = release
+        self.on_response = on_response
+        self.on_error = on_error
+        self.max_connections = max_connections
+        self.max_per_host = max_per_host
+        self._session = None
+        self.request_count = 0
+
+    async def start(self):
+        """Crea la sesión HTTP (debe llamarse dentro del loop que la va a usar)"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_per_host,
+                ttl_dns_cache=300
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers={'Accept': 'application/json'}
+            )
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _sorted_apis(self, mexc_symbol: str, assigned_api: str = None) -> List[str]:
+        """Orden de api_order; la API pedida (o la detectada) primero si sigue en la lista"""
+        api_ids = list(self.api_order(mexc_symbol)) if self.api_order is not None else list(self.apis_config)
+        assigned = assigned_api or self.token_api_mapping.get(mexc_symbol)
+        if assigned in api_ids:
+            api_ids.remove(assigned)
+            api_ids.insert(0, assigned)
+        return api_ids
+
+    async def fetch_price(self, api_id: str, mexc_symbol: str) -> Tuple[Optional[float], str]:
+        """Consulta UNA API; retorna (precio, nombre API o motivo del fallo)"""
+        await self.start()
+        config = self.apis_config[api_id]
+
+        if self.snapshot_lookup is not None:
+            # La búsqueda puede descargar el ticker bulk (bloqueante): fuera del loop
+            resolved, price = await asyncio.get_running_loop().run_in_executor(
+                None, self.snapshot_lookup, api_id, mexc_symbol
+            )
+            if resolved:
+                if price is not None:
+                    return price, config['name']
+                return None, f"{config['name']}: HTTP 400 (no listado en snapshot)"
+
+        if self.admit is not None and not self.admit(api_id, config.get('weight', 1)):
+            return None, f"{config['name']}: Circuit breaker abierto o rate limit alcanzado"
+
+        formatted_symbol = None
+        if self.resolve_symbol is not None:
+            formatted_symbol = self.resolve_symbol(api_id, mexc_symbol)
+        if formatted_symbol is None:
+            formatted_symbol = config['format_symbol'](mexc_symbol)
+        url = config['url_template'].format(symbol=formatted_symbol)
+
+        settled = False  # Ya se informó respuesta o error: la cancelación no devuelve nada
+        try:
+            timeout = aiohttp.ClientTimeout(total=config['timeout'])
+            self.request_count += 1
+            started = time.monotonic()
+            async with self._session.get(url, timeout=timeout) as response:
+                settled = True
+                if self.on_response is not None:
+                    self.on_response(api_id, response, time.monotonic() - started, mexc_symbol)
+                if response.status != 200:
+                    return None, f"{config['name']}: HTTP {response.status}"
+                data = decode_json(await response.read())
+
+            extract = config.get('extract_price') or compile_price_path(config['price_path'])
+            price = extract(data)
+            if price is not None and price > 0:
+                return price, config['name']
+            return None, f"{config['name']}: Precio inválido ({price})"
+
+        except asyncio.CancelledError:
+            # Deadline de get_current_prices: liberar el lugar en vuelo y la prueba half-open
+            if not settled and self.release is not None:
+                self.release(api_id)
+            raise
+        except asyncio.TimeoutError:
+            if self.on_error is not None:
+                self.on_error(api_id, mexc_symbol, True)
+            return None, f"{config['name']}: Timeout"
+        except aiohttp.ClientError:
+            if self.on_error is not None:
+                self.on_error(api_id, mexc_symbol, False)
+            return None, f"{config['name']}: Error de conexión"
+        except Exception as e:
+            return None, f"{config['name']}: Error - {str(e)[:50]}"
+
+    async def get_current_price(self, mexc_symbol: str, api_id: str = None) -> Tuple[Optional[float], str]:
+        """Precio con la API asignada primero y fallback en el orden de api_order"""
+        status = "Token no disponible en ningún exchange"
+        for candidate in self._sorted_apis(mexc_symbol, api_id):
+            price, status = await self.fetch_price(candidate, mexc_symbol)
+            if price is not None:
+                return price, status
+        return None, status
+
+    async def get_current_prices(self, mexc_symbols: List[str],
+                                 deadline: float = 8) -> Dict[str, Optional[float]]:
+        """Precios de muchos símbolos en paralelo bajo un deadline global"""
+        unique_symbols = list(dict.fromkeys(mexc_symbols))
+        tasks = {
+            symbol: asyncio.ensure_future(self.get_current_price(symbol))
+            for symbol in unique_symbols
+        }
+        if not tasks:
+            return {}
+
+        await asyncio.wait(tasks.values(), timeout=deadline)
+
+        prices = {}
+        for symbol, task in tasks.items():
+            if task.done() and not task.cancelled() and task.exception() is None:
+                prices[symbol] = task.result()[0]
+            else:
+                task.cancel()
+                prices[symbol] = None
+        return prices
+
+    async def detect_best_api_for_token(self, mexc_symbol: str) -> Optional[str]:
+        """
+        Consulta todas las APIs a la vez y se queda con la primera (según
+        api_order) que responda con precio válido
+        """
+        candidates = self._sorted_apis(mexc_symbol)
+        results = await asyncio.gather(
+            *(self.fetch_price(api_id, mexc_symbol) for api_id in candidates)
+        )
+        for api_id, (price, _status) in zip(candidates, results):
+            if price is not None:
+                self.token_api_mapping[mexc_symbol] = api_id
+                return api_id
+        return None
+
+
+class AsyncEngineRunner:
+    """
+    Ejecuta un AsyncPriceEngine en un event loop propio (un solo hilo)
+
+    Permite usarlo desde código síncrono o desde vistas async de Flask, que
+    crean un loop por petición y no pueden compartir la sesión aiohttp.
+    """
+
+    def __init__(self, engine: AsyncPriceEngine):
+        self.engine = engine
+        self.loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self.loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self.loop.run_forever, name='async-price-engine', daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+        self.submit(self.engine.start()).result()
+
+    def submit(self, coro) -> Future:
+        """Programa una corrutina en el loop del motor"""
+        if self._thread is None or not self._thread.is_alive():
+            self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout: float = None):
+        """Ejecuta una corrutina y espera su resultado (llamadas síncronas)"""
+        return self.submit(coro).result(timeout)
+
+    async def run_async(self, coro):
+        """Espera una corrutina del motor desde OTRO event loop"""
+        return await asyncio.wrap_future(self.submit(coro))
+
+    def stop(self):
+        if self.loop is None or not self.loop.is_running():
+            return
+        self.run(self.engine.close(), timeout=5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(5)
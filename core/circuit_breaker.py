@@ -0,0 +1,226 @@
+# core/circuit_breaker.py - Circuit breaker por exchange (closed / open / half-open)
+import threading
+import time
+from collections import deque
+from typing import Dict, List
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Orden de preferencia al armar la lista de fallback
+_STATE_ORDER = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker de un exchange
+
+    - CLOSED: todas las peticiones pasan; se registra el resultado en una
+      ventana deslizante. Si la tasa de error (timeouts, errores de conexión,
+      5xx, 429) o la de respuestas lentas supera el umbral, pasa a OPEN.
+    - OPEN: ninguna petición pasa durante `open_timeout` segundos. Una caída
+      del exchange cuesta UN timeout, no uno por símbolo y petición.
+    - HALF_OPEN: se deja pasar UNA sola petición de prueba; si va bien se
+      cierra, si falla vuelve a OPEN con un timeout mayor (backoff).
+    """
+
+    def __init__(self, name: str, error_rate_threshold: float = 0.5,
+                 slow_rate_threshold: float = 0.8, slow_call_seconds: float = None,
+                 min_requests: int = 4, window_seconds: float = 30,
+                 open_timeout: float = 15, max_open_timeout: float = 240,
+                 probe_timeout: float = 10):
+        self.name = name
+        self.error_rate_threshold = error_rate_threshold
+        self.slow_rate_threshold = slow_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.min_requests = min_requests
+        self.window_seconds = window_seconds
+        self.base_open_timeout = open_timeout
+        self.max_open_timeout = max_open_timeout
+        self.probe_timeout = probe_timeout
+
+        self.state = CLOSED
+        self.open_timeout = open_timeout
+        self.opened_at = 0.0
+        self.probe_started = None
+        self.trips = 0
+        self._outcomes = deque()  # (timestamp, ok, slow)
+        self._lock = threading.Lock()
+
+    def _prune(self, now: float):
+        while self._outcomes and now - self._outcomes[0][0] > self.window_seconds:
+            self._outcomes.popleft()
+
+    def _trip(self, now: float):
+        self.state = OPEN
+        self.opened_at = now
+        self.probe_started = None
+        self.trips += 1
+        self._outcomes.clear()
+        print(f"   🔌 Circuit breaker ABIERTO: {self.name} ({self.open_timeout:.0f}s)")
+
+    def allow_request(self) -> bool:
+        """Indica si se puede enviar una petición ahora (en HALF_OPEN reserva la prueba)"""
+        with self._lock:
+            now = time.monotonic()
+            if self.state == CLOSED:
+                return True
+
+            if self.state == OPEN:
+                if now - self.opened_at < self.open_timeout:
+                    return False
+                self.state = HALF_OPEN
+                self.probe_started = None
+
+            # HALF_OPEN: una sola prueba en vuelo (si se pierde, se libera tras probe_timeout)
+            if self.probe_started is not None and now - self.probe_started < self.probe_timeout:
+                return False
+            self.probe_started = now
+            return True
+
+    def release_probe(self):
+        """Devuelve la prueba half-open reservada que al final no se envió (p. ej. sin tokens)"""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self.probe_started = None
+
+    def is_available(self) -> bool:
+        """Como allow_request pero sin reservar la prueba (para ordenar listas)"""
+        with self._lock:
+            if self.state == OPEN:
+                return time.monotonic() - self.opened_at >= self.open_timeout
+            return True
+
+    def record_success(self, latency: float = None):
+        with self._lock:
+            now = time.monotonic()
+            slow = (self.slow_call_seconds is not None and latency is not None
+                    and latency >= self.slow_call_seconds)
+
+            if self.state == HALF_OPEN:
+                if slow:
+                    self.open_timeout = min(self.max_open_timeout, self.open_timeout * 2)
+                    self._trip(now)
+                    return
+                self.state = CLOSED
+                self.open_timeout = self.base_open_timeout
+                self.probe_started = None
+                self._outcomes.clear()
+                print(f"   🔌 Circuit breaker CERRADO: {self.name}")
+                return
+
+            self._outcomes.append((now, True, slow))
+            self._evaluate(now)
+
+    def record_failure(self):
+        with self._lock:
+            now = time.monotonic()
+            if self.state == HALF_OPEN:
+                self.open_timeout = min(self.max_open_timeout, self.open_timeout * 2)
+                self._trip(now)
+                return
+            if self.state == OPEN:
+                return
+
+            self._outcomes.append((now, False, False))
+            self._evaluate(now)
+
+    def _evaluate(self, now: float):
+        self._prune(now)
+        total = len(self._outcomes)
+        if total < self.min_requests:
+            return
+        errors = sum(1 for _, ok, _ in self._outcomes if not ok)
+        slow = sum(1 for _, ok, is_slow in self._outcomes if ok and is_slow)
+        if errors / total >= self.error_rate_threshold or slow / total >= self.slow_rate_threshold:
+            self._trip(now)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            now = time.monotonic()
+            self._prune(now)
+            total = len(self._outcomes)
+            errors = sum(1 for _, ok, _ in self._outcomes if not ok)
+            retry_in = None
+            if self.state == OPEN:
+                retry_in = round(max(0.0, self.open_timeout - (now - self.opened_at)), 1)
+            return {
+                'state': self.state,
+                'window_requests': total,
+                'error_rate': round(errors / total, 3) if total else 0.0,
+                'trips': self.trips,
+                'retry_in': retry_in
+            }
+
+
+class CircuitBreakerRegistry:
+    """Un circuit breaker por exchange, compartido por app.py y el detector"""
+
+    def __init__(self, **breaker_kwargs):
+        self.breaker_kwargs = breaker_kwargs
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def get(self, api_id: str, slow_call_seconds: float = None) -> CircuitBreaker:
+        breaker = self._breakers.get(api_id)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.get(api_id)
+                if breaker is None:
+                    kwargs = dict(self.breaker_kwargs)
+                    if slow_call_seconds is not None:
+                        kwargs['slow_call_seconds'] = slow_call_seconds
+                    breaker = CircuitBreaker(api_id, **kwargs)
+                    self._breakers[api_id] = breaker
+        return breaker
+
+    def allow_request(self, api_id: str) -> bool:
+        return self.get(api_id).allow_request()
+
+    def release_probe(self, api_id: str):
+        self.get(api_id).release_probe()
+
+    def record_success(self, api_id: str, latency: float = None):
+        self.get(api_id).record_success(latency)
+
+    def record_failure(self, api_id: str):
+        self.get(api_id).record_failure()
+
+    def order(self, api_ids: List[str]) -> List[str]:
+        """
+        Reordena la lista de fallback según el estado del breaker
+        (cerrados primero, luego half-open; los abiertos se descartan)
+        Mantiene el orden relativo original dentro de cada estado.
+        """
+        ranked = []
+        for index, api_id in enumerate(api_ids):
+            breaker = self.get(api_id)
+            if not breaker.is_available():
+                continue
+            ranked.append((_STATE_ORDER[breaker.state], index, api_id))
+        return [api_id for _, _, api_id in sorted(ranked)]
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {api_id: breaker.get_stats() for api_id, breaker in breakers.items()}
+
+
+def is_breaker_failure(status_code: int) -> bool:
+    """Status HTTP que cuentan como fallo del exchange (no del símbolo)"""
+    return status_code == 429 or status_code == 418 or status_code >= 500
+
+
+# Instancia global
+_circuit_breakers = None
+_circuit_breakers_lock = threading.Lock()
+
+def get_circuit_breakers() -> CircuitBreakerRegistry:
+    """Singleton del registro de circuit breakers"""
+    global _circuit_breakers
+    if _circuit_breakers is None:
+        with _circuit_breakers_lock:
+            if _circuit_breakers is None:
+                _circuit_breakers = CircuitBreakerRegistry()
+    return _circuit_breakers
@@ -0,0 +1,146 @@
+# core/compression.py - Compresión negociada de respuestas (gzip / brotli) y variantes precomprimidas
+import gzip
+import json
+import sys
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+try:
+    import brotli
+except ImportError:  # Dependencia opcional: sin brotli solo se ofrece gzip
+    brotli = None
+
+IDENTITY = 'identity'
+
+
+def available_encodings() -> List[str]:
+    """Codificaciones soportadas, en orden de preferencia del servidor"""
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+
+def compress(data: bytes, encoding: str, level: int) -> bytes:
+    """Comprime `data` con la codificación pedida ('gzip' nivel 1-9, 'br' calidad 0-11)"""
+    if encoding == 'gzip':
+        # mtime=0: mismo contenido -> mismos bytes (los ETag por variante siguen siendo válidos)
+        return gzip.compress(data, compresslevel=level, mtime=0)
+    if encoding == 'br' and brotli is not None:
+        return brotli.compress(data, quality=level)
+    raise ValueError(f"Codificación no soportada: {encoding}")
+
+
+class ResponseCompressor:
+    """
+    Compresión de respuestas según Accept-Encoding
+
+    - Solo se comprime por encima de `min_size` bytes: en payloads chicos el
+      CPU y las cabeceras cuestan más de lo que se ahorra
+    - Prefiere brotli si está instalado y el cliente lo acepta, si no gzip
+    - `precompress` arma todas las variantes de un contenido estático UNA vez
+      (el dashboard no se comprime en cada petición)
+    """
+
+    def __init__(self, min_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 5):
+        self.min_size = min_size
+        self.levels = {'gzip': gzip_level, 'br': brotli_quality}
+        self.encodings = available_encodings()
+        self._stats = {'compressed': 0, 'bytes_in': 0, 'bytes_out': 0, 'seconds': 0.0}
+        self._lock = threading.Lock()
+
+    def negotiate(self, accept_encodings) -> Optional[str]:
+        """
+        Mejor codificación aceptada por el cliente o None
+        `accept_encodings` es el objeto Accept de werkzeug (request.accept_encodings)
+        """
+        best, best_quality = None, 0
+        for encoding in self.encodings:
+            quality = accept_encodings[encoding]
+            if quality > best_quality:
+                best, best_quality = encoding, quality
+        return best
+
+    def compress(self, data: bytes, encoding: str) -> bytes:
+        started = time.perf_counter()
+        compressed = compress(data, encoding, self.levels[encoding])
+        with self._lock:
+            self._stats['compressed'] += 1
+            self._stats['bytes_in'] += len(data)
+            self._stats['bytes_out'] += len(compressed)
+            self._stats['seconds'] += time.perf_counter() - started
+        return compressed
+
+    def precompress(self, data: bytes, levels: Dict[str, int] = None) -> Dict[str, bytes]:
+        """{codificación: bytes} con todas las variantes (incluida 'identity')"""
+        levels = levels or {'gzip': 9, 'br': 11}
+        variants = {IDENTITY: data}
+        for encoding in self.encodings:
+            variants[encoding] = compress(data, encoding, levels[encoding])
+        return variants
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+        return {
+            'encodings': self.encodings,
+            'min_size': self.min_size,
+            'levels': {encoding: self.levels[encoding] for encoding in self.encodings},
+            'compressed': stats['compressed'],
+            'ratio': round(stats['bytes_out'] / stats['bytes_in'], 3) if stats['bytes_in'] else None,
+            'saved_kb': round((stats['bytes_in'] - stats['bytes_out']) / 1024, 1),
+            'cpu_ms': round(stats['seconds'] * 1000, 1)
+        }
+
+
+def _sample_operations(count: int = 200) -> bytes:
+    """Payload parecido al de /api/operations para el benchmark"""
+    signals = [
+        {
+            'id': i, 'symbol': f"T{i}", 'type': 'LONG' if i % 2 else 'SHORT',
+            'signal_type': 'LONG' if i % 2 else 'SHORT', 'entry': 1 + i / 7,
+            'current': 1 + i / 6.5, 'tp1': 1.1 + i / 7, 'tp': 1.1 + i / 7,
+            'sl': 0.9 + i / 7, 'confidence': 70 + i % 25, 'volume_ratio': 1.5,
+            'timestamp': f"2024-05-{1 + i % 28:02d}T12:{i % 60:02d}:00", 'stale': False
+        }
+        for i in range(count)
+    ]
+    return json.dumps({'success': True, 'data': signals, 'count': count}).encode()
+
+
+def benchmark(payload: bytes = None, rounds: int = 20,
+              levels: Iterable[int] = (1, 6, 9)) -> List[Dict]:
+    """
+    Costo de CPU vs bytes ahorrados por codificación y nivel
+    Retorna [{'encoding', 'level', 'bytes', 'ratio', 'ms'}]
+    """
+    payload = payload or _sample_operations()
+    results = []
+    candidates = [('gzip', level) for level in levels]
+    if brotli is not None:
+        candidates += [('br', quality) for quality in (1, 5, 11)]
+
+    for encoding, level in candidates:
+        started = time.perf_counter()
+        for _ in range(rounds):
+            compressed = compress(payload, encoding, level)
+        elapsed = (time.perf_counter() - started) / rounds
+        results.append({
+            'encoding': encoding,
+            'level': level,
+            'bytes': len(compressed),
+            'ratio': round(len(compressed) / len(payload), 3),
+            'ms': round(elapsed * 1000, 3)
+        })
+    return results
+
+
+if __name__ == "__main__":
+    # Uso: python -m core.compression [archivo]  (por defecto un payload sintético de /api/operations)
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], 'rb') as f:
+            data = f.read()
+    else:
+        data = _sample_operations()
+    print(f"🔬 Benchmark de compresión ({len(data) / 1024:.1f} KB, brotli: {'sí' if brotli is not None else 'no'})")
+    for row in benchmark(data):
+        print(f"   {row['encoding']:>4} nivel {row['level']:>2}: {row['bytes']:>7} bytes "
+              f"(ratio {row['ratio']:.3f}) en {row['ms']:.2f} ms")
@@ -0,0 +1,219 @@
+# core/db_connection.py - Pool acotado de conexiones SQLite persistentes (WAL + pragmas ajustados)
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+# Pragmas de cada conexión
+BUSY_TIMEOUT_MS = 5000  # Espera a que se libere un lock en vez de fallar con "database is locked"
+CACHE_SIZE_KB = 16384  # 16 MB de page cache por conexión
+MMAP_SIZE = 256 * 1024 * 1024  # Lecturas vía mmap (sin copiar páginas al cache)
+
+WAL_ENABLED = os.environ.get('SQLITE_WAL', '1') == '1'
+
+
+def configure_connection(conn: sqlite3.Connection, read_only: bool = False):
+    """
+    Aplica los pragmas de rendimiento a una conexión nueva
+
+    - WAL: los lectores no bloquean al escritor ni al revés (el modo queda
+      guardado en el archivo; si el archivo es de solo lectura se sigue en
+      el modo que tenga)
+    - synchronous=NORMAL: en WAL es seguro ante caídas del proceso y evita
+      un fsync por commit
+    - read_only: query_only impide escrituras accidentales desde la API
+    """
+    conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+    if WAL_ENABLED and not read_only:
+        try:
+            conn.execute("PRAGMA journal_mode = WAL")
+        except sqlite3.OperationalError:
+            pass  # Sistema de archivos de solo lectura (p. ej. Vercel)
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KB}")
+    conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    if read_only:
+        conn.execute("PRAGMA query_only = ON")
+
+
+def checkpoint(db_path: str) -> bool:
+    """
+    Vuelca el WAL al archivo principal (antes de copiar/subir signals.db a GitHub)
+    Retorna False si no se pudo completar (p. ej. un lector lo impidió)
+    """
+    try:
+        conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT_MS / 1000)
+        try:
+            busy, _log, _checkpointed = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+            return busy == 0
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        print(f"⚠️  No se pudo hacer checkpoint de {db_path}: {e}")
+        return False
+
+
+class ConnectionPool:
+    """
+    Conexiones reutilizables a una base SQLite
+
+    - Como mucho `size` conexiones abiertas; un hilo que pide una cuando están
+      todas en uso espera hasta `wait_timeout` segundos
+    - Cada conexión se configura UNA vez al abrirse (pragmas) y se reutiliza:
+      sin connect/close por consulta
+    - Una conexión la usa un solo hilo a la vez (la toma y la devuelve), así
+      que sirve igual para servidores con un hilo por petición
+    """
+
+    def __init__(self, db_path: str, size: int = 4, read_only: bool = False,
+                 row_factory=None, wait_timeout: float = 10.0):
+        self.db_path = db_path
+        self.size = size
+        self.read_only = read_only
+        self.row_factory = row_factory
+        self.wait_timeout = wait_timeout
+
+        self._idle = queue.LifoQueue()  # LIFO: la conexión más reciente tiene el cache caliente
+        self._open_count = 0
+        self._lock = threading.Lock()
+        self._stats = {'opened': 0, 'acquired': 0, 'waits': 0, 'discarded': 0}
+
+    def _connect(self, immutable: bool = False) -> sqlite3.Connection:
+        if immutable:
+            uri = f"file:{os.path.abspath(self.db_path)}?mode=ro&immutable=1"
+            return sqlite3.connect(uri, uri=True, check_same_thread=False)
+        return sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT_MS / 1000, check_same_thread=False)
+
+    def _open(self) -> sqlite3.Connection:
+        conn = self._connect()
+        try:
+            configure_connection(conn, self.read_only)
+            if self.read_only:
+                conn.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()
+        except sqlite3.OperationalError:
+            conn.close()
+            if not self.read_only:
+                raise
+            # Archivo en WAL sobre un sistema de solo lectura (deploy): abrirlo como inmutable
+            conn = self._connect(immutable=True)
+            configure_connection(conn, read_only=True)
+        if self.row_factory is not None:
+            conn.row_factory = self.row_factory
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_open = self._open_count < self.size
+            if can_open:
+                self._open_count += 1  # Reserva el lugar antes de abrir fuera del lock
+            else:
+                self._stats['waits'] += 1
+        if can_open:
+            try:
+                conn = self._open()
+            except Exception:
+                with self._lock:
+                    self._open_count -= 1
+                raise
+            with self._lock:
+                self._stats['opened'] += 1
+            return conn
+
+        try:
+            return self._idle.get(timeout=self.wait_timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError(f"Sin conexiones libres en el pool de {self.db_path}")
+
+    def _release(self, conn: sqlite3.Connection, broken: bool = False):
+        if not broken:
+            try:
+                if conn.in_transaction:
+                    conn.rollback()  # Transacción olvidada: no dejar locks tomados
+            except sqlite3.Error:
+                broken = True
+        if broken:
+            self._discard(conn)
+            return
+        self._idle.put(conn)
+
+    def _discard(self, conn: sqlite3.Connection):
+        with self._lock:
+            self._open_count -= 1
+            self._stats['discarded'] += 1
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Conexión prestada del pool (se devuelve al salir del with)"""
+        conn = self._acquire()
+        with self._lock:
+            self._stats['acquired'] += 1
+        broken = False
+        try:
+            yield conn
+        except sqlite3.Error as e:
+            # Conexión cerrada o archivo corrupto: no reciclarla (locks y constraints no cuentan)
+            broken = isinstance(e, sqlite3.ProgrammingError) or type(e) is sqlite3.DatabaseError
+            raise
+        finally:
+            self._release(conn, broken)
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Conexión con BEGIN IMMEDIATE: commit al salir, rollback si hubo excepción"""
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+
+    def close_all(self):
+        """Cierra las conexiones libres (las prestadas se cierran al devolverse)"""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['open'] = self._open_count
+        stats['idle'] = self._idle.qsize()
+        stats['size'] = self.size
+        stats['read_only'] = self.read_only
+        return stats
+
+
+# Pools globales por (archivo, modo)
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_connection_pool(db_path: str, read_only: bool = False, size: Optional[int] = None,
+                        row_factory=None) -> ConnectionPool:
+    """Pool compartido para un archivo (uno de lectura/escritura y otro de solo lectura)"""
+    key = (os.path.abspath(db_path), read_only, row_factory)
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = ConnectionPool(db_path, size=size or (8 if read_only else 2),
+                                      read_only=read_only, row_factory=row_factory)
+                _pools[key] = pool
+    return pool
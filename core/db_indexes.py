@@ -0,0 +1,72 @@
+# core/db_indexes.py - Índices administrados de `signals` y verificación de planes de consulta
+import sqlite3
+from typing import Dict, List, Tuple, Union
+
+from core.signal_pages import build_page_query, encode_cursor
+
+# Índices administrados que dejan las migraciones (core/db_schema, DDL congelado en cada paso).
+# Es lo que las consultas de abajo esperan encontrar; test_db_indexes lo compara con la base migrada.
+SIGNAL_INDEXES: Tuple[str, ...] = (
+    # Dashboard (/api/operations, refresher, stream): parcial + cubriente,
+    # la consulta de señales activas no toca la tabla
+    'idx_signals_active_recent',
+    # Páginas de señales cerradas (?status=closed). Parcial: un índice (status, ...) completo
+    # también cubre status = 'active' y el planner lo elige en lugar del cubriente sin estadísticas
+    'idx_signals_closed_recent',
+    # ?status=all y las últimas señales de auto_sync_signals
+    'idx_signals_recent',
+    # ?symbol=
+    'idx_signals_symbol_recent',
+    # Conteos de /api/statistics sobre señales abiertas (activas o sin resultado)
+    'idx_signals_open',
+)
+
+# Campos que lee el dashboard (mismos que app.SIGNAL_FIELDS)
+DASHBOARD_FIELDS = [
+    'id', 'symbol', 'signal_type', 'entry', 'tp1', 'sl',
+    'confidence', 'status', 'created_at', 'ma_type', 'ma_length'
+]
+
+
+def query_plan(conn: sqlite3.Connection, query: str, params=()) -> List[str]:
+    """Detalle de EXPLAIN QUERY PLAN (una línea por paso)"""
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()]
+
+
+def plan_expectations() -> List[Tuple[str, str, tuple, Union[str, Tuple[str, ...]]]]:
+    """(nombre, consulta, parámetros, índice esperado o tupla de aceptables) de las consultas calientes"""
+    cursor = encode_cursor('2024-01-01 00:00:00', 1)
+    expectations = []
+    for label, filters, page_cursor, index in (
+        ('dashboard', {'status': 'active'}, None, 'idx_signals_active_recent'),
+        ('dashboard_deep_page', {'status': 'active'}, cursor, 'idx_signals_active_recent'),
+        # Si casi todo está cerrado, con estadísticas recorrer idx_signals_recent cuesta lo mismo
+        ('closed_page', {'status': 'closed'}, cursor, ('idx_signals_closed_recent', 'idx_signals_recent')),
+        ('all_page', {'status': 'all'}, cursor, 'idx_signals_recent'),
+    ):
+        query, params = build_page_query(DASHBOARD_FIELDS, filters, page_cursor, 20)
+        expectations.append((label, query, tuple(params), index))
+
+    expectations += [
+        ('active_count', "SELECT COUNT(*) FROM signals WHERE status = 'active' OR resultado IS NULL", (), 'idx_signals_open'),
+        ('long_count', "SELECT COUNT(*) FROM signals WHERE signal_type = 'LONG' AND (status = 'active' OR resultado IS NULL)", (), 'idx_signals_open'),
+        ('active_symbols', "SELECT symbol FROM signals WHERE status = 'active'", (), 'idx_signals_active_recent'),
+        ('recent_signals', "SELECT id, symbol, signal_type, status, resultado, created_at FROM signals ORDER BY created_at DESC LIMIT 5", (), 'idx_signals_recent'),
+    ]
+    return expectations
+
+
+def check_query_plans(conn: sqlite3.Connection) -> List[Dict]:
+    """
+    Verifica que cada consulta caliente use su índice (sin SCAN de la tabla ni B-tree temporal)
+    Retorna [{'query', 'index', 'plan', 'ok'}]
+    """
+    results = []
+    for label, query, params, index in plan_expectations():
+        indexes = (index,) if isinstance(index, str) else index
+        plan = query_plan(conn, query, params)
+        uses_index = any(f"INDEX {name}" in step for step in plan for name in indexes)
+        wasteful = any(step.strip() == 'SCAN signals' or 'TEMP B-TREE' in step for step in plan)
+        results.append({'query': label, 'index': ' | '.join(indexes), 'plan': plan,
+                        'ok': uses_index and not wasteful})
+    return results
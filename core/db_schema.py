@@ -0,0 +1,199 @@
+# core/db_schema.py - Migraciones versionadas de signals.db (PRAGMA user_version) y esquema cacheado
+import os
+import sqlite3
+import threading
+from typing import Callable, Dict, FrozenSet, List, Tuple
+
+
+def _create_signals_table(conn: sqlite3.Connection):
+    """Tabla de señales con estructura CORREGIDA"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS signals (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            symbol TEXT NOT NULL,
+            signal_type TEXT NOT NULL,
+            entry REAL NOT NULL,
+            tp1 REAL NOT NULL,
+            sl REAL NOT NULL,
+            confidence REAL NOT NULL,
+            rr_ratio REAL NOT NULL,
+
+            -- Indicadores técnicos CORREGIDOS
+            rsi REAL DEFAULT 50.0,
+            macd REAL DEFAULT 0.0,
+            macd_signal REAL DEFAULT 0.0,
+            macd_histogram REAL DEFAULT 0.0,
+            ema9 REAL,
+            ema21 REAL,
+            atr REAL,
+            volume_ratio REAL DEFAULT 1.0,
+            adx REAL DEFAULT 0.0,
+
+            -- Metadatos
+            fecha_envio TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            resultado TEXT,
+            strategy_version TEXT DEFAULT 'REPAIRED_v1.0',
+            emergency_mode BOOLEAN DEFAULT 1,
+
+            -- Seguimiento
+            seguimiento_json TEXT,
+            estado_json TEXT,
+            fecha_actualizacion TIMESTAMP
+        )
+    """)
+
+
+def _add_missing_columns(conn: sqlite3.Connection):
+    """Columnas agregadas después de la primera versión (bases viejas)"""
+    existing_columns = [row[1] for row in conn.execute("PRAGMA table_info(signals)").fetchall()]
+
+    columns_to_add = [
+        ("macd_signal", "REAL DEFAULT 0.0"),
+        ("macd_histogram", "REAL DEFAULT 0.0"),
+        ("ema9", "REAL"),
+        ("ema21", "REAL"),
+        ("atr", "REAL"),
+        ("volume_ratio", "REAL DEFAULT 1.0"),
+        ("adx", "REAL DEFAULT 0.0"),
+        ("ma_type", "TEXT DEFAULT 'SMA'"),
+        ("ma_length", "INTEGER DEFAULT 10"),
+        ("strategy_version", "TEXT DEFAULT 'REPAIRED_v1.0'"),
+        ("emergency_mode", "BOOLEAN DEFAULT 1"),
+        ("fecha_actualizacion", "TIMESTAMP")
+    ]
+
+    for column_name, column_def in columns_to_add:
+        if column_name not in existing_columns:
+            conn.execute(f"ALTER TABLE signals ADD COLUMN {column_name} {column_def}")
+            print(f"   ✅ Columna {column_name} agregada")
+
+
+def _fix_volume_ratios(conn: sqlite3.Connection):
+    """CORRECCIÓN CRÍTICA: volume_ratio = 0 o NULL -> 1.0 (save_signal ya valida los nuevos)"""
+    updated_rows = conn.execute("""
+        UPDATE signals
+        SET volume_ratio = 1.0
+        WHERE volume_ratio = 0 OR volume_ratio IS NULL
+    """).rowcount
+    if updated_rows > 0:
+        print(f"   🔧 {updated_rows} registros con volume_ratio corregidos (0 -> 1.0)")
+
+
+def _index_step(statements: List[Tuple[str, Tuple[str, ...], str]]) -> Callable[[sqlite3.Connection], None]:
+    """
+    Paso de índices con el DDL congelado: [(índice, columnas requeridas, sentencia)]
+    Las sentencias cuyas columnas no existen en esta base se omiten.
+    """
+    def step(conn: sqlite3.Connection):
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(signals)").fetchall()}
+        for index_name, required, statement in statements:
+            if not set(required) <= columns:
+                print(f"   ⏭️  Índice {index_name} omitido (faltan columnas)")
+                continue
+            conn.execute(statement)
+            if statement.startswith('DROP'):
+                print(f"   🗑️  Índice {index_name} eliminado")
+            else:
+                print(f"   ✅ Índice {index_name} creado")
+        # Estadísticas (sqlite_stat1) para el planner. Con la tabla vacía no escribe
+        # nada: los índices están pensados para que el plan correcto no dependa de ellas
+        conn.execute("ANALYZE signals")
+    return step
+
+
+# Índices administrados. El DDL va literal en cada paso: cambiar core/db_indexes
+# no reescribe lo que ya aplicó una migración publicada.
+_INDEXES_V4 = [
+    ('idx_signals_active_recent',
+     ('created_at', 'symbol', 'signal_type', 'entry', 'tp1', 'sl', 'confidence', 'status', 'ma_type', 'ma_length'),
+     """CREATE INDEX IF NOT EXISTS idx_signals_active_recent
+        ON signals (created_at DESC, id DESC, symbol, signal_type, entry, tp1, sl,
+                    confidence, status, ma_type, ma_length)
+        WHERE status = 'active'"""),
+    ('idx_signals_status_recent', ('status', 'created_at'),
+     "CREATE INDEX IF NOT EXISTS idx_signals_status_recent ON signals (status, created_at DESC, id DESC)"),
+    ('idx_signals_recent', ('created_at',),
+     "CREATE INDEX IF NOT EXISTS idx_signals_recent ON signals (created_at DESC, id DESC)"),
+    ('idx_signals_symbol_recent', ('symbol', 'created_at'),
+     "CREATE INDEX IF NOT EXISTS idx_signals_symbol_recent ON signals (symbol, created_at DESC, id DESC)"),
+    ('idx_signals_open', ('signal_type', 'status', 'resultado'),
+     """CREATE INDEX IF NOT EXISTS idx_signals_open
+        ON signals (signal_type, status, resultado)
+        WHERE status = 'active' OR resultado IS NULL"""),
+]
+
+_INDEXES_V5 = [
+    ('idx_signals_status_recent', (), "DROP INDEX IF EXISTS idx_signals_status_recent"),
+    ('idx_signals_closed_recent', ('status', 'created_at'),
+     """CREATE INDEX IF NOT EXISTS idx_signals_closed_recent
+        ON signals (created_at DESC, id DESC)
+        WHERE status = 'closed'"""),
+]
+
+
+# (versión, descripción, paso). Solo se agregan al final: nunca editar uno ya publicado.
+# Un cambio de índices es un paso nuevo con su DDL literal (y SIGNAL_INDEXES al día).
+MIGRATIONS: List[Tuple[int, str, Callable[[sqlite3.Connection], None]]] = [
+    (1, "tabla signals", _create_signals_table),
+    (2, "columnas de indicadores y metadatos", _add_missing_columns),
+    (3, "volume_ratio 0/NULL -> 1.0", _fix_volume_ratios),
+    (4, "índices administrados", _index_step(_INDEXES_V4)),
+    (5, "índice parcial de señales cerradas (reemplaza idx_signals_status_recent)", _index_step(_INDEXES_V5)),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection) -> List[int]:
+    """
+    Aplica las migraciones pendientes, cada una UNA vez y en su propia transacción
+    Con la base al día cuesta un solo PRAGMA user_version. Retorna las versiones aplicadas.
+    """
+    if get_schema_version(conn) >= SCHEMA_VERSION:
+        return []
+
+    applied = []
+    for version, description, step in MIGRATIONS:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Releer dentro del lock de escritura: otro proceso pudo migrar mientras tanto
+            if get_schema_version(conn) >= version:
+                conn.rollback()
+                continue
+            print(f"   🔄 Migración {version}: {description}")
+            step(conn)
+            conn.execute(f"PRAGMA user_version = {version}")
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        applied.append(version)
+
+    invalidate_schema_cache()
+    return applied
+
+
+# Esquema resuelto por archivo: PRAGMA table_info UNA vez por proceso
+_columns_cache: Dict[str, FrozenSet[str]] = {}
+_columns_lock = threading.Lock()
+
+def signal_columns(conn: sqlite3.Connection, db_path: str) -> FrozenSet[str]:
+    """Columnas de `signals` (cacheadas por archivo)"""
+    key = os.path.abspath(db_path)
+    columns = _columns_cache.get(key)
+    if columns is None:
+        with _columns_lock:
+            columns = _columns_cache.get(key)
+            if columns is None:
+                columns = frozenset(row[1] for row in conn.execute("PRAGMA table_info(signals)").fetchall())
+                if columns:  # Tabla todavía inexistente: no cachear
+                    _columns_cache[key] = columns
+    return columns
+
+
+def invalidate_schema_cache():
+    with _columns_lock:
+        _columns_cache.clear()
@@ -0,0 +1,84 @@
+# core/failure_memory.py - Memoria acotada de combinaciones (símbolo, exchange) fallidas con TTL
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Dict
+
+
+class _Stripe:
+    def __init__(self):
+        self.entries = OrderedDict()  # (símbolo, api_id) -> timestamp monotónico del fallo
+        self.lock = threading.Lock()
+
+
+class FailureMemory:
+    """
+    Recuerda qué combinaciones fallaron para no reintentarlas durante `ttl` segundos
+
+    - Lock striping: cada combinación cae en uno de `stripes` segmentos con su
+      propio lock, así hilos que consultan símbolos distintos no se bloquean
+    - Acotada: cada segmento guarda como mucho max_entries / stripes entradas
+      (se descarta la más antigua) y las vencidas se purgan al escribir
+    """
+
+    def __init__(self, ttl: float = 300, max_entries: int = 4096, stripes: int = 16):
+        self.ttl = ttl
+        self.stripes = [_Stripe() for _ in range(stripes)]
+        self.max_per_stripe = max(1, max_entries // stripes)
+
+    def _stripe(self, symbol: str, api_id: str) -> _Stripe:
+        return self.stripes[zlib.crc32(f"{symbol}_{api_id}".encode()) % len(self.stripes)]
+
+    def _purge(self, stripe: _Stripe, now: float):
+        # Las entradas están ordenadas por antigüedad: basta mirar el principio
+        while stripe.entries:
+            _key, failed_at = next(iter(stripe.entries.items()))
+            if now - failed_at < self.ttl:
+                break
+            stripe.entries.popitem(last=False)
+
+    def mark_failed(self, symbol: str, api_id: str):
+        stripe = self._stripe(symbol, api_id)
+        key = (symbol, api_id)
+        with stripe.lock:
+            now = time.monotonic()
+            stripe.entries.pop(key, None)
+            stripe.entries[key] = now
+            self._purge(stripe, now)
+            while len(stripe.entries) > self.max_per_stripe:
+                stripe.entries.popitem(last=False)
+
+    def should_retry(self, symbol: str, api_id: str) -> bool:
+        """True si la combinación no falló o ya pasó el TTL"""
+        stripe = self._stripe(symbol, api_id)
+        with stripe.lock:
+            failed_at = stripe.entries.get((symbol, api_id))
+            if failed_at is None:
+                return True
+            if time.monotonic() - failed_at >= self.ttl:
+                del stripe.entries[(symbol, api_id)]
+                return True
+            return False
+
+    def clear(self, symbol: str, api_id: str):
+        stripe = self._stripe(symbol, api_id)
+        with stripe.lock:
+            stripe.entries.pop((symbol, api_id), None)
+
+    def __len__(self) -> int:
+        """Combinaciones fallidas vigentes"""
+        now = time.monotonic()
+        total = 0
+        for stripe in self.stripes:
+            with stripe.lock:
+                self._purge(stripe, now)
+                total += len(stripe.entries)
+        return total
+
+    def get_stats(self) -> Dict:
+        return {
+            'active': len(self),
+            'ttl': self.ttl,
+            'max_entries': self.max_per_stripe * len(self.stripes)
+        }
@@ -0,0 +1,120 @@
+# core/hedging.py - Peticiones "hedged" entre exchanges (gana la primera respuesta válida)
+import threading
+from concurrent.futures import Executor, FIRST_COMPLETED, wait
+from typing import Any, Callable, List, Optional, Tuple
+
+
+class HedgeBudget:
+    """
+    Presupuesto de hedges: cada petición primaria aporta `ratio` tokens y
+    cada hedge consume uno (máximo `burst` acumulados). Con ratio=0.1 los
+    hedges nunca superan ~10% de las peticiones y no se comen el rate limit.
+    """
+
+    def __init__(self, ratio: float = 0.1, burst: float = 5):
+        self.ratio = ratio
+        self.burst = burst
+        self._tokens = burst
+        self._lock = threading.Lock()
+        self.hedges_sent = 0
+        self.hedges_denied = 0
+
+    def on_primary(self):
+        """Registra una petición primaria"""
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + self.ratio)
+
+    def try_acquire(self) -> bool:
+        """Intenta gastar un token para lanzar un hedge"""
+        with self._lock:
+            if self._tokens >= 1:
+                self._tokens -= 1
+                self.hedges_sent += 1
+                return True
+            self.hedges_denied += 1
+            return False
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'ratio': self.ratio,
+                'tokens': round(self._tokens, 2),
+                'hedges_sent': self.hedges_sent,
+                'hedges_denied': self.hedges_denied
+            }
+
+
+def hedged_call(candidates: List[str],
+                fetch: Callable[[str, threading.Event], Any],
+                hedge_delay: Callable[[str], float],
+                executor: Executor,
+                budget: HedgeBudget = None,
+                max_hedges: int = 1,
+                is_valid: Callable[[Any], bool] = None) -> Tuple[Any, Optional[str]]:
+    """
+    Consulta `candidates` en orden con hedging
+
+    - Se lanza el primer candidato
+    - Si no responde en `hedge_delay(api_id)` (p. ej. su p90) y queda
+      presupuesto, se lanza el siguiente EN PARALELO
+    - Si un candidato falla, se pasa al siguiente sin esperar (fallback normal)
+    - Gana la primera respuesta válida; al resto se le avisa por `cancel_event`
+      y se descarta su resultado
+
+    Retorna (resultado, api_id ganador) o (último resultado, None)
+    """
+    if is_valid is None:
+        is_valid = lambda result: result is not None
+    if budget is not None:
+        budget.on_primary()
+
+    cancel_event = threading.Event()
+    remaining = list(candidates)
+    pending = {}  # future -> api_id
+    hedges = 0
+    last_result = None
+
+    def launch():
+        api_id = remaining.pop(0)
+        pending[executor.submit(fetch, api_id, cancel_event)] = api_id
+        return api_id
+
+    if not remaining:
+        return None, None
+    last_launched = launch()
+
+    try:
+        while pending:
+            can_hedge = remaining and hedges < max_hedges
+            timeout = hedge_delay(last_launched) if can_hedge else None
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            if not done:
+                # El candidato actual va lento: lanzar hedge si hay presupuesto
+                if budget is None or budget.try_acquire():
+                    hedges += 1
+                    last_launched = launch()
+                else:
+                    # Sin presupuesto: esperar a lo que ya está en vuelo
+                    hedges = max_hedges
+                continue
+
+            for future in done:
+                api_id = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception:
+                    result = None
+                if is_valid(result):
+                    return result, api_id
+                last_result = result
+
+            # Todo lo que estaba en vuelo falló: fallback inmediato al siguiente
+            if not pending and remaining:
+                last_launched = launch()
+
+        return last_result, None
+    finally:
+        cancel_event.set()
+        for future in pending:
+            future.cancel()
@@ -0,0 +1,127 @@
+# core/http_sessions.py - Sesiones HTTP keep-alive por exchange (compartidas por app.py y el detector)
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_POOL_SIZE = 16  # Conexiones por host (igual a la concurrencia de búsquedas)
+DEFAULT_RETRIES = 1  # Reintentos de conexión / 5xx a nivel de adapter
+
+
+class SessionRegistry:
+    """
+    Una requests.Session con pool keep-alive por host de exchange
+
+    Reutiliza la conexión TCP+TLS entre búsquedas de precio; los reintentos
+    (errores de conexión y 502/503/504) se configuran en el adapter. Nunca se
+    reintenta un 429/418 para no agravar un rate limit.
+    """
+
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE, retries: int = DEFAULT_RETRIES,
+                 backoff_factor: float = 0.1):
+        self.pool_size = pool_size
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self._sessions = {}  # host -> Session
+        self._lock = threading.Lock()
+
+    def configure(self, pool_size: int = None, retries: int = None):
+        """Ajusta pool/reintentos (afecta a las sesiones que se creen después)"""
+        if pool_size is not None:
+            self.pool_size = pool_size
+        if retries is not None:
+            self.retries = retries
+
+    def _build_session(self) -> requests.Session:
+        retry = Retry(
+            total=self.retries,
+            connect=self.retries,
+            read=0,
+            status=self.retries,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            backoff_factor=self.backoff_factor,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self.pool_size,
+            max_retries=retry
+        )
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update({'Accept': 'application/json', 'Connection': 'keep-alive'})
+        return session
+
+    def get_session(self, url: str) -> requests.Session:
+        """Sesión del host de la URL (se crea la primera vez)"""
+        host = urlparse(url).netloc
+        session = self._sessions.get(host)
+        if session is None:
+            with self._lock:
+                session = self._sessions.get(host)
+                if session is None:
+                    session = self._build_session()
+                    self._sessions[host] = session
+        return session
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """GET usando la sesión pooled del host"""
+        return self.get_session(url).get(url, **kwargs)
+
+    def prewarm(self, urls: Iterable[str], timeout: float = 5) -> Dict[str, bool]:
+        """Abre la conexión con cada host de antemano (handshake TCP+TLS fuera del request)"""
+        hosts = {}
+        for url in urls:
+            parsed = urlparse(url)
+            hosts.setdefault(parsed.netloc, f"{parsed.scheme}://{parsed.netloc}/")
+
+        def warm(root_url):
+            try:
+                self.get_session(root_url).head(root_url, timeout=timeout)
+                return True
+            except requests.exceptions.RequestException:
+                return False
+
+        if not hosts:
+            return {}
+        with ThreadPoolExecutor(max_workers=len(hosts)) as executor:
+            results = dict(zip(hosts.keys(), executor.map(warm, hosts.values())))
+
+        warmed = sum(1 for ok in results.values() if ok)
+        print(f"🔥 Conexiones precalentadas: {warmed}/{len(results)} hosts")
+        return results
+
+    def hosts(self) -> List[str]:
+        with self._lock:
+            return list(self._sessions.keys())
+
+    def close_all(self):
+        """Cierra todas las sesiones"""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+# Instancia global
+_session_registry = None
+_session_registry_lock = threading.Lock()
+
+def get_session_registry() -> SessionRegistry:
+    """Singleton del registro de sesiones"""
+    global _session_registry
+    if _session_registry is None:
+        with _session_registry_lock:
+            if _session_registry is None:
+                _session_registry = SessionRegistry()
+    return _session_registry
+
+def http_get(url: str, **kwargs) -> requests.Response:
+    """GET por la sesión keep-alive compartida del host"""
+    return get_session_registry().get(url, **kwargs)
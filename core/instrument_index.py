@@ -0,0 +1,382 @@
+# core/instrument_index.py - Índice de contratos listados por exchange (ruteo símbolo → exchange)
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from core.http_sessions import http_get as pooled_http_get
+
+
+def _binance_entry(entry: Dict):
+    if entry.get('contractType') != 'PERPETUAL' or entry.get('quoteAsset') != 'USDT':
+        return None
+    if entry.get('status') != 'TRADING':
+        return None
+    return entry.get('baseAsset'), entry.get('symbol')
+
+
+def _bybit_entry(entry: Dict):
+    if entry.get('contractType') != 'LinearPerpetual' or entry.get('quoteCoin') != 'USDT':
+        return None
+    if entry.get('status') != 'Trading':
+        return None
+    return entry.get('baseCoin'), entry.get('symbol')
+
+
+def _okx_entry(entry: Dict):
+    inst_id = entry.get('instId', '')
+    if entry.get('settleCcy') != 'USDT' or entry.get('state') != 'live':
+        return None
+    return inst_id.split('-')[0], inst_id
+
+
+def _kucoin_entry(entry: Dict):
+    if entry.get('settleCurrency') != 'USDT' or entry.get('isInverse'):
+        return None
+    if entry.get('status') != 'Open':
+        return None
+    base = entry.get('baseCurrency')
+    return ('BTC' if base == 'XBT' else base), entry.get('symbol')
+
+
+def _gate_entry(entry: Dict):
+    name = entry.get('name', '')
+    if entry.get('in_delisting') or not name.endswith('_USDT'):
+        return None
+    return name[:-len('_USDT')], name
+
+
+def _mexc_entry(entry: Dict):
+    if entry.get('settleCoin') != 'USDT' or entry.get('state') != 0:
+        return None
+    return entry.get('baseCoin'), entry.get('symbol')
+
+
+# Endpoint de listado de contratos USDT-M perpetuos por exchange
+INSTRUMENT_SOURCES = {
+    'binance_futures': {
+        'url': 'https://fapi.binance.com/fapi/v1/exchangeInfo',
+        'list_path': 'symbols',
+        'parse': _binance_entry
+    },
+    'bybit_futures': {
+        'url': 'https://api.bybit.com/v5/market/instruments-info?category=linear&limit=1000',
+        'list_path': 'result.list',
+        'parse': _bybit_entry
+    },
+    'okx_futures': {
+        'url': 'https://www.okx.com/api/v5/public/instruments?instType=SWAP',
+        'list_path': 'data',
+        'parse': _okx_entry
+    },
+    'kucoin_futures': {
+        'url': 'https://api-futures.kucoin.com/api/v1/contracts/active',
+        'list_path': 'data',
+        'parse': _kucoin_entry
+    },
+    'gate_futures': {
+        'url': 'https://api.gateio.ws/api/v4/futures/usdt/contracts',
+        'list_path': '',
+        'parse': _gate_entry
+    },
+    'mexc_futures': {
+        'url': 'https://contract.mexc.com/api/v1/contract/detail',
+        'list_path': 'data',
+        'parse': _mexc_entry
+    }
+}
+
+
+def _walk(data, path: str):
+    if not path:
+        return data
+    for key in path.split('.'):
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    return data
+
+
+def base_asset(symbol: str) -> str:
+    """'BTC/USDT:USDT' o 'BTC' -> 'BTC'"""
+    return symbol.split('/')[0].upper()
+
+
+class InstrumentIndex:
+    """
+    Índice {base: {api_id: símbolo nativo}} construido con el listado de
+    contratos de cada exchange
+
+    - Se persiste en JSON y se recarga en caliente si el archivo cambia
+      (otro proceso puede refrescarlo sin reiniciar la API)
+    - Un exchange que no responde conserva su listado anterior
+    - Para exchanges que nunca se indexaron, is_listed() retorna None y el
+      llamador usa su formateador de símbolos de siempre
+    - Es opcional: sin archivo el índice está vacío y no cambia el ruteo. Se
+      construye con INSTRUMENT_INDEX_REFRESH=1 en la API (refresco periódico)
+      o a mano con `python -m core.instrument_index`
+    """
+
+    def __init__(self, path: str = 'instrument_index.json', refresh_interval: float = 3600,
+                 http_get: Callable = None, reload_check_interval: float = 5,
+                 mapping_path: str = None):
+        self.path = path
+        self.mapping_path = mapping_path  # Si se indica, refresh() regenera token_api_mapping.json
+        self.refresh_interval = refresh_interval
+        self.http_get = http_get or pooled_http_get
+        self.reload_check_interval = reload_check_interval
+
+        self._routes = {}  # base -> {api_id: native}
+        self._venues = {}  # api_id -> timestamp epoch del último listado OK
+        self._mtime = None
+        self._last_reload_check = 0.0
+        self._lock = threading.Lock()
+        self._refresh_thread = None
+        self._stop = threading.Event()
+
+        self.load()
+
+    # ---------- Persistencia ----------
+
+    def load(self) -> bool:
+        """Carga el índice desde disco (si existe)"""
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return False
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            with self._lock:
+                self._routes = data.get('routes', {})
+                self._venues = data.get('venues', {})
+                self._mtime = mtime
+            print(f"🗂️  Índice de instrumentos cargado: {len(self._routes)} tokens, {len(self._venues)} exchanges")
+            return True
+        except Exception as e:
+            print(f"❌ Error cargando índice de instrumentos: {e}")
+            return False
+
+    def save(self):
+        """Guarda el índice de forma atómica (tmp + rename)"""
+        with self._lock:
+            data = {
+                'routes': self._routes,
+                'venues': self._venues,
+                'timestamp': datetime.now().isoformat(),
+                'total_tokens': len(self._routes)
+            }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        with self._lock:
+            self._mtime = os.path.getmtime(self.path)
+
+    def maybe_reload(self):
+        """Recarga si el archivo cambió (como mucho una comprobación cada pocos segundos)"""
+        now = time.monotonic()
+        if now - self._last_reload_check < self.reload_check_interval:
+            return
+        self._last_reload_check = now
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime != self._mtime:
+            self.load()
+
+    # ---------- Construcción ----------
+
+    def _fetch_venue(self, api_id: str) -> Optional[Dict[str, str]]:
+        source = INSTRUMENT_SOURCES[api_id]
+        try:
+            response = self.http_get(source['url'], timeout=10)
+            if response.status_code != 200:
+                print(f"   ⚠️  {api_id} (instrumentos): HTTP {response.status_code}")
+                return None
+            entries = _walk(response.json(), source['list_path'])
+            if not isinstance(entries, list):
+                return None
+
+            listing = {}
+            for entry in entries:
+                if not isinstance(entry, dict):
+                    continue
+                parsed = source['parse'](entry)
+                if parsed is None or not parsed[0] or not parsed[1]:
+                    continue
+                listing[parsed[0].upper()] = parsed[1]
+            return listing or None
+        except Exception as e:
+            print(f"   ⚠️  {api_id} (instrumentos): Error - {str(e)[:50]}")
+            return None
+
+    def refresh(self, api_ids: List[str] = None) -> Dict[str, int]:
+        """Descarga los listados (en paralelo), actualiza el índice y lo guarda"""
+        api_ids = [api_id for api_id in (api_ids or INSTRUMENT_SOURCES) if api_id in INSTRUMENT_SOURCES]
+        with ThreadPoolExecutor(max_workers=max(1, len(api_ids))) as executor:
+            listings = dict(zip(api_ids, executor.map(self._fetch_venue, api_ids)))
+
+        now = time.time()
+        with self._lock:
+            routes = {base: dict(venues) for base, venues in self._routes.items()}
+            for api_id, listing in listings.items():
+                if listing is None:
+                    continue  # Conservar el listado anterior del exchange
+                for venues in routes.values():
+                    venues.pop(api_id, None)
+                for base, native in listing.items():
+                    routes.setdefault(base, {})[api_id] = native
+                self._venues[api_id] = now
+            self._routes = {base: venues for base, venues in routes.items() if venues}
+
+        counts = {api_id: len(listing) if listing else 0 for api_id, listing in listings.items()}
+        print(f"🗂️  Índice de instrumentos actualizado: {counts}")
+        self.save()
+        if self.mapping_path:
+            self.export_token_api_mapping(self.mapping_path, current=self._read_mapping(self.mapping_path))
+        return counts
+
+    @staticmethod
+    def _read_mapping(path: str) -> Dict[str, str]:
+        try:
+            with open(path, 'r') as f:
+                return json.load(f).get('mapping', {})
+        except (OSError, ValueError):
+            return {}
+
+    def start_auto_refresh(self):
+        """Refresca el índice periódicamente en un hilo de fondo"""
+        if self._refresh_thread is not None and self._refresh_thread.is_alive():
+            return
+
+        def run():
+            while not self._stop.is_set():
+                try:
+                    self.refresh()
+                except Exception as e:
+                    print(f"❌ Error refrescando índice de instrumentos: {e}")
+                self._stop.wait(self.refresh_interval)
+
+        self._stop.clear()
+        self._refresh_thread = threading.Thread(target=run, name='instrument-index', daemon=True)
+        self._refresh_thread.start()
+
+    def stop_auto_refresh(self):
+        self._stop.set()
+
+    # ---------- Consultas ----------
+
+    def is_indexed(self, api_id: str) -> bool:
+        """El exchange tiene un listado conocido"""
+        return api_id in self._venues
+
+    def is_listed(self, api_id: str, symbol: str) -> Optional[bool]:
+        """True/False si el exchange está indexado; None si no hay información"""
+        if api_id not in self._venues:
+            return None
+        return api_id in self._routes.get(base_asset(symbol), {})
+
+    def native_symbol(self, api_id: str, symbol: str) -> Optional[str]:
+        """Símbolo nativo del exchange ('BTCUSDT', 'BTC-USDT-SWAP', 'XBTUSDTM'...)"""
+        return self._routes.get(base_asset(symbol), {}).get(api_id)
+
+    def venues_for(self, symbol: str) -> List[str]:
+        """Exchanges indexados que listan el símbolo"""
+        return list(self._routes.get(base_asset(symbol), {}).keys())
+
+    def filter_listed(self, api_ids: List[str], symbol: str) -> List[str]:
+        """Quita de la lista los exchanges indexados que NO listan el símbolo"""
+        return [api_id for api_id in api_ids if self.is_listed(api_id, symbol) is not False]
+
+    def build_token_api_mapping(self, tokens: List[str], current: Dict[str, str] = None,
+                                preferred_order: List[str] = None) -> Dict[str, str]:
+        """
+        Mapeo token -> exchange a partir del índice
+        Conserva la asignación actual si el exchange sigue listando el token;
+        si no, asigna el exchange que lo lista con menos tokens asignados.
+        """
+        current = current or {}
+        preferred_order = preferred_order or list(INSTRUMENT_SOURCES.keys())
+        mapping = {}
+        load = {api_id: 0 for api_id in preferred_order}
+
+        for token in tokens:
+            assigned = current.get(token)
+            if assigned and self.is_listed(assigned, token) is not False:
+                mapping[token] = assigned
+                load[assigned] = load.get(assigned, 0) + 1
+
+        for token in tokens:
+            if token in mapping:
+                continue
+            venues = [api_id for api_id in preferred_order if self.is_listed(api_id, token)]
+            if not venues:
+                continue
+            best = min(venues, key=lambda api_id: (load.get(api_id, 0), preferred_order.index(api_id)))
+            mapping[token] = best
+            load[best] = load.get(best, 0) + 1
+
+        return mapping
+
+    def export_token_api_mapping(self, path: str, tokens: List[str] = None,
+                                 current: Dict[str, str] = None) -> Dict[str, str]:
+        """Regenera token_api_mapping.json desde el índice (mismo formato de siempre)"""
+        if tokens is None:
+            tokens = sorted(current.keys()) if current else sorted(self._routes.keys())
+        mapping = self.build_token_api_mapping(tokens, current)
+
+        distribution = {}
+        for api_id in mapping.values():
+            distribution[api_id] = distribution.get(api_id, 0) + 1
+
+        data = {
+            'mapping': mapping,
+            'timestamp': datetime.now().isoformat(),
+            'total_tokens': len(mapping),
+            'api_distribution': distribution
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+        print(f"✅ {path} regenerado desde el índice: {len(mapping)} tokens")
+        return mapping
+
+    def get_stats(self) -> Dict:
+        venue_counts = {}
+        for venues in self._routes.values():
+            for api_id in venues:
+                venue_counts[api_id] = venue_counts.get(api_id, 0) + 1
+        return {
+            'tokens': len(self._routes),
+            'venues': venue_counts,
+            'refreshed_at': {api_id: datetime.fromtimestamp(ts).isoformat() for api_id, ts in self._venues.items()}
+        }
+
+
+# Instancia global
+_instrument_index = None
+_instrument_index_lock = threading.Lock()
+
+def get_instrument_index() -> InstrumentIndex:
+    """Singleton del índice (ruta configurable con INSTRUMENT_INDEX_PATH)"""
+    global _instrument_index
+    if _instrument_index is None:
+        with _instrument_index_lock:
+            if _instrument_index is None:
+                _instrument_index = InstrumentIndex(
+                    path=os.environ.get('INSTRUMENT_INDEX_PATH', 'instrument_index.json'),
+                    refresh_interval=float(os.environ.get('INSTRUMENT_INDEX_INTERVAL', '3600')),
+                    mapping_path='token_api_mapping.json'
+                )
+    return _instrument_index
+
+
+if __name__ == "__main__":
+    # Construye el índice y regenera token_api_mapping.json
+    get_instrument_index().refresh()
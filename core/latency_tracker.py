@@ -0,0 +1,229 @@
+# core/latency_tracker.py - Latencias por exchange (y por símbolo): EWMA, percentiles en streaming y tasa de error
+import math
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+
+class _LogSketch:
+    """
+    Histograma con buckets logarítmicos (error relativo ~`accuracy`)
+    Unos pocos cientos de contadores cubren de 0.1ms a 60s.
+    """
+
+    def __init__(self, accuracy: float = 0.02):
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets = {}  # índice -> cantidad
+        self.count = 0
+
+    def add(self, seconds: float):
+        index = math.ceil(math.log(max(seconds, 1e-4)) / self._log_gamma)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+
+    def value_at(self, index: int) -> float:
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+
+class _LatencySeries:
+    """
+    Métricas de UNA serie (exchange o exchange+símbolo)
+
+    - EWMA de latencia y de tasa de error (reaccionan en pocas decenas de
+      peticiones, a diferencia de una media acumulada)
+    - Percentiles desde dos sketches que rotan cada `sketch_window` muestras:
+      se consultan juntos, así siempre cubren entre 1 y 2 ventanas recientes
+    """
+
+    def __init__(self, alpha: float, sketch_window: int, accuracy: float):
+        self.alpha = alpha
+        self.sketch_window = sketch_window
+        self.accuracy = accuracy
+        self.ewma = None
+        self.error_rate = 0.0
+        self.samples = 0
+        self.errors = 0
+        self._current = _LogSketch(accuracy)
+        self._previous = None
+
+    def add(self, seconds: Optional[float], ok: bool):
+        self.samples += 1
+        if not ok:
+            self.errors += 1
+        self.error_rate += self.alpha * ((0.0 if ok else 1.0) - self.error_rate)
+
+        if seconds is None:
+            return
+        if self.ewma is None:
+            self.ewma = seconds
+        else:
+            self.ewma += self.alpha * (seconds - self.ewma)
+
+        self._current.add(seconds)
+        if self._current.count >= self.sketch_window:
+            self._previous = self._current
+            self._current = _LogSketch(self.accuracy)
+
+    def sketch_count(self) -> int:
+        return self._current.count + (self._previous.count if self._previous else 0)
+
+    def quantile(self, q: float) -> Optional[float]:
+        sketches = [self._current] if self._previous is None else [self._previous, self._current]
+        total = sum(sketch.count for sketch in sketches)
+        if total == 0:
+            return None
+
+        merged = {}
+        for sketch in sketches:
+            for index, count in sketch.buckets.items():
+                merged[index] = merged.get(index, 0) + count
+
+        rank = q * (total - 1)
+        seen = 0
+        for index in sorted(merged):
+            seen += merged[index]
+            if seen > rank:
+                return self._current.value_at(index)
+        return self._current.value_at(max(merged))
+
+
+class LatencyTracker:
+    """
+    Latencias observadas por exchange y, opcionalmente, por exchange+símbolo
+
+    score() combina EWMA de latencia y tasa de error en un "coste esperado"
+    por petición; rank() ordena una lista de exchanges con él. Los exchanges
+    sin muestras usan `default_latency`, así que también se exploran.
+    """
+
+    def __init__(self, window: int = 200, min_samples: int = 5, alpha: float = 0.2,
+                 accuracy: float = 0.02, track_symbols: bool = False,
+                 max_symbols: int = 1024, default_latency: float = 0.5,
+                 error_penalty: float = 4.0):
+        self.window = window  # Muestras por sketch antes de rotar
+        self.min_samples = min_samples
+        self.alpha = alpha
+        self.accuracy = accuracy
+        self.track_symbols = track_symbols
+        self.max_symbols = max_symbols
+        self.default_latency = default_latency
+        self.error_penalty = error_penalty
+
+        self._series = {}  # api_id -> _LatencySeries
+        self._symbol_series = OrderedDict()  # (api_id, símbolo) -> _LatencySeries (LRU)
+        self._lock = threading.Lock()
+
+    def _new_series(self) -> _LatencySeries:
+        return _LatencySeries(self.alpha, self.window, self.accuracy)
+
+    def _add(self, api_id: str, seconds: Optional[float], ok: bool, symbol: str = None):
+        with self._lock:
+            series = self._series.get(api_id)
+            if series is None:
+                series = self._new_series()
+                self._series[api_id] = series
+            series.add(seconds, ok)
+
+            if self.track_symbols and symbol is not None:
+                key = (api_id, symbol)
+                series = self._symbol_series.get(key)
+                if series is None:
+                    series = self._new_series()
+                    self._symbol_series[key] = series
+                    while len(self._symbol_series) > self.max_symbols:
+                        self._symbol_series.popitem(last=False)
+                else:
+                    self._symbol_series.move_to_end(key)
+                series.add(seconds, ok)
+
+    def record(self, api_id: str, seconds: float, symbol: str = None, ok: bool = True):
+        """Registra la latencia de una respuesta (ok=False para timeouts / 5xx / 429)"""
+        self._add(api_id, seconds, ok, symbol)
+
+    def record_error(self, api_id: str, symbol: str = None):
+        """Registra un fallo sin latencia útil (error de conexión)"""
+        self._add(api_id, None, False, symbol)
+
+    def percentile(self, api_id: str, q: float) -> Optional[float]:
+        """Percentil q (0-1) de las latencias recientes (None si hay pocas muestras)"""
+        with self._lock:
+            series = self._series.get(api_id)
+            if series is None or series.sketch_count() < self.min_samples:
+                return None
+            return series.quantile(q)
+
+    def ewma(self, api_id: str) -> Optional[float]:
+        with self._lock:
+            series = self._series.get(api_id)
+            return series.ewma if series is not None else None
+
+    def error_rate(self, api_id: str) -> float:
+        with self._lock:
+            series = self._series.get(api_id)
+            return series.error_rate if series is not None else 0.0
+
+    def score(self, api_id: str, symbol: str = None) -> float:
+        """Coste esperado (segundos) de una petición: EWMA penalizada por la tasa de error"""
+        with self._lock:
+            series = None
+            if symbol is not None:
+                series = self._symbol_series.get((api_id, symbol))
+                if series is not None and series.samples < self.min_samples:
+                    series = None
+            if series is None:
+                series = self._series.get(api_id)
+            if series is None or series.ewma is None:
+                latency = self.default_latency
+                error_rate = series.error_rate if series is not None else 0.0
+            else:
+                latency = series.ewma
+                error_rate = series.error_rate
+        return latency * (1 + self.error_penalty * error_rate)
+
+    def rank(self, api_ids: List[str], symbol: str = None, bias: Dict[str, float] = None) -> List[str]:
+        """
+        Ordena exchanges por coste esperado (menor primero)
+        `bias` multiplica el score por exchange (p. ej. para respetar la prioridad)
+        """
+        bias = bias or {}
+        scored = [
+            (self.score(api_id, symbol) * bias.get(api_id, 1.0), index, api_id)
+            for index, api_id in enumerate(api_ids)
+        ]
+        return [api_id for _, _, api_id in sorted(scored)]
+
+    @staticmethod
+    def _series_stats(series: _LatencySeries, enough: bool) -> Dict:
+        def ms(value):
+            return round(value * 1000, 1) if value is not None else None
+
+        return {
+            'samples': series.samples,
+            'ewma_ms': ms(series.ewma),
+            'p50_ms': ms(series.quantile(0.5)) if enough else None,
+            'p95_ms': ms(series.quantile(0.95)) if enough else None,
+            'p99_ms': ms(series.quantile(0.99)) if enough else None,
+            'error_rate': round(series.error_rate, 3),
+            'errors': series.errors
+        }
+
+    def get_stats(self) -> Dict:
+        """EWMA, p50/p95/p99 y tasa de error por exchange"""
+        with self._lock:
+            stats = {
+                api_id: self._series_stats(series, series.sketch_count() >= self.min_samples)
+                for api_id, series in self._series.items()
+            }
+        for api_id in stats:
+            stats[api_id]['score_ms'] = round(self.score(api_id) * 1000, 1)
+        return stats
+
+    def get_symbol_stats(self, symbol: str) -> Dict:
+        """Métricas por exchange para un símbolo (requiere track_symbols)"""
+        with self._lock:
+            return {
+                api_id: self._series_stats(series, series.sketch_count() >= self.min_samples)
+                for (api_id, series_symbol), series in self._symbol_series.items()
+                if series_symbol == symbol
+            }
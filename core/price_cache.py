@@ -0,0 +1,149 @@
+# core/price_cache.py - Caché de cotizaciones con TTL, LRU, single-flight y stale-while-revalidate
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+# Marca interna para cachear "sin precio" durante poco tiempo (caché negativa)
+_MISSING = object()
+
+
+class _Flight:
+    """Carga en curso para un símbolo (comparten resultado todos los que esperan)"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class QuoteCache:
+    """
+    Caché acotada de precios por símbolo
+
+    - TTL: un precio se considera fresco durante `ttl` segundos
+    - Stale-while-revalidate: durante `stale_ttl` segundos extra se sirve el
+      precio viejo al instante y se refresca en segundo plano
+    - Single-flight: misses concurrentes del mismo símbolo hacen UNA sola
+      llamada upstream y todos reciben el mismo resultado
+    - LRU: al superar `max_entries` se descarta el símbolo menos usado
+    """
+
+    def __init__(self, ttl: float = 30, stale_ttl: float = 120,
+                 max_entries: int = 512, negative_ttl: float = 10):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.negative_ttl = negative_ttl
+
+        self._entries = OrderedDict()  # symbol -> (valor, timestamp monotónico)
+        self._inflight = {}  # symbol -> _Flight
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'stale_hits': 0,
+            'misses': 0,
+            'loads': 0,
+            'load_errors': 0,
+            'evictions': 0
+        }
+
+    def get(self, key: str, loader: Callable[[str], Any]) -> Any:
+        """Devuelve el valor cacheado o lo carga con `loader(key)`"""
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, fetched_at = entry
+                age = now - fetched_at
+
+                if value is _MISSING:
+                    if age < self.negative_ttl:
+                        self._entries.move_to_end(key)
+                        self._stats['hits'] += 1
+                        return None
+                elif age < self.ttl:
+                    self._entries.move_to_end(key)
+                    self._stats['hits'] += 1
+                    return value
+                elif age < self.ttl + self.stale_ttl:
+                    # Servir precio viejo y revalidar en segundo plano
+                    self._entries.move_to_end(key)
+                    self._stats['stale_hits'] += 1
+                    if key not in self._inflight:
+                        flight = _Flight()
+                        self._inflight[key] = flight
+                        threading.Thread(
+                            target=self._load,
+                            args=(key, loader, flight),
+                            daemon=True
+                        ).start()
+                    return value
+
+            self._stats['misses'] += 1
+            flight = self._inflight.get(key)
+            is_leader = flight is None
+            if is_leader:
+                flight = _Flight()
+                self._inflight[key] = flight
+
+        if is_leader:
+            self._load(key, loader, flight)
+        else:
+            flight.event.wait()
+
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    def _load(self, key: str, loader: Callable[[str], Any], flight: _Flight):
+        """Ejecuta la carga upstream y publica el resultado"""
+        try:
+            value = loader(key)
+            flight.value = value
+            self.set(key, value)
+            with self._lock:
+                self._stats['loads'] += 1
+        except Exception as e:
+            flight.error = e
+            with self._lock:
+                self._stats['load_errors'] += 1
+        finally:
+            with self._lock:
+                if self._inflight.get(key) is flight:
+                    del self._inflight[key]
+            flight.event.set()
+
+    def set(self, key: str, value: Any):
+        """Guarda un valor (None se guarda como caché negativa)"""
+        stored = _MISSING if value is None else value
+        with self._lock:
+            self._entries[key] = (stored, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def get_if_fresh(self, key: str) -> Optional[Any]:
+        """Devuelve el valor solo si está dentro del TTL (sin cargar nada)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] is _MISSING:
+                return None
+            if time.monotonic() - entry[1] >= self.ttl:
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return entry[0]
+
+    def get_stats(self) -> Dict:
+        """Estadísticas de uso de la caché"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+            stats['inflight'] = len(self._inflight)
+        stats['ttl'] = self.ttl
+        stats['stale_ttl'] = self.stale_ttl
+        stats['max_entries'] = self.max_entries
+        return stats
@@ -0,0 +1,279 @@
+# core/price_extractors.py - Extractores de precio compilados e indexado rápido de payloads bulk
+import json
+import time
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import orjson
+except ImportError:  # Dependencia opcional: sin orjson se usa json estándar
+    orjson = None
+
+
+def decode_json(raw):
+    """Decodifica JSON (bytes o str) con orjson si está instalado"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _walk_list(data, path: str):
+    """Recorre un path con notación de puntos ('' = raíz; dígitos = índice en listas)"""
+    if not path:
+        return data
+    for key in path.split('.'):
+        if key.isdigit():
+            if not isinstance(data, list):
+                return None
+            data = data[int(key)]
+        elif isinstance(data, dict):
+            data = data.get(key)
+        else:
+            return None
+        if data is None:
+            return None
+    return data
+
+
+def walk_price_path(data, path: str) -> Optional[float]:
+    """
+    Implementación de referencia (sin compilar) con las reglas de siempre:
+    lista -> primer elemento, claves con notación de puntos, dígitos = índice
+    Se conserva para el micro-benchmark y como especificación.
+    """
+    if isinstance(data, list):
+        if len(data) == 0:
+            return None
+        data = data[0]
+    if not isinstance(data, dict):
+        return None
+    try:
+        current = _walk_list(data, path)
+        return float(current) if current is not None else None
+    except (IndexError, ValueError, TypeError):
+        return None
+
+
+@lru_cache(maxsize=None)
+def compile_price_path(path: str) -> Callable[[Any], Optional[float]]:
+    """
+    Compila un price_path en un extractor (el path se parsea UNA vez)
+
+    - 'data.0.last': como walk_price_path
+    - 'price' (sin puntos): dict -> data.get('price', 0); lista -> primer elemento
+    - '6' (un solo índice): arrays planos tipo Bitfinex -> data[6]
+    """
+    if '.' not in path:
+        if path.isdigit():
+            position = int(path)
+
+            def extract_index(data):
+                try:
+                    return float(data[position]) if isinstance(data, list) else None
+                except (IndexError, ValueError, TypeError):
+                    return None
+            return extract_index
+
+        def extract_key(data):
+            try:
+                if isinstance(data, list):
+                    if not data:
+                        return None
+                    data = data[0]
+                if not isinstance(data, dict):
+                    return None
+                return float(data.get(path, 0))
+            except (ValueError, TypeError):
+                return None
+        return extract_key
+
+    # Dígitos -> int: data[int] solo funciona en listas y data[str] solo en dicts,
+    # así que un único acceso por subíndice cubre las dos ramas del walk original
+    keys = tuple(int(key) if key.isdigit() else key for key in path.split('.'))
+
+    def extract_path(data):
+        if isinstance(data, list):
+            if not data:
+                return None
+            data = data[0]
+        if not isinstance(data, dict):
+            return None
+        try:
+            for key in keys:
+                data = data[key]
+            return float(data) if data is not None else None
+        except (KeyError, IndexError, ValueError, TypeError):
+            return None
+    return extract_path
+
+
+def compile_price_paths(apis_config: Dict):
+    """Añade 'extract_price' a cada exchange de la configuración"""
+    for config in apis_config.values():
+        config['extract_price'] = compile_price_path(config['price_path'])
+    return apis_config
+
+
+def extract_price(data, path: str) -> Optional[float]:
+    """Extrae el precio con un path (usa el extractor compilado cacheado)"""
+    return compile_price_path(path)(data)
+
+
+def _to_price(raw_price) -> Optional[float]:
+    try:
+        price = float(raw_price)
+    except (ValueError, TypeError):
+        return None
+    return price if price > 0 else None
+
+
+def index_bulk_payload(data, config: Dict) -> Dict[str, Any]:
+    """
+    {símbolo nativo: precio SIN convertir} en una sola pasada
+    La conversión a float se hace solo para los símbolos que se consultan.
+    """
+    entries = _walk_list(data, config.get('bulk_list_path', ''))
+    if not isinstance(entries, list):
+        return {}
+    symbol_key = config['bulk_symbol_key']
+    price_key = config['bulk_price_key']
+    return {
+        entry[symbol_key]: entry.get(price_key)
+        for entry in entries
+        if isinstance(entry, dict) and entry.get(symbol_key)
+    }
+
+
+class BulkIndex:
+    """
+    Vista de un payload bulk indexada por símbolo nativo (interfaz tipo dict: get / in / len)
+
+    - Modo selectivo: NO decodifica el payload completo. Cada símbolo pedido
+      se busca en los bytes crudos ('"symbol":"BTCUSDT"') y solo se decodifica
+      el objeto que lo contiene. Sirve para exchanges cuyas entradas son
+      objetos planos (sin objetos anidados), que es el caso de todos los
+      endpoints bulk configurados.
+    - Si el payload no encaja (espacios, objetos anidados, entrada que no
+      coincide), pasa a indexar todo en una sola pasada.
+    """
+
+    def __init__(self, raw: bytes, config: Dict, selective: bool = True):
+        self.raw = raw if isinstance(raw, bytes) else raw.encode()
+        self.config = config
+        self.symbol_key = config['bulk_symbol_key']
+        self.price_key = config['bulk_price_key']
+        self._key_pattern = f'"{self.symbol_key}":"'.encode()
+        self._prices = {}  # símbolo -> precio float (o None) ya resuelto
+        self._full = None  # {símbolo: precio crudo} si se indexó todo
+        self._size = None
+
+        if not selective or self._key_pattern not in self.raw:
+            self._index_all()
+
+    def _index_all(self):
+        if self._full is None:
+            self._full = index_bulk_payload(decode_json(self.raw), self.config)
+            self._size = len(self._full)
+
+    def _find_selective(self, native: str):
+        """Busca UNA entrada en los bytes crudos; retorna (encontrado, precio crudo) o None si no encaja"""
+        needle = self._key_pattern + native.encode() + b'"'
+        pos = self.raw.find(needle)
+        if pos < 0:
+            return False, None
+
+        start = self.raw.rfind(b'{', 0, pos)
+        end = self.raw.find(b'}', pos)
+        if start < 0 or end < 0:
+            return None
+        # Objeto plano: ni '}' antes del símbolo ni '{' después dentro de la entrada
+        if self.raw.find(b'}', start, pos) >= 0 or self.raw.find(b'{', pos, end) >= 0:
+            return None
+        try:
+            entry = decode_json(self.raw[start:end + 1])
+        except ValueError:
+            return None
+        if not isinstance(entry, dict) or entry.get(self.symbol_key) != native:
+            return None
+        return True, entry.get(self.price_key)
+
+    def get(self, native: str, default=None) -> Optional[float]:
+        if native in self._prices:
+            price = self._prices[native]
+            return default if price is None else price
+
+        if self._full is not None:
+            price = _to_price(self._full.get(native))
+        else:
+            found = self._find_selective(native)
+            if found is None:
+                self._index_all()
+                price = _to_price(self._full.get(native))
+            else:
+                price = _to_price(found[1]) if found[0] else None
+
+        self._prices[native] = price
+        return default if price is None else price
+
+    def __contains__(self, native: str) -> bool:
+        return self.get(native) is not None
+
+    def __len__(self) -> int:
+        if self._size is None:
+            # Aproximado sin decodificar: cantidad de entradas con clave de símbolo
+            self._size = self.raw.count(self._key_pattern)
+        return self._size
+
+
+def benchmark(contracts: int = 3000, lookups: int = 20, rounds: int = 50) -> Dict[str, float]:
+    """
+    Micro-benchmark: walk por petición vs extractor compilado, y
+    json + conversión de todo el payload vs BulkIndex (completo y selectivo)
+    Retorna microsegundos por operación.
+    """
+    config = {
+        'bulk_list_path': 'result.list',
+        'bulk_symbol_key': 'symbol',
+        'bulk_price_key': 'lastPrice'
+    }
+    payload = {'result': {'list': [
+        {'symbol': f"T{i}USDT", 'lastPrice': f"{1 + i / 7:.6f}", 'volume24h': '123456.7', 'turnover24h': '987654.3'}
+        for i in range(contracts)
+    ]}}
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    wanted = [f"T{i * (contracts // lookups)}USDT" for i in range(lookups)]
+
+    single = {'retCode': 0, 'result': {'list': [{'symbol': 'BTCUSDT', 'lastPrice': '67000.5'}]}}
+    path = 'result.list.0.lastPrice'
+    extractor = compile_price_path(path)
+
+    def parse_all():
+        # Línea base: decodificar y convertir todos los precios aunque se consulten pocos
+        return {native: _to_price(raw_price)
+                for native, raw_price in index_bulk_payload(json.loads(raw), config).items()}
+
+    def lookup_all(selective):
+        index = BulkIndex(raw, config, selective=selective)
+        return [index.get(symbol) for symbol in wanted]
+
+    def timed(fn, repeat):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        return (time.perf_counter() - start) / repeat * 1e6
+
+    results = {
+        'walk_price_path_us': timed(lambda: walk_price_path(single, path), 20000),
+        'compiled_extractor_us': timed(lambda: extractor(single), 20000),
+        'json_parse_bulk_us': timed(parse_all, rounds),
+        'bulk_index_full_us': timed(lambda: lookup_all(False), rounds),
+        'bulk_index_selective_us': timed(lambda: lookup_all(True), rounds)
+    }
+    results['payload_kb'] = round(len(raw) / 1024, 1)
+    return results
+
+
+if __name__ == "__main__":
+    print(f"🔬 Micro-benchmark de extractores (orjson: {'sí' if orjson is not None else 'no'})")
+    for name, value in benchmark().items():
+        print(f"   {name}: {value:.1f}")
@@ -0,0 +1,252 @@
+# core/quote_refresher.py - Refresco en segundo plano de precios de señales activas
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+
+class QuoteTable:
+    """
+    Tabla en memoria de cotizaciones publicadas por el refresher
+
+    Cada cambio de precio incrementa `seq`, así los lectores pueden saber
+    con una comparación de enteros si algo cambió desde su última lectura.
+    """
+
+    def __init__(self):
+        self._quotes = {}  # symbol -> (precio, timestamp epoch, seq del cambio)
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    @property
+    def seq(self) -> int:
+        return self._seq
+
+    def update_many(self, prices: Dict[str, Optional[float]]) -> int:
+        """Publica precios nuevos; retorna cuántos cambiaron"""
+        now = time.time()
+        changed = 0
+        with self._lock:
+            for symbol, price in prices.items():
+                if price is None:
+                    continue
+                current = self._quotes.get(symbol)
+                if current is not None and current[0] == price:
+                    # Mismo precio: solo refrescar timestamp
+                    self._quotes[symbol] = (price, now, current[2])
+                    continue
+                self._seq += 1
+                self._quotes[symbol] = (price, now, self._seq)
+                changed += 1
+        return changed
+
+    def get(self, symbol: str) -> Optional[Tuple[float, float]]:
+        """(precio, timestamp) del símbolo o None"""
+        quote = self._quotes.get(symbol)
+        if quote is None:
+            return None
+        return quote[0], quote[1]
+
+    def get_prices(self, symbols: Iterable[str], max_age: float = None) -> Dict[str, float]:
+        """Precios publicados de los símbolos pedidos (omite los que no hay o están viejos)"""
+        now = time.time()
+        prices = {}
+        with self._lock:
+            for symbol in symbols:
+                quote = self._quotes.get(symbol)
+                if quote is None:
+                    continue
+                if max_age is not None and now - quote[1] > max_age:
+                    continue
+                prices[symbol] = quote[0]
+        return prices
+
+    def snapshot(self) -> Dict[str, float]:
+        """Copia de todos los precios publicados"""
+        with self._lock:
+            return {symbol: quote[0] for symbol, quote in self._quotes.items()}
+
+    def changes_since(self, seq: int) -> Dict[str, float]:
+        """Precios que cambiaron después de `seq`"""
+        with self._lock:
+            return {symbol: quote[0] for symbol, quote in self._quotes.items() if quote[2] > seq}
+
+    def retain(self, symbols: Iterable[str]):
+        """Olvida los símbolos que ya no tienen señales activas"""
+        keep = set(symbols)
+        with self._lock:
+            for symbol in list(self._quotes.keys()):
+                if symbol not in keep:
+                    del self._quotes[symbol]
+
+    def __len__(self):
+        return len(self._quotes)
+
+
+class QuoteRefresher:
+    """
+    Hilo que mantiene QuoteTable al día para los símbolos con señales activas
+
+    - Vigila la tabla `signals` con PRAGMA data_version (solo vuelve a leer
+      los símbolos activos cuando otra conexión hizo commit)
+    - Cada `interval` segundos pide los precios de todos esos símbolos de una
+      vez y los publica en la tabla
+    - watch() adelanta SOLO los símbolos nuevos, con a lo sumo un ciclo
+      forzado cada `min_wakeup_interval` segundos
+    - Los símbolos sin precio (deslistados, no soportados) quedan en caché
+      negativa `unresolved_ttl` segundos: ni watch() ni el ciclo los repiten
+    La carga upstream es constante, sin importar cuántos dashboards haya abiertos.
+    """
+
+    def __init__(self, db_path: str, fetch_prices: Callable[[List[str]], Dict[str, Optional[float]]],
+                 quote_table: QuoteTable, interval: float = 5,
+                 normalize_symbol: Callable[[str], str] = None,
+                 unresolved_ttl: float = 60, min_wakeup_interval: float = None):
+        self.db_path = db_path
+        self.fetch_prices = fetch_prices
+        self.quote_table = quote_table
+        self.interval = interval
+        self.normalize_symbol = normalize_symbol or (lambda symbol: symbol)
+        self.unresolved_ttl = unresolved_ttl
+        self.min_wakeup_interval = interval if min_wakeup_interval is None else min_wakeup_interval
+
+        self.symbols = []
+        self.last_refresh = None
+        self.refresh_count = 0
+        self.forced_count = 0
+        self._data_version = None
+        self._extra_symbols = set()  # Símbolos pedidos por requests antes del próximo ciclo
+        self._unresolved = {}  # symbol -> epoch hasta el que no se vuelve a pedir
+        self._last_wakeup = 0.0
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Arranca el hilo de refresco (idempotente)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='quote-refresher', daemon=True)
+        self._thread.start()
+        print(f"🔄 Refresher de cotizaciones iniciado (cada {self.interval}s)")
+
+    def stop(self, timeout: float = 5):
+        """Detiene el hilo de refresco"""
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def watch(self, symbols: Iterable[str]):
+        """
+        Pide refrescar ya símbolos que aún no están en la tabla
+        Ignora los que el ciclo ya cubre, los ya pedidos y los sin precio en caché negativa
+        """
+        now = time.time()
+        with self._lock:
+            active = set(self.symbols)
+            new = {
+                symbol for symbol in symbols
+                if symbol not in active and symbol not in self._extra_symbols
+                and self._unresolved.get(symbol, 0) <= now
+            }
+            if not new:
+                return
+            self._extra_symbols.update(new)
+            # Un ciclo forzado por intervalo; si no, esperan al ciclo normal
+            wake = now - self._last_wakeup >= self.min_wakeup_interval
+            if wake:
+                self._last_wakeup = now
+        if wake:
+            self._wakeup.set()
+
+    def _skip_unresolved(self, symbols: Iterable[str], now: float) -> List[str]:
+        """Quita los símbolos en caché negativa (y olvida las entradas vencidas)"""
+        with self._lock:
+            for symbol, until in list(self._unresolved.items()):
+                if until <= now:
+                    del self._unresolved[symbol]
+            return sorted(symbol for symbol in symbols if symbol not in self._unresolved)
+
+    def _record_unresolved(self, symbols: List[str], prices: Dict[str, Optional[float]], now: float):
+        with self._lock:
+            for symbol in symbols:
+                if prices.get(symbol) is None:
+                    self._unresolved[symbol] = now + self.unresolved_ttl
+
+    def _load_active_symbols(self, conn: sqlite3.Connection) -> List[str]:
+        """Relee los símbolos activos solo si la base de datos cambió"""
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == self._data_version:
+            return self.symbols
+
+        # Sin DISTINCT (el set deduplica): así lee solo el índice cubriente de señales activas
+        rows = conn.execute("SELECT symbol FROM signals WHERE status = 'active'").fetchall()
+        self._data_version = data_version
+        return sorted({self.normalize_symbol(row[0]) for row in rows})
+
+    def _run(self):
+        conn = None
+        next_full = 0.0
+        while not self._stop.is_set():
+            started = time.time()
+            # Despertado antes de tiempo por watch(): solo los símbolos nuevos
+            full = started >= next_full
+            self._wakeup.clear()
+            try:
+                if full:
+                    if conn is None:
+                        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+
+                    symbols = self._load_active_symbols(conn)
+                    if symbols != self.symbols:
+                        self.quote_table.retain(symbols)
+                        self.symbols = symbols
+
+                with self._lock:
+                    extra = self._extra_symbols
+                    self._extra_symbols = set()
+                to_fetch = self._skip_unresolved(set(self.symbols) | extra if full else extra, started)
+
+                if to_fetch:
+                    prices = self.fetch_prices(to_fetch)
+                    self._record_unresolved(to_fetch, prices, started)
+                    changed = self.quote_table.update_many(prices)
+                    if changed:
+                        print(f"🔄 Cotizaciones: {changed}/{len(to_fetch)} precios actualizados")
+
+                if full:
+                    self.last_refresh = time.time()
+                    self.refresh_count += 1
+                else:
+                    self.forced_count += 1
+            except Exception as e:
+                print(f"❌ Error en refresher de cotizaciones: {e}")
+                if conn is not None:
+                    conn.close()
+                    conn = None
+
+            if full:
+                next_full = started + self.interval
+            self._wakeup.wait(max(0.0, next_full - time.time()))
+
+        if conn is not None:
+            conn.close()
+
+    def get_stats(self) -> Dict:
+        return {
+            'running': self.is_running(),
+            'interval': self.interval,
+            'symbols': len(self.symbols),
+            'quotes': len(self.quote_table),
+            'seq': self.quote_table.seq,
+            'refresh_count': self.refresh_count,
+            'forced_count': self.forced_count,
+            'unresolved': len(self._unresolved),
+            'last_refresh': self.last_refresh
+        }
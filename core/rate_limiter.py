@@ -0,0 +1,402 @@
+# core/rate_limiter.py - Rate limiting por exchange con token bucket + headers de uso del servidor
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+BUCKET_WINDOW = 60  # segundos: los buckets miden el presupuesto por minuto
+
+# Headers de uso que reporta cada exchange
+# kind 'used': el header trae el peso consumido en la ventana
+# kind 'remaining': el header trae lo que queda (y el límite en otro header)
+# window: segundos que mide el header. Solo una ventana de BUCKET_WINDOW ajusta los tokens;
+# una más corta solo frena el exchange mientras esté agotada.
+# Bybit no está: X-Bapi-Limit-Status es un límite por endpoint de ventana corta, no el
+# presupuesto del exchange, y sincronizarlo rellenaba el bucket por minuto.
+USAGE_HEADERS = {
+    'binance_futures': {'kind': 'used', 'header': 'X-MBX-USED-WEIGHT-1M', 'limit': 2400, 'window': 60},
+    'gate_futures': {'kind': 'remaining', 'header': 'X-Gate-RateLimit-Requests-Remain',
+                     'limit_header': 'X-Gate-RateLimit-Limit', 'window': 10},
+    'kucoin_futures': {'kind': 'remaining', 'header': 'gw-ratelimit-remaining',
+                       'limit_header': 'gw-ratelimit-limit', 'window': 30}
+}
+
+# Una petición sin respuesta se deja de contar como "en vuelo" pasado este tiempo
+IN_FLIGHT_TIMEOUT = 15  # segundos (mayor que el timeout de cualquier exchange)
+
+# Códigos que indican que el exchange nos está limitando (418 = ban de IP en Binance)
+RATE_LIMITED_STATUS = (418, 429)
+
+
+def _refill(tokens: float, updated: float, now: float, capacity: float, rate: float) -> float:
+    """Tokens disponibles tras rellenar desde `updated` hasta `now`"""
+    return min(capacity, tokens + max(0.0, now - updated) * rate)
+
+
+class TokenBucket:
+    """
+    Token bucket con pesos: `capacity` tokens por minuto, relleno continuo
+
+    A diferencia de una ventana fija de un minuto no hay reseteo brusco ni
+    ráfagas en el borde de la ventana.
+    """
+
+    def __init__(self, capacity: float, window: float = BUCKET_WINDOW):
+        self.capacity = capacity
+        self.rate = capacity / window  # tokens por segundo
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.consumed = 0  # Peso total consumido (estadística)
+        self._lock = threading.Lock()
+
+    def try_acquire(self, weight: float = 1) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            if now < self.blocked_until:
+                return False
+            self.tokens = _refill(self.tokens, self.updated, now, self.capacity, self.rate)
+            self.updated = now
+            if self.tokens >= weight:
+                self.tokens -= weight
+                self.consumed += weight
+                return True
+            return False
+
+    def available(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            if now < self.blocked_until:
+                return 0.0
+            return _refill(self.tokens, self.updated, now, self.capacity, self.rate)
+
+    def tighten(self, server_tokens: float):
+        """Baja los tokens a lo que permite el servidor; nunca los sube (solo el relleno los sube)"""
+        with self._lock:
+            now = time.monotonic()
+            tokens = _refill(self.tokens, self.updated, now, self.capacity, self.rate)
+            self.tokens = max(0.0, min(tokens, server_tokens))
+            self.updated = now
+
+    def block(self, seconds: float, drain: bool = True):
+        """
+        Bloquea el bucket `seconds` (respuesta 429/418 con Retry-After)
+        drain=False solo frena: los tokens siguen ahí al terminar el bloqueo
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.blocked_until = max(self.blocked_until, now + seconds)
+            if drain:
+                self.tokens = 0.0
+                self.updated = now
+
+
+class SharedBucketStore:
+    """
+    Buckets compartidos entre procesos en un SQLite local
+
+    El bot, el sync y la API pueden usar el mismo presupuesto por exchange:
+    cada adquisición es una transacción BEGIN IMMEDIATE corta sobre una fila.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS rate_buckets (
+                api_id TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated REAL NOT NULL,
+                blocked_until REAL NOT NULL DEFAULT 0,
+                consumed REAL NOT NULL DEFAULT 0
+            )
+        """)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            self._local.conn = conn
+        return conn
+
+    def _load(self, conn, api_id: str, capacity: float, now: float):
+        row = conn.execute(
+            "SELECT tokens, updated, blocked_until, consumed FROM rate_buckets WHERE api_id = ?",
+            (api_id,)
+        ).fetchone()
+        if row is None:
+            return capacity, now, 0.0, 0.0
+        return row
+
+    def _save(self, conn, api_id: str, tokens: float, updated: float, blocked_until: float, consumed: float):
+        conn.execute(
+            "INSERT OR REPLACE INTO rate_buckets (api_id, tokens, updated, blocked_until, consumed) VALUES (?, ?, ?, ?, ?)",
+            (api_id, tokens, updated, blocked_until, consumed)
+        )
+
+    def try_acquire(self, api_id: str, capacity: float, rate: float, weight: float) -> bool:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            tokens, updated, blocked_until, consumed = self._load(conn, api_id, capacity, now)
+            if now < blocked_until:
+                conn.execute("COMMIT")
+                return False
+            tokens = _refill(tokens, updated, now, capacity, rate)
+            acquired = tokens >= weight
+            if acquired:
+                tokens -= weight
+                consumed += weight
+            self._save(conn, api_id, tokens, now, blocked_until, consumed)
+            conn.execute("COMMIT")
+            return acquired
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def available(self, api_id: str, capacity: float, rate: float) -> float:
+        now = time.time()
+        tokens, updated, blocked_until, _consumed = self._load(self._conn(), api_id, capacity, now)
+        if now < blocked_until:
+            return 0.0
+        return _refill(tokens, updated, now, capacity, rate)
+
+    def consumed(self, api_id: str) -> float:
+        row = self._conn().execute("SELECT consumed FROM rate_buckets WHERE api_id = ?", (api_id,)).fetchone()
+        return row[0] if row else 0.0
+
+    def tighten(self, api_id: str, capacity: float, rate: float, server_tokens: float):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            tokens, updated, blocked_until, consumed = self._load(conn, api_id, capacity, now)
+            tokens = max(0.0, min(_refill(tokens, updated, now, capacity, rate), server_tokens))
+            self._save(conn, api_id, tokens, now, blocked_until, consumed)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def block(self, api_id: str, capacity: float, seconds: float, drain: bool = True):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            tokens, updated, blocked_until, consumed = self._load(conn, api_id, capacity, now)
+            if drain:
+                tokens, updated = 0.0, now
+            self._save(conn, api_id, tokens, updated, max(blocked_until, now + seconds), consumed)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+
+class RateLimiter:
+    """
+    Rate limiter por exchange (thread-safe, opcionalmente compartido entre procesos)
+
+    - Un token bucket por exchange con capacidad = rate_limit * safety por minuto
+    - Cada petición consume su peso ANTES de salir (sin carreras check/increment)
+    - Los headers de uso del exchange solo APRIETAN el bucket (min(local, servidor)),
+      descontando las peticiones en vuelo que el servidor todavía no contó
+    - Un 429/418 bloquea el exchange durante Retry-After
+    """
+
+    def __init__(self, safety: float = 0.8, shared_path: str = None):
+        self.safety = safety
+        self.shared = SharedBucketStore(shared_path) if shared_path else None
+        self._buckets = {}  # api_id -> TokenBucket (modo en memoria)
+        self._limits = {}  # api_id -> rate_limit nominal (req/min)
+        self._lock = threading.Lock()
+        self.rejections = {}  # api_id -> peticiones rechazadas localmente
+        self._in_flight = {}  # api_id -> deque[(monotonic, peso)] adquiridas y sin respuesta
+
+    def register(self, api_id: str, rate_limit: float):
+        """Registra un exchange (idempotente)"""
+        with self._lock:
+            if api_id in self._limits:
+                return
+            self._limits[api_id] = rate_limit
+            self._buckets[api_id] = TokenBucket(rate_limit * self.safety)
+            self.rejections[api_id] = 0
+            self._in_flight[api_id] = deque()
+
+    def limits(self) -> Dict[str, float]:
+        """rate_limit nominal (req/min) de los exchanges registrados"""
+        with self._lock:
+            return dict(self._limits)
+
+    def _capacity(self, api_id: str) -> float:
+        return self._limits[api_id] * self.safety
+
+    def try_acquire(self, api_id: str, weight: float = 1) -> bool:
+        """Consume `weight` tokens si hay disponibles"""
+        if api_id not in self._limits:
+            return True
+
+        if self.shared is not None:
+            capacity = self._capacity(api_id)
+            acquired = self.shared.try_acquire(api_id, capacity, capacity / 60, weight)
+        else:
+            acquired = self._buckets[api_id].try_acquire(weight)
+
+        with self._lock:
+            if acquired:
+                self._in_flight[api_id].append((time.monotonic(), weight))
+            else:
+                self.rejections[api_id] += 1
+        return acquired
+
+    def _finish_request(self, api_id: str) -> float:
+        """Saca de "en vuelo" la petición respondida (la más vieja); retorna el peso que sigue en vuelo"""
+        with self._lock:
+            in_flight = self._in_flight[api_id]
+            expired = time.monotonic() - IN_FLIGHT_TIMEOUT
+            while in_flight and in_flight[0][0] < expired:
+                in_flight.popleft()  # Error sin respuesta: no quedan contadas para siempre
+            if in_flight:
+                in_flight.popleft()
+            return sum(weight for _started, weight in in_flight)
+
+    def release(self, api_id: str):
+        """Petición adquirida que nunca tuvo respuesta (cancelada): deja de contarla en vuelo"""
+        if api_id in self._limits:
+            self._finish_request(api_id)
+
+    def available(self, api_id: str) -> float:
+        if api_id not in self._limits:
+            return float('inf')
+        if self.shared is not None:
+            capacity = self._capacity(api_id)
+            return self.shared.available(api_id, capacity, capacity / 60)
+        return self._buckets[api_id].available()
+
+    def can_use(self, api_id: str, weight: float = 1) -> bool:
+        """Indica si hay tokens (sin consumirlos)"""
+        return self.available(api_id) >= weight
+
+    def _tighten(self, api_id: str, server_tokens: float):
+        if self.shared is not None:
+            capacity = self._capacity(api_id)
+            self.shared.tighten(api_id, capacity, capacity / 60, server_tokens)
+        else:
+            self._buckets[api_id].tighten(server_tokens)
+
+    def block(self, api_id: str, seconds: float, drain: bool = True):
+        if api_id not in self._limits:
+            return
+        if self.shared is not None:
+            self.shared.block(api_id, self._capacity(api_id), seconds, drain)
+        else:
+            self._buckets[api_id].block(seconds, drain)
+
+    def update_from_response(self, api_id: str, response):
+        """Ajusta el bucket con el status y los headers de uso de la respuesta"""
+        if api_id not in self._limits or response is None:
+            return
+        headers = getattr(response, 'headers', None) or {}
+        status_code = getattr(response, 'status_code', getattr(response, 'status', None))
+
+        in_flight = self._finish_request(api_id)
+
+        if status_code in RATE_LIMITED_STATUS:
+            retry_after = self._parse_number(headers.get('Retry-After'))
+            self.block(api_id, retry_after if retry_after else 60)
+            print(f"   🚫 {api_id}: HTTP {status_code}, bloqueado {retry_after or 60:.0f}s")
+            return
+
+        usage = self._parse_usage(api_id, headers)
+        if usage is None:
+            return
+        used, limit = usage
+        # Lo que el servidor permite todavía, menos lo que ya salió y él no contó
+        remaining = limit - used - in_flight
+        window = USAGE_HEADERS[api_id].get('window', BUCKET_WINDOW)
+        if window == BUCKET_WINDOW:
+            self._tighten(api_id, self._capacity(api_id) * max(0.0, remaining) / limit)
+        elif remaining <= 0:
+            # Ventana corta agotada: frena hasta que se renueva (Retry-After o el largo de la
+            # ventana) sin vaciar el presupuesto por minuto, que el servidor no midió
+            retry_after = self._parse_number(headers.get('Retry-After'))
+            self.block(api_id, retry_after or window, drain=False)
+
+    @staticmethod
+    def _parse_number(value) -> Optional[float]:
+        if value is None:
+            return None
+        try:
+            # Bybit y otros pueden enviar listas separadas por coma
+            return float(str(value).split(',')[0].strip())
+        except ValueError:
+            return None
+
+    def _parse_usage(self, api_id: str, headers) -> Optional[Tuple[float, float]]:
+        """(usado, límite) de la ventana del servidor, o None si no hay headers"""
+        spec = USAGE_HEADERS.get(api_id)
+        if spec is None:
+            return None
+
+        value = self._parse_number(headers.get(spec['header']))
+        if value is None:
+            return None
+
+        if spec['kind'] == 'used':
+            limit = spec['limit']
+            return (value, limit) if limit else None
+
+        limit = self._parse_number(headers.get(spec.get('limit_header'))) if spec.get('limit_header') else None
+        if not limit:
+            return None
+        return limit - value, limit
+
+    def parse_usage_headers(self, api_id: str, headers) -> Optional[float]:
+        """Fracción usada (0-1) de la ventana del servidor, o None si no hay headers"""
+        usage = self._parse_usage(api_id, headers)
+        if usage is None:
+            return None
+        used, limit = usage
+        return max(0.0, min(1.0, used / limit))
+
+    def get_usage(self, api_id: str) -> Dict:
+        """Uso actual de un exchange (para estadísticas)"""
+        capacity = self._capacity(api_id)
+        available = self.available(api_id)
+        used = max(0.0, capacity - available)
+        if self.shared is not None:
+            consumed = self.shared.consumed(api_id)
+        else:
+            consumed = self._buckets[api_id].consumed
+        return {
+            'limit': self._limits[api_id],
+            'capacity': round(capacity, 1),
+            'used': round(used, 1),
+            'available': round(available, 1),
+            'usage_pct': round(used / capacity * 100, 1) if capacity else 0.0,
+            'consumed_total': consumed,
+            'rejections': self.rejections.get(api_id, 0)
+        }
+
+
+# Instancia global (compartida por app.py y el detector dentro de un proceso)
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    Singleton del rate limiter
+    Con RATE_LIMIT_STORE=<ruta.db> el presupuesto se comparte entre procesos
+    """
+    global _rate_limiter
+    if _rate_limiter is None:
+        with _rate_limiter_lock:
+            if _rate_limiter is None:
+                _rate_limiter = RateLimiter(shared_path=os.environ.get('RATE_LIMIT_STORE') or None)
+    return _rate_limiter
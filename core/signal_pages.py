@@ -0,0 +1,118 @@
+# core/signal_pages.py - Paginación keyset (created_at, id) y filtros para las consultas de señales
+import base64
+import binascii
+import json
+from typing import Dict, List, Optional, Tuple
+
+SIDES = ('LONG', 'SHORT')
+STATUS_ALL = 'all'
+STATUSES = ('active', 'closed', STATUS_ALL)
+
+
+class PageQueryError(ValueError):
+    """Parámetros de paginación o filtros no válidos (la API responde 400)"""
+
+
+def encode_cursor(created_at: str, signal_id: int) -> str:
+    """Cursor opaco con la clave de la última fila de la página"""
+    raw = json.dumps([created_at, signal_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        created_at, signal_id = json.loads(raw)
+    except (binascii.Error, ValueError, TypeError):
+        raise PageQueryError("Cursor inválido")
+    if not isinstance(created_at, str) or not isinstance(signal_id, int):
+        raise PageQueryError("Cursor inválido")
+    return created_at, signal_id
+
+
+def symbol_variants(symbol: str) -> List[str]:
+    """'btc' -> ['BTC/USDT:USDT', 'BTC/USDT', 'BTC'] (formas en que el bot guarda el símbolo)"""
+    base = symbol.strip().upper().replace(':USDT', '').replace('/USDT', '')
+    return [f"{base}/USDT:USDT", f"{base}/USDT", base]
+
+
+def parse_filters(args) -> Dict[str, Optional[str]]:
+    """
+    Filtros desde los query params (?symbol=BTC&side=long&status=active)
+    status por defecto 'active'; status=all no filtra por estado
+    """
+    status = (args.get('status') or 'active').strip().lower()
+    if status not in STATUSES:
+        raise PageQueryError(f"status debe ser uno de: {', '.join(STATUSES)}")
+    filters = {'status': status, 'symbol': None, 'side': None}
+
+    symbol = args.get('symbol')
+    if symbol:
+        filters['symbol'] = symbol.strip().upper()
+
+    side = args.get('side')
+    if side:
+        side = side.strip().upper()
+        if side not in SIDES:
+            raise PageQueryError(f"side debe ser uno de: {', '.join(SIDES).lower()}")
+        filters['side'] = side
+    return filters
+
+
+def parse_limit(raw: Optional[str], default: int, maximum: int) -> int:
+    if raw is None or raw == '':
+        return default
+    try:
+        limit = int(raw)
+    except ValueError:
+        raise PageQueryError("limit debe ser un entero")
+    if limit < 1:
+        raise PageQueryError("limit debe ser mayor que 0")
+    return min(limit, maximum)
+
+
+def build_page_query(fields: List[str], filters: Dict, cursor: Optional[str],
+                     limit: int) -> Tuple[str, List]:
+    """
+    SELECT de una página: WHERE filtros AND (created_at, id) < cursor
+    ORDER BY created_at DESC, id DESC LIMIT limit + 1 (la fila extra indica si hay más)
+
+    Sin OFFSET: cada página cuesta O(limit) recorriendo el índice desde la
+    clave del cursor, sin importar qué tan profunda sea.
+    """
+    conditions = []
+    params = []
+
+    status = filters.get('status')
+    if status and status != STATUS_ALL:
+        if status not in STATUSES:
+            raise PageQueryError(f"status debe ser uno de: {', '.join(STATUSES)}")
+        # Literal (no parámetro, ya validado): así el planner puede usar el índice parcial de ese estado
+        conditions.append(f"status = '{status}'")
+
+    if filters.get('symbol'):
+        variants = symbol_variants(filters['symbol'])
+        conditions.append(f"symbol IN ({', '.join('?' * len(variants))})")
+        params.extend(variants)
+
+    if filters.get('side'):
+        # El bot guarda el lado tal como llega ('LONG', 'long', 'Long')
+        side = filters['side']
+        conditions.append("signal_type IN (?, ?, ?)")
+        params.extend([side, side.lower(), side.capitalize()])
+
+    if cursor:
+        created_at, signal_id = decode_cursor(cursor)
+        conditions.append("(created_at, id) < (?, ?)")
+        params.extend([created_at, signal_id])
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+    query = f"""
+        SELECT {', '.join(fields)}
+        FROM signals
+        {where}
+        ORDER BY created_at DESC, id DESC
+        LIMIT ?
+    """
+    params.append(limit + 1)
+    return query, params
@@ -0,0 +1,222 @@
+# core/signal_stream.py - Hub de Server-Sent Events: un productor compartido, deltas para todos los suscriptores
+import json
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Iterator, List, Optional
+
+# Campos que cambian con cada tick de precio (no cuentan como cambio de la señal)
+_PRICE_FIELDS = ('current', 'stale')
+
+
+def format_event(event_id: str, event: str, data) -> bytes:
+    """Frame SSE listo para enviar"""
+    payload = json.dumps(data, separators=(',', ':'), default=str)
+    return f"id: {event_id}\nevent: {event}\ndata: {payload}\n\n".encode()
+
+
+class StreamHub:
+    """
+    Productor único de eventos para /api/stream
+
+    - Un solo hilo lee señales (solo si PRAGMA data_version cambió) y precios
+      cada `interval` segundos, sin importar cuántos dashboards haya abiertos
+    - Publica únicamente diferencias: 'signals' (altas/cambios/bajas) y
+      'prices' (símbolos cuyo precio cambió). Cada frame se serializa UNA vez
+      y se comparte entre todos los suscriptores
+    - Buffer circular de eventos para reanudar con Last-Event-ID; si el id ya
+      no está en el buffer se envía un 'snapshot' completo
+    - Los ids son '<época>-<seq>': la época cambia con cada arranque, así que
+      un Last-Event-ID de otro proceso (o de antes de reiniciar) recibe un
+      'snapshot' en vez de reanudar en una posición que no corresponde
+    - Sin suscriptores el productor se duerme (cero trabajo)
+    """
+
+    def __init__(self, load_signals: Callable[[], List[Dict]],
+                 get_prices: Callable[[List[str]], Dict[str, Optional[float]]],
+                 attach_prices: Callable[[List[Dict], Dict[str, float]], List[Dict]],
+                 db_path: str = None, interval: float = 5, heartbeat: float = 15,
+                 buffer_size: int = 1024, retry_ms: int = 3000, epoch: str = None):
+        self.load_signals = load_signals
+        self.get_prices = get_prices
+        self.attach_prices = attach_prices
+        self.db_path = db_path
+        self.interval = interval
+        self.heartbeat = heartbeat
+        self.retry_ms = retry_ms
+        self.epoch = epoch or format(time.time_ns() // 1000, 'x')  # Arranque del proceso
+
+        self._signals = {}  # id -> señal (sin precio)
+        self._prices = {}  # símbolo -> último precio publicado
+        self._events = deque(maxlen=buffer_size)  # (id, frame)
+        self._seq = 0
+        self._data_version = None
+        self._ready = threading.Event()
+        self._cond = threading.Condition()
+        self._wakeup = threading.Event()
+        self._subscribers = 0
+        self._thread = None
+        self.ticks = 0
+
+    # ---------- Productor ----------
+
+    def _ensure_running(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name='signal-stream', daemon=True)
+        self._thread.start()
+
+    def _publish(self, event: str, data):
+        """Agrega un evento al buffer y despierta a los suscriptores (con _cond tomado)"""
+        self._seq += 1
+        self._events.append((self._seq, format_event(self._event_id(self._seq), event, data)))
+
+    def _event_id(self, seq: int) -> str:
+        return f"{self.epoch}-{seq}"
+
+    def parse_event_id(self, raw: Optional[str]) -> Optional[int]:
+        """seq de un Last-Event-ID de ESTE proceso; None (snapshot) si es de otra época o inválido"""
+        epoch, _sep, seq = (raw or '').strip().rpartition('-')
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        return int(seq)
+
+    def _signals_changed(self, conn: Optional[sqlite3.Connection]) -> bool:
+        if conn is None:
+            return True
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == self._data_version:
+            return False
+        self._data_version = data_version
+        return True
+
+    def _tick(self, conn: Optional[sqlite3.Connection]):
+        signals = None
+        if self._signals_changed(conn) or not self._ready.is_set():
+            signals = {signal['id']: signal for signal in self.load_signals()}
+
+        current = signals if signals is not None else self._signals
+        symbols = sorted({signal['symbol'] for signal in current.values()})
+        prices = self.get_prices(symbols) if symbols else {}
+
+        with self._cond:
+            if signals is not None:
+                upsert = [
+                    signal for signal_id, signal in signals.items()
+                    if self._strip(self._signals.get(signal_id)) != self._strip(signal)
+                ]
+                removed = [signal_id for signal_id in self._signals if signal_id not in signals]
+                self._signals = signals
+                if self._ready.is_set() and (upsert or removed):
+                    with_prices = self.attach_prices([dict(signal) for signal in upsert], {**self._prices, **prices})
+                    self._publish('signals', {'upsert': with_prices, 'remove': removed})
+
+            changed = {
+                symbol: price for symbol, price in prices.items()
+                if price is not None and self._prices.get(symbol) != price
+            }
+            self._prices = {symbol: price for symbol, price in {**self._prices, **changed}.items() if symbol in symbols}
+            if self._ready.is_set() and changed:
+                self._publish('prices', changed)
+
+            self._ready.set()
+            self._cond.notify_all()
+        self.ticks += 1
+
+    @staticmethod
+    def _strip(signal: Optional[Dict]) -> Optional[Dict]:
+        if signal is None:
+            return None
+        return {key: value for key, value in signal.items() if key not in _PRICE_FIELDS}
+
+    def _run(self):
+        conn = None
+        while True:
+            # Sin suscriptores: dormir hasta que llegue uno
+            with self._cond:
+                idle = self._subscribers == 0
+            if idle:
+                self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+
+            started = time.time()
+            try:
+                if conn is None and self.db_path:
+                    conn = sqlite3.connect(self.db_path, check_same_thread=False)
+                self._tick(conn)
+            except Exception as e:
+                print(f"❌ Error en stream de señales: {e}")
+                if conn is not None:
+                    conn.close()
+                    conn = None
+            time.sleep(max(0.0, self.interval - (time.time() - started)))
+
+    # ---------- Suscriptores ----------
+
+    def _snapshot_frame(self) -> bytes:
+        """Estado completo actual (con _cond tomado)"""
+        signals = self.attach_prices([dict(signal) for signal in self._signals.values()], self._prices)
+        data = {'signals': signals, 'count': len(signals)}
+        return f"retry: {self.retry_ms}\n".encode() + format_event(self._event_id(self._seq), 'snapshot', data)
+
+    def _events_after(self, event_id: int) -> List[bytes]:
+        frames = []
+        for seq, frame in reversed(self._events):
+            if seq <= event_id:
+                break
+            frames.append(frame)
+        frames.reverse()
+        return frames
+
+    def _can_resume(self, event_id: Optional[int]) -> bool:
+        if event_id is None or event_id > self._seq:
+            return False
+        if event_id == self._seq:
+            return True
+        return bool(self._events) and self._events[0][0] <= event_id + 1
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> Iterator[bytes]:
+        """Generador de frames SSE para un cliente (last_event_id tal como lo envió el navegador)"""
+        last_event_id = self.parse_event_id(last_event_id)
+        with self._cond:
+            self._subscribers += 1
+        self._ensure_running()
+        self._wakeup.set()
+
+        try:
+            self._ready.wait(self.heartbeat)
+            with self._cond:
+                if self._can_resume(last_event_id):
+                    frames = self._events_after(last_event_id)
+                    first = f"retry: {self.retry_ms}\n\n".encode() + b''.join(frames)
+                else:
+                    first = self._snapshot_frame()
+                cursor = self._seq
+            yield first
+
+            while True:
+                with self._cond:
+                    self._cond.wait_for(lambda: self._seq > cursor, timeout=self.heartbeat)
+                    frames = self._events_after(cursor)
+                    cursor = self._seq
+                if frames:
+                    yield b''.join(frames)
+                else:
+                    yield b': heartbeat\n\n'
+        finally:
+            with self._cond:
+                self._subscribers -= 1
+
+    def get_stats(self) -> Dict:
+        with self._cond:
+            return {
+                'subscribers': self._subscribers,
+                'last_event_id': self._event_id(self._seq),
+                'buffered_events': len(self._events),
+                'signals': len(self._signals),
+                'symbols': len(self._prices),
+                'ticks': self.ticks,
+                'interval': self.interval
+            }
@@ -0,0 +1,142 @@
+# core/signal_versions.py - Versión monótona de señales + cotizaciones y deltas desde una versión
+import bisect
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from core.quote_refresher import QuoteTable
+
+
+class SignalVersionTracker:
+    """
+    Contador de cambios para /api/operations?since=<versión>
+
+    - La versión sube cuando otra conexión hace commit en la base de datos
+      (PRAGMA data_version de una conexión propia) o cuando la tabla de
+      cotizaciones publica precios nuevos (QuoteTable.seq)
+    - Sin cambios, current() es un PRAGMA y dos comparaciones de enteros:
+      no se ejecuta ningún SELECT
+    - La versión solo sigue a las señales activas y a los precios: un commit
+      que solo toca señales cerradas (re-calificar un resultado, borrar
+      historial) no la mueve. Para eso está commit_mark()
+    - Para cada señal se guarda la versión en que cambió por última vez, y
+      para las que salieron una "lápida" acotada; con eso se arma el delta
+    """
+
+    def __init__(self, db_path: str, load_signals: Callable[[], List[Dict]],
+                 quote_table: QuoteTable, max_tombstones: int = 1024):
+        self.db_path = db_path
+        self.load_signals = load_signals
+        self.quote_table = quote_table
+        self.max_tombstones = max_tombstones
+
+        self.version = 0
+        self._conn = None
+        self._data_version = None
+        self._quote_seq = None
+        self._commits = 0  # Commits vistos (cualquier fila, activa o cerrada)
+        self._rows = {}  # id -> (versión del último cambio, señal sin precio)
+        self._tombstones = OrderedDict()  # id -> versión en que salió
+        self._oldest_delta = 0  # Versiones anteriores ya no tienen delta completo
+        self._quote_marks = []  # [(versión, quote seq)] para traducir versión -> seq
+        self._lock = threading.Lock()
+
+    def _db_changed(self) -> bool:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == self._data_version:
+            return False
+        self._data_version = data_version
+        return True
+
+    def _reload_rows(self, version: int) -> bool:
+        signals = {signal['id']: signal for signal in self.load_signals()}
+        changed = False
+        for signal_id, signal in signals.items():
+            current = self._rows.get(signal_id)
+            if current is None or current[1] != signal:
+                self._rows[signal_id] = (version, signal)
+                self._tombstones.pop(signal_id, None)
+                changed = True
+        for signal_id in [signal_id for signal_id in self._rows if signal_id not in signals]:
+            del self._rows[signal_id]
+            self._tombstones[signal_id] = version
+            changed = True
+        while len(self._tombstones) > self.max_tombstones:
+            _signal_id, removed_at = self._tombstones.popitem(last=False)
+            self._oldest_delta = max(self._oldest_delta, removed_at)
+        return changed
+
+    def current(self) -> int:
+        """Versión actual (la incrementa si hubo cambios desde la última llamada)"""
+        with self._lock:
+            try:
+                db_changed = self._db_changed()
+            except sqlite3.Error:
+                if self._conn is not None:
+                    self._conn.close()
+                    self._conn = None
+                db_changed = True
+            if db_changed:
+                self._commits += 1
+
+            quote_seq = self.quote_table.seq
+            if not db_changed and quote_seq == self._quote_seq:
+                return self.version
+
+            version = self.version + 1
+            rows_changed = self._reload_rows(version) if db_changed else False
+            if rows_changed or quote_seq != self._quote_seq:
+                self.version = version
+                self._quote_seq = quote_seq
+                self._quote_marks.append((version, quote_seq))
+                if len(self._quote_marks) > self.max_tombstones:
+                    del self._quote_marks[0]
+            return self.version
+
+    def commit_mark(self) -> int:
+        """Contador de commits de la DB vistos por current() (para recursos con señales cerradas)"""
+        with self._lock:
+            return self._commits
+
+    def _quote_seq_at(self, version: int) -> Optional[int]:
+        index = bisect.bisect_right(self._quote_marks, (version, float('inf'))) - 1
+        return self._quote_marks[index][1] if index >= 0 else None
+
+    def delta(self, since: int) -> Optional[Dict]:
+        """
+        Cambios desde `since`: {'version', 'upsert': [...], 'remove': [...], 'prices': {...}}
+        None si `since` es demasiado viejo (o futuro) y hace falta la lista completa
+        """
+        version = self.current()
+        if since == version:
+            return {'version': version, 'upsert': [], 'remove': [], 'prices': {}}
+
+        with self._lock:
+            if since > version or since < self._oldest_delta:
+                return None
+            quote_seq = self._quote_seq_at(since)
+            if quote_seq is None and since > 0:
+                return None
+            upsert = [dict(signal) for changed_at, signal in self._rows.values() if changed_at > since]
+            removed = [signal_id for signal_id, removed_at in self._tombstones.items() if removed_at > since]
+
+        prices = self.quote_table.changes_since(quote_seq or 0)
+        return {'version': version, 'upsert': upsert, 'remove': removed, 'prices': prices}
+
+    def symbols(self) -> List[str]:
+        """Símbolos de las señales conocidas en la versión actual"""
+        with self._lock:
+            return sorted({signal['symbol'] for _changed_at, signal in self._rows.values()})
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                'version': self.version,
+                'rows': len(self._rows),
+                'tombstones': len(self._tombstones),
+                'quote_seq': self._quote_seq,
+                'commits': self._commits
+            }
@@ -0,0 +1,173 @@
+# core/signal_writer.py - Escritor único de señales (write-behind con group commit)
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Tuple
+
+DEFAULT_MAX_BATCH = 500  # Operaciones por transacción
+DEFAULT_MAX_DELAY = 0.02  # segundos que se espera a completar un lote desde la primera operación
+DEFAULT_MAX_QUEUE = 10000  # Con la cola llena los productores esperan (backpressure)
+
+OP_SAVE = 'save'
+OP_UPDATE = 'update'
+_OP_FLUSH = 'flush'
+_OP_STOP = 'stop'
+
+
+class SignalWriterClosed(RuntimeError):
+    """Se encoló una escritura después de cerrar el escritor"""
+
+
+class SignalWriter:
+    """
+    Un solo hilo escribe en signals.db; los demás encolan y siguen
+
+    - Las operaciones se agrupan en lotes (hasta `max_batch` o `max_delay`
+      segundos desde la primera) y cada tramo consecutivo del mismo tipo se
+      escribe con UNA llamada en lote = una transacción: sin competir por el
+      lock de escritura y con un commit por lote en vez de uno por fila
+    - El orden de llegada se respeta (un UPDATE nunca se adelanta al INSERT
+      que lo precede en la cola)
+    - Cada operación devuelve un Future con el resultado de su fila
+      ({'ok', 'id', 'error', ...}, el mismo de las APIs en lote)
+    - close() escribe todo lo encolado antes de terminar (registrarlo en atexit)
+
+    `save_batch(signals)` y `update_batch([(id, resultado)])` son las APIs en lote
+    de DatabaseManager; `on_commit(kind, results)` se llama después de cada tramo.
+    """
+
+    def __init__(self, save_batch: Callable[[List[Dict]], List[Dict]],
+                 update_batch: Callable[[List[Tuple[int, str]]], List[Dict]],
+                 max_batch: int = DEFAULT_MAX_BATCH, max_delay: float = DEFAULT_MAX_DELAY,
+                 max_queue: int = DEFAULT_MAX_QUEUE,
+                 on_commit: Optional[Callable[[str, List[Dict]], None]] = None):
+        self.save_batch = save_batch
+        self.update_batch = update_batch
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.on_commit = on_commit
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        self._close_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {'enqueued': 0, 'written': 0, 'failed': 0, 'batches': 0, 'largest_batch': 0}
+
+        self._thread = threading.Thread(target=self._run, name='signal-writer', daemon=True)
+        self._thread.start()
+
+    # ---- Productores ----
+
+    def _enqueue(self, kind: str, payload) -> Future:
+        future = Future()
+        with self._close_lock:  # Nada entra a la cola después de la marca de cierre
+            if self._closed:
+                raise SignalWriterClosed("El escritor de señales está cerrado")
+            self._queue.put((kind, payload, future))
+        if kind in (OP_SAVE, OP_UPDATE):
+            with self._stats_lock:
+                self._stats['enqueued'] += 1
+        return future
+
+    def submit_signal(self, signal_data: Dict) -> Future:
+        """Encola el INSERT de una señal; el Future resuelve a {'ok', 'id', 'error'}"""
+        return self._enqueue(OP_SAVE, signal_data)
+
+    def submit_result(self, signal_id: int, resultado: str) -> Future:
+        """Encola la actualización del resultado; el Future resuelve a {'ok', 'id', 'error'}"""
+        return self._enqueue(OP_UPDATE, (signal_id, resultado))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Espera a que todo lo encolado hasta ahora esté escrito (False si venció el timeout)"""
+        if self._closed:
+            return not self._thread.is_alive()
+        try:
+            self._enqueue(_OP_FLUSH, None).result(timeout)
+            return True
+        except Exception:
+            return False
+
+    def close(self, timeout: Optional[float] = 10.0) -> bool:
+        """Deja de aceptar escrituras, escribe lo pendiente y detiene el hilo"""
+        with self._close_lock:
+            if not self._closed:
+                self._closed = True
+                self._queue.put((_OP_STOP, None, Future()))
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    # ---- Hilo escritor ----
+
+    def _next_batch(self) -> List[Tuple[str, object, Future]]:
+        """Bloquea hasta la primera operación y junta las que lleguen dentro de la ventana"""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch and batch[-1][0] not in (_OP_FLUSH, _OP_STOP):
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())  # Lo que ya está en cola entra igual
+            except queue.Empty:
+                break
+        return batch
+
+    def _write_run(self, kind: str, operations: List[Tuple[str, object, Future]]):
+        payloads = [payload for _kind, payload, _future in operations]
+        try:
+            results = self.save_batch(payloads) if kind == OP_SAVE else self.update_batch(payloads)
+        except Exception as e:
+            print(f"   ❌ Error en escritura en lote ({kind}): {e}")
+            results = [{'ok': False, 'id': None, 'error': str(e)} for _ in operations]
+
+        failed = 0
+        for (_kind, _payload, future), result in zip(operations, results):
+            failed += not result.get('ok')
+            future.set_result(result)
+        with self._stats_lock:
+            self._stats['written'] += len(operations) - failed
+            self._stats['failed'] += failed
+
+        if self.on_commit is not None and len(operations) > failed:
+            try:
+                self.on_commit(kind, results)
+            except Exception as e:
+                print(f"   ⚠️  Error en on_commit del escritor: {e}")
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            writes = [operation for operation in batch if operation[0] in (OP_SAVE, OP_UPDATE)]
+            if writes:
+                with self._stats_lock:
+                    self._stats['batches'] += 1
+                    self._stats['largest_batch'] = max(self._stats['largest_batch'], len(writes))
+
+            # Tramos consecutivos del mismo tipo: una transacción cada uno, en orden
+            run = []
+            for operation in batch:
+                kind = operation[0]
+                if run and (kind != run[0][0] or kind not in (OP_SAVE, OP_UPDATE)):
+                    self._write_run(run[0][0], run)
+                    run = []
+                if kind in (OP_SAVE, OP_UPDATE):
+                    run.append(operation)
+                    continue
+                operation[2].set_result(True)  # flush/stop: todo lo anterior ya está escrito
+                if kind == _OP_STOP:
+                    return
+            if run:
+                self._write_run(run[0][0], run)
+
+    def get_stats(self) -> Dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['queued'] = self._queue.qsize()
+        processed = stats['written'] + stats['failed']
+        stats['avg_batch'] = round(processed / stats['batches'], 1) if stats['batches'] else 0
+        stats['max_batch'] = self.max_batch
+        stats['max_delay_ms'] = self.max_delay * 1000
+        stats['running'] = self._thread.is_alive()
+        return stats
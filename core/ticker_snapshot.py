@@ -0,0 +1,156 @@
+# core/ticker_snapshot.py - Snapshot de TODOS los tickers por exchange (una petición por exchange)
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+import requests
+
+from core.http_sessions import http_get as pooled_http_get
+from core.price_extractors import BulkIndex
+
+# Resultado de una búsqueda en el snapshot
+LOOKUP_OK = 'ok'
+LOOKUP_NOT_LISTED = 'not_listed'  # El exchange respondió pero no lista el símbolo
+LOOKUP_UNAVAILABLE = 'unavailable'  # No hay snapshot (sin config bulk, error o rate limit)
+
+
+class TickerSnapshotStore:
+    """
+    Guarda un snapshot en memoria de todos los tickers de cada exchange
+
+    Cada exchange se descarga como mucho una vez por `ttl` segundos (las
+    peticiones concurrentes esperan a la misma descarga) y el precio de cada
+    señal se resuelve en memoria con el símbolo nativo del exchange.
+    """
+
+    def __init__(self, apis_config: Dict, ttl: float = 10,
+                 http_get: Callable = None,
+                 can_fetch: Callable[[str], bool] = None,
+                 on_fetch: Callable[[str, object, float], None] = None,
+                 on_error: Callable[[str], None] = None,
+                 resolve_symbol: Callable[[str, str], Optional[str]] = None,
+                 selective_decode: bool = True):
+        self.apis_config = apis_config
+        self.ttl = ttl
+        self.http_get = http_get or pooled_http_get
+        self.can_fetch = can_fetch
+        self.on_fetch = on_fetch
+        self.on_error = on_error  # Timeouts / errores de conexión de la descarga bulk
+        self.resolve_symbol = resolve_symbol  # (api_id, símbolo MEXC) -> símbolo nativo (índice de instrumentos)
+        self.selective_decode = selective_decode  # Decodificar solo las entradas consultadas
+
+        self._snapshots = {}  # api_id -> (BulkIndex, timestamp monotónico)
+        self._failures = {}  # api_id -> timestamp del último fallo
+        self._locks = {api_id: threading.Lock() for api_id in apis_config}
+        self.fetch_count = 0
+
+    def supports(self, api_id: str) -> bool:
+        """Indica si el exchange tiene endpoint bulk configurado"""
+        config = self.apis_config.get(api_id, {})
+        return bool(config.get('bulk_url'))
+
+    def _is_fresh(self, api_id: str, now: float) -> bool:
+        snapshot = self._snapshots.get(api_id)
+        return snapshot is not None and now - snapshot[1] < self.ttl
+
+    def get_snapshot(self, api_id: str) -> Optional[BulkIndex]:
+        """Devuelve el índice {símbolo nativo: precio} del exchange (None si no disponible)"""
+        if not self.supports(api_id):
+            return None
+
+        if self._is_fresh(api_id, time.monotonic()):
+            return self._snapshots[api_id][0]
+
+        with self._locks[api_id]:
+            # Otro hilo pudo haberlo descargado mientras esperábamos
+            now = time.monotonic()
+            if self._is_fresh(api_id, now):
+                return self._snapshots[api_id][0]
+
+            # No reintentar un exchange caído en cada llamada
+            last_failure = self._failures.get(api_id)
+            if last_failure is not None and now - last_failure < self.ttl:
+                return None
+
+            prices = self._fetch(api_id)
+            if prices is None:
+                self._failures[api_id] = time.monotonic()
+                return None
+
+            self._snapshots[api_id] = (prices, time.monotonic())
+            self._failures.pop(api_id, None)
+            return prices
+
+    def _fetch(self, api_id: str) -> Optional[BulkIndex]:
+        """Descarga el payload bulk de un exchange y lo indexa por símbolo nativo"""
+        config = self.apis_config[api_id]
+
+        if self.can_fetch is not None and not self.can_fetch(api_id):
+            return None
+
+        try:
+            start_time = time.time()
+            response = self.http_get(config['bulk_url'], timeout=config.get('bulk_timeout', config['timeout']))
+            response_time = time.time() - start_time
+            self.fetch_count += 1
+
+            if self.on_fetch is not None:
+                self.on_fetch(api_id, response, response_time)
+
+            if response.status_code != 200:
+                print(f"   ⚠️  {config['name']} (snapshot): HTTP {response.status_code}")
+                return None
+
+            prices = BulkIndex(response.content, config, selective=self.selective_decode)
+            if not len(prices):
+                print(f"   ⚠️  {config['name']} (snapshot): payload vacío")
+                return None
+
+            print(f"   📦 {config['name']}: snapshot con {len(prices)} tickers ({response_time:.2f}s)")
+            return prices
+
+        except requests.exceptions.Timeout:
+            print(f"   ⚠️  {config['name']} (snapshot): Timeout")
+            if self.on_error is not None:
+                self.on_error(api_id)
+        except requests.exceptions.RequestException:
+            print(f"   ⚠️  {config['name']} (snapshot): Error de conexión")
+            if self.on_error is not None:
+                self.on_error(api_id)
+        except Exception as e:
+            print(f"   ⚠️  {config['name']} (snapshot): Error - {str(e)[:50]}")
+        return None
+
+    def lookup(self, api_id: str, symbol: str) -> Tuple[Optional[float], str]:
+        """
+        Busca el precio de un símbolo (formato MEXC 'BTC/USDT:USDT')
+        Retorna (precio, LOOKUP_OK | LOOKUP_NOT_LISTED | LOOKUP_UNAVAILABLE)
+        """
+        prices = self.get_snapshot(api_id)
+        if prices is None:
+            return None, LOOKUP_UNAVAILABLE
+
+        native = None
+        if self.resolve_symbol is not None:
+            native = self.resolve_symbol(api_id, symbol)
+        if native is None:
+            native = self.apis_config[api_id]['format_symbol'](symbol)
+        price = prices.get(native)
+        if price is None:
+            return None, LOOKUP_NOT_LISTED
+        return price, LOOKUP_OK
+
+    def get_stats(self) -> Dict:
+        """Estado de los snapshots por exchange"""
+        now = time.monotonic()
+        stats = {}
+        for api_id in self.apis_config:
+            if not self.supports(api_id):
+                continue
+            snapshot = self._snapshots.get(api_id)
+            stats[api_id] = {
+                'tickers': len(snapshot[0]) if snapshot else 0,
+                'age': round(now - snapshot[1], 1) if snapshot else None,
+                'fresh': self._is_fresh(api_id, now)
+            }
+        return stats
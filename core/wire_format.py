@@ -0,0 +1,175 @@
+# core/wire_format.py - Formatos compactos para /api/operations (columnar JSON / MessagePack) y proyección de campos
+import json
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # Dependencia opcional: sin orjson se usa json estándar
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # Dependencia opcional: sin msgpack solo hay formatos JSON
+    msgpack = None
+
+FORMAT_ROWS = 'json'
+FORMAT_COLUMNAR = 'columnar'
+FORMAT_MSGPACK = 'msgpack'
+
+JSON_MIMETYPE = 'application/json'
+COLUMNAR_MIMETYPE = 'application/vnd.refugio.columnar+json'
+MSGPACK_MIMETYPE = 'application/msgpack'
+MSGPACK_MIMETYPES = (MSGPACK_MIMETYPE, 'application/x-msgpack')
+
+# Campos por defecto de los formatos compactos: sin los duplicados
+# 'signal_type' (= type) ni 'tp1' (= tp)
+COMPACT_FIELDS = (
+    'id', 'symbol', 'type', 'entry', 'current', 'tp', 'sl', 'confidence',
+    'status', 'created_at', 'ma_type', 'ma_length', 'stale'
+)
+OPERATION_FIELDS = COMPACT_FIELDS + ('signal_type', 'tp1')
+
+
+class WireFormatError(ValueError):
+    """Formato o campos pedidos no válidos (la API responde 400/406)"""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+def available_formats() -> List[str]:
+    formats = [FORMAT_ROWS, FORMAT_COLUMNAR]
+    if msgpack is not None:
+        formats.append(FORMAT_MSGPACK)
+    return formats
+
+
+def negotiate_format(requested: Optional[str], accept_mimetypes) -> str:
+    """
+    Formato de respuesta: ?format= tiene prioridad, si no el header Accept
+    `accept_mimetypes` es el objeto Accept de werkzeug (request.accept_mimetypes)
+    """
+    if requested:
+        requested = requested.lower()
+        if requested not in (FORMAT_ROWS, FORMAT_COLUMNAR, FORMAT_MSGPACK):
+            raise WireFormatError(f"Formato desconocido: {requested}")
+        if requested not in available_formats():
+            raise WireFormatError("MessagePack no disponible en este servidor (falta el paquete msgpack)", 406)
+        return requested
+
+    offered = [JSON_MIMETYPE, COLUMNAR_MIMETYPE]
+    if msgpack is not None:
+        offered += list(MSGPACK_MIMETYPES)
+    best = accept_mimetypes.best_match(offered, default=JSON_MIMETYPE)
+    if best == COLUMNAR_MIMETYPE:
+        return FORMAT_COLUMNAR
+    if best in MSGPACK_MIMETYPES:
+        return FORMAT_MSGPACK
+    return FORMAT_ROWS
+
+
+def parse_fields(raw: Optional[str], allowed: Iterable[str] = None) -> Optional[List[str]]:
+    """'id,symbol,current' -> ['id', 'symbol', 'current'] (None si no se pidió proyección)"""
+    if not raw:
+        return None
+    fields = list(dict.fromkeys(field.strip() for field in raw.split(',') if field.strip()))
+    if allowed is not None:
+        unknown = [field for field in fields if field not in allowed]
+        if unknown:
+            raise WireFormatError(f"Campos desconocidos: {', '.join(unknown)}")
+    return fields or None
+
+
+def project(rows: List[Dict], fields: List[str]) -> List[Dict]:
+    return [{field: row.get(field) for field in fields} for row in rows]
+
+
+def to_columns(rows: List[Dict], fields: List[str]) -> Dict[str, List]:
+    """Una lista por campo: las claves se envían una sola vez"""
+    return {field: [row.get(field) for row in rows] for field in fields}
+
+
+def encode_json(payload) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload, default=str)
+    return json.dumps(payload, separators=(',', ':'), default=str).encode()
+
+
+def encode_operations(payload: Dict, fmt: str, fields: Optional[List[str]] = None) -> Tuple[bytes, str]:
+    """
+    Serializa una respuesta de /api/operations; retorna (bytes, mimetype)
+
+    - json: filas como siempre (con proyección si se pidió ?fields=)
+    - columnar / msgpack: payload['data'] pasa a {campo: [valores]} y se
+      agrega payload['fields'] con el orden de las columnas
+    El resto de las claves (version, removed, prices...) no cambia.
+    """
+    rows = payload.get('data') or []
+    if fmt == FORMAT_ROWS:
+        if fields:
+            payload = {**payload, 'data': project(rows, fields)}
+        return encode_json(payload), JSON_MIMETYPE
+
+    fields = fields or list(COMPACT_FIELDS)
+    payload = {**payload, 'format': FORMAT_COLUMNAR, 'fields': fields, 'data': to_columns(rows, fields)}
+    if fmt == FORMAT_MSGPACK:
+        return msgpack.packb(payload, use_bin_type=True, default=str), MSGPACK_MIMETYPE
+    return encode_json(payload), COLUMNAR_MIMETYPE
+
+
+def _sample_payload(count: int) -> Dict:
+    signals = [
+        {
+            'id': i, 'symbol': f"T{i}", 'signal_type': 'long' if i % 2 else 'short',
+            'type': 'LONG' if i % 2 else 'SHORT', 'entry': 1 + i / 7, 'tp1': 1.1 + i / 7,
+            'tp': 1.1 + i / 7, 'sl': 0.9 + i / 7, 'confidence': 70.0 + i % 25,
+            'status': 'active', 'created_at': f"2024-05-{1 + i % 28:02d} 12:{i % 60:02d}:00",
+            'ma_type': 'EMA', 'ma_length': 200, 'current': 1 + i / 6.5, 'stale': False
+        }
+        for i in range(count)
+    ]
+    return {'success': True, 'delta': False, 'version': 1, 'data': signals,
+            'count': count, 'timestamp': '2024-05-01T12:00:00'}
+
+
+def benchmark(count: int = 500, rounds: int = 50) -> Dict[str, Dict[str, float]]:
+    """
+    Tamaño (bytes) y tiempo de serialización (µs) por formato
+    'rows_stdlib' es la línea base: json estándar con todas las claves por fila
+    """
+    payload = _sample_payload(count)
+
+    def stdlib_rows():
+        return json.dumps(payload).encode()
+
+    cases = {
+        'rows_stdlib': stdlib_rows,
+        'rows': lambda: encode_operations(payload, FORMAT_ROWS)[0],
+        'columnar': lambda: encode_operations(payload, FORMAT_COLUMNAR)[0],
+        'columnar_projected': lambda: encode_operations(payload, FORMAT_COLUMNAR, ['id', 'symbol', 'current'])[0]
+    }
+    if msgpack is not None:
+        cases['msgpack'] = lambda: encode_operations(payload, FORMAT_MSGPACK)[0]
+
+    results = {}
+    for name, encode in cases.items():
+        start = time.perf_counter()
+        for _ in range(rounds):
+            body = encode()
+        results[name] = {
+            'bytes': len(body),
+            'encode_us': round((time.perf_counter() - start) / rounds * 1e6, 1)
+        }
+    return results
+
+
+if __name__ == "__main__":
+    print(f"🔬 Benchmark de formatos (orjson: {'sí' if orjson is not None else 'no'}, "
+          f"msgpack: {'sí' if msgpack is not None else 'no'})")
+    results = benchmark()
+    base = results['rows_stdlib']
+    for name, row in results.items():
+        print(f"   {name:>18}: {row['bytes']:>7} bytes ({row['bytes'] / base['bytes']:.2f}x) "
+              f"{row['encode_us']:>8.1f} µs ({row['encode_us'] / base['encode_us']:.2f}x)")
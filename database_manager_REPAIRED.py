@@ -5,211 +5,168 @@ Problema original: volume_ratio no se guardaba (siempre 0 o NULL)
 Solución: Inserción correcta con validación y fallbacks seguros
 """
 
+import atexit
+import os
 import sqlite3
 import json
+import threading
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+
+from core.db_connection import checkpoint, get_connection_pool
+from core.db_schema import SCHEMA_VERSION, migrate
+from core.signal_writer import OP_SAVE, SignalWriter
+
+# INSERCIÓN CON VALIDACIÓN COMPLETA + LEVERAGE (una fila = tupla de _prepare_signal_row)
+INSERT_SIGNAL_SQL = """
+    INSERT INTO signals (
+        symbol, signal_type, entry, tp1, sl, confidence, rr_ratio,
+        rsi, macd, macd_signal, macd_histogram, ema9, ema21, atr,
+        volume_ratio, adx, ma_type, ma_length, strategy_version, emergency_mode,
+        leverage
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Write-behind (SIGNAL_WRITE_BEHIND=1): las escrituras se encolan a un único hilo escritor
+# que las agrupa en lotes (group commit) en vez de competir por el lock de signals.db
+WRITE_BEHIND_ENABLED = os.environ.get('SIGNAL_WRITE_BEHIND', '0') == '1'
+WRITE_BEHIND_MAX_BATCH = int(os.environ.get('SIGNAL_WRITE_BATCH', '500'))
+WRITE_BEHIND_MAX_DELAY = float(os.environ.get('SIGNAL_WRITE_DELAY_MS', '20')) / 1000
+
+# Límite de variables por sentencia en SQLite viejos (consultas con IN (...))
+SQLITE_MAX_VARIABLES = 999
 
 class DatabaseManager:
     def __init__(self, db_path: str = "signals.db"):
         self.db_path = db_path
+        # Conexiones persistentes (WAL, busy_timeout): sin abrir/cerrar por operación
+        self.pool = get_connection_pool(db_path)
         self.init_database()
         print(f"🗄️ DatabaseManager REPARADO inicializado: {db_path}")
     
     def init_database(self):
-        """Inicializa la base de datos con estructura CORREGIDA"""
+        """
+        Inicializa la base de datos con estructura CORREGIDA
+        Migraciones versionadas (PRAGMA user_version): con la base al día no hay trabajo de esquema
+        """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Crear tabla con estructura COMPLETAMENTE CORREGIDA
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS signals (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    symbol TEXT NOT NULL,
-                    signal_type TEXT NOT NULL,
-                    entry REAL NOT NULL,
-                    tp1 REAL NOT NULL,
-                    sl REAL NOT NULL,
-                    confidence REAL NOT NULL,
-                    rr_ratio REAL NOT NULL,
-                    
-                    -- Indicadores técnicos CORREGIDOS
-                    rsi REAL DEFAULT 50.0,
-                    macd REAL DEFAULT 0.0,
-                    macd_signal REAL DEFAULT 0.0,
-                    macd_histogram REAL DEFAULT 0.0,
-                    ema9 REAL,
-                    ema21 REAL,
-                    atr REAL,
-                    volume_ratio REAL DEFAULT 1.0,
-                    adx REAL DEFAULT 0.0,
-                    
-                    -- Metadatos
-                    fecha_envio TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    resultado TEXT,
-                    strategy_version TEXT DEFAULT 'REPAIRED_v1.0',
-                    emergency_mode BOOLEAN DEFAULT 1,
-                    
-                    -- Seguimiento
-                    seguimiento_json TEXT,
-                    estado_json TEXT,
-                    fecha_actualizacion TIMESTAMP
-                )
-            """)
-            
-            # Verificar si necesitamos agregar columnas faltantes
-            cursor.execute("PRAGMA table_info(signals)")
-            existing_columns = [row[1] for row in cursor.fetchall()]
-            
-            columns_to_add = [
-                ("macd_signal", "REAL DEFAULT 0.0"),
-                ("macd_histogram", "REAL DEFAULT 0.0"),
-                ("ema9", "REAL"),
-                ("ema21", "REAL"),
-                ("atr", "REAL"),
-                ("volume_ratio", "REAL DEFAULT 1.0"),
-                ("adx", "REAL DEFAULT 0.0"),
-                ("ma_type", "TEXT DEFAULT 'SMA'"),
-                ("ma_length", "INTEGER DEFAULT 10"),
-                ("strategy_version", "TEXT DEFAULT 'REPAIRED_v1.0'"),
-                ("emergency_mode", "BOOLEAN DEFAULT 1"),
-                ("fecha_actualizacion", "TIMESTAMP")
-            ]
-            
-            for column_name, column_def in columns_to_add:
-                if column_name not in existing_columns:
-                    cursor.execute(f"ALTER TABLE signals ADD COLUMN {column_name} {column_def}")
-                    print(f"   ✅ Columna {column_name} agregada")
-            
-            # CORRECCIÓN CRÍTICA: Actualizar volume_ratio = 0 a 1.0
-            cursor.execute("""
-                UPDATE signals 
-                SET volume_ratio = 1.0 
-                WHERE volume_ratio = 0 OR volume_ratio IS NULL
-            """)
-            
-            updated_rows = cursor.rowcount
-            if updated_rows > 0:
-                print(f"   🔧 {updated_rows} registros con volume_ratio corregidos (0 -> 1.0)")
-            
-            conn.commit()
-            conn.close()
-            print("   ✅ Estructura de base de datos CORREGIDA")
+            with self.pool.connection() as conn:
+                applied = migrate(conn)
+            if applied:
+                print(f"   ✅ Estructura de base de datos CORREGIDA (versión {SCHEMA_VERSION})")
             
         except Exception as e:
             print(f"   ❌ Error inicializando base de datos: {e}")
     
-    def save_signal(self, signal_data: Dict[str, Any]) -> bool:
-        """Guarda señal con VALIDACIÓN COMPLETA incluyendo LEVERAGE"""
+    def _prepare_signal_row(self, signal_data: Dict[str, Any]) -> tuple:
+        """Valida y completa una señal en Python; retorna la tupla para INSERT_SIGNAL_SQL"""
+        # Extraer datos con VALIDACIÓN ESTRICTA
+        symbol = str(signal_data.get('symbol', 'UNKNOWN'))
+        signal_type = str(signal_data.get('signal', 'UNKNOWN'))
+        entry = float(signal_data.get('entry', 0))
+        tp1 = float(signal_data.get('tp', 0))
+        sl = float(signal_data.get('sl', 0))
+        confidence = float(signal_data.get('confidence', 0))
+        rr_ratio = float(signal_data.get('rr', 0))
+        
+        # Indicadores técnicos con FALLBACKS SEGUROS
+        indicators = signal_data.get('latest_indicators', {})
+        rsi = float(indicators.get('rsi', 50.0))
+        macd = float(indicators.get('macd', 0.0))
+        macd_signal = float(indicators.get('macd_signal', 0.0))
+        macd_histogram = float(indicators.get('macd_histogram', 0.0))
+        ema9 = float(indicators.get('ema9', entry))
+        ema21 = float(indicators.get('ema21', entry))
+        atr = float(indicators.get('atr', entry * 0.01))
+        
+        # CORRECCIÓN CRÍTICA PARA VOLUME_RATIO
+        volume_ratio_raw = indicators.get('volume_ratio', 1.0)
+        
+        # Validación estricta de volume_ratio
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Extraer datos con VALIDACIÓN ESTRICTA
-            symbol = str(signal_data.get('symbol', 'UNKNOWN'))
-            signal_type = str(signal_data.get('signal', 'UNKNOWN'))
-            entry = float(signal_data.get('entry', 0))
-            tp1 = float(signal_data.get('tp', 0))
-            sl = float(signal_data.get('sl', 0))
-            confidence = float(signal_data.get('confidence', 0))
-            rr_ratio = float(signal_data.get('rr', 0))
-            
-            # Indicadores técnicos con FALLBACKS SEGUROS
-            indicators = signal_data.get('latest_indicators', {})
-            rsi = float(indicators.get('rsi', 50.0))
-            macd = float(indicators.get('macd', 0.0))
-            macd_signal = float(indicators.get('macd_signal', 0.0))
-            macd_histogram = float(indicators.get('macd_histogram', 0.0))
-            ema9 = float(indicators.get('ema9', entry))
-            ema21 = float(indicators.get('ema21', entry))
-            atr = float(indicators.get('atr', entry * 0.01))
-            
-            # CORRECCIÓN CRÍTICA PARA VOLUME_RATIO
-            volume_ratio_raw = indicators.get('volume_ratio', 1.0)
+            volume_ratio = float(volume_ratio_raw)
             
-            # Validación estricta de volume_ratio
-            try:
-                volume_ratio = float(volume_ratio_raw)
-                
-                # FORZAR que volume_ratio sea válido
-                if volume_ratio <= 0 or volume_ratio != volume_ratio:  # NaN check
-                    volume_ratio = 1.0
-                    print(f"   🔧 Volume_ratio inválido corregido: {volume_ratio_raw} -> 1.0")
-                elif volume_ratio > 100:  # Valor extremo
-                    volume_ratio = min(volume_ratio, 10.0)
-                    print(f"   🔧 Volume_ratio extremo limitado: {volume_ratio_raw} -> {volume_ratio}")
-                
-            except (ValueError, TypeError):
+            # FORZAR que volume_ratio sea válido
+            if volume_ratio <= 0 or volume_ratio != volume_ratio:  # NaN check
                 volume_ratio = 1.0
-                print(f"   🔧 Volume_ratio no numérico corregido: {volume_ratio_raw} -> 1.0")
-            
-            adx = float(indicators.get('adx', 0.0))
+                print(f"   🔧 Volume_ratio inválido corregido: {volume_ratio_raw} -> 1.0")
+            elif volume_ratio > 100:  # Valor extremo
+                volume_ratio = min(volume_ratio, 10.0)
+                print(f"   🔧 Volume_ratio extremo limitado: {volume_ratio_raw} -> {volume_ratio}")
+            
+        except (ValueError, TypeError):
+            volume_ratio = 1.0
+            print(f"   🔧 Volume_ratio no numérico corregido: {volume_ratio_raw} -> 1.0")
+        
+        adx = float(indicators.get('adx', 0.0))
 
-            # MA Type y Length
-            ma_type = str(signal_data.get('ma_type', 'SMA'))
-            ma_length = int(signal_data.get('ma_length', 10))
+        # MA Type y Length
+        ma_type = str(signal_data.get('ma_type', 'SMA'))
+        ma_length = int(signal_data.get('ma_length', 10))
 
-            # Metadatos
-            strategy_version = str(signal_data.get('fix_version', 'REPAIRED_v1.0'))
-            emergency_mode = bool(signal_data.get('emergency_mode', True))
-            
-            # ✅ LEVERAGE - SISTEMA 1 (NUEVO)
-            leverage = int(signal_data.get('leverage', 5))
-            if leverage < 1 or leverage > 30:
-                leverage = 5
-            
-            print(f"   📊 DATOS A GUARDAR:")
-            print(f"      Symbol: {symbol}")
-            print(f"      Leverage: {leverage}x ← GUARDANDO")
-            print(f"      Confidence: {confidence:.1f}%")
-            print(f"      RR ratio: {rr_ratio:.2f}")
-            
-            # INSERCIÓN CON VALIDACIÓN COMPLETA + LEVERAGE
-            cursor.execute("""
-                INSERT INTO signals (
-                    symbol, signal_type, entry, tp1, sl, confidence, rr_ratio,
-                    rsi, macd, macd_signal, macd_histogram, ema9, ema21, atr,
-                    volume_ratio, adx, ma_type, ma_length, strategy_version, emergency_mode,
-                    leverage
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                symbol, signal_type, entry, tp1, sl, confidence, rr_ratio,
-                rsi, macd, macd_signal, macd_histogram, ema9, ema21, atr,
-                volume_ratio, adx, ma_type, ma_length, strategy_version, emergency_mode,
-                leverage
-            ))
-            
-            signal_id = cursor.lastrowid
-            conn.commit()
-            
-            # VERIFICACIÓN INMEDIATA
-            cursor.execute("""
-                SELECT volume_ratio, confidence, rr_ratio 
-                FROM signals 
-                WHERE id = ?
-            """, (signal_id,))
-            
-            verification = cursor.fetchone()
-            
-            if verification:
-                saved_vol_ratio, saved_conf, saved_rr = verification
-                # print(f"   ✅ SEÑAL GUARDADA Y VERIFICADA:")  # Silenciado
-                # print(f"      ID: {signal_id}")  # Silenciado
-                # print(f"      Volume_ratio guardado: {saved_vol_ratio:.3f}")  # Silenciado
-                # print(f"      Confidence guardada: {saved_conf:.1f}%")  # Silenciado
-                # print(f"      RR ratio guardado: {saved_rr:.2f}")  # Silenciado
+        # Metadatos
+        strategy_version = str(signal_data.get('fix_version', 'REPAIRED_v1.0'))
+        emergency_mode = bool(signal_data.get('emergency_mode', True))
+        
+        # ✅ LEVERAGE - SISTEMA 1 (NUEVO)
+        leverage = int(signal_data.get('leverage', 5))
+        if leverage < 1 or leverage > 30:
+            leverage = 5
+        
+        return (
+            symbol, signal_type, entry, tp1, sl, confidence, rr_ratio,
+            rsi, macd, macd_signal, macd_histogram, ema9, ema21, atr,
+            volume_ratio, adx, ma_type, ma_length, strategy_version, emergency_mode,
+            leverage
+        )
+    
+    def save_signal(self, signal_data: Dict[str, Any]) -> bool:
+        """Guarda señal con VALIDACIÓN COMPLETA incluyendo LEVERAGE"""
+        try:
+            with self.pool.connection() as conn:
+                cursor = conn.cursor()
+                
+                row = self._prepare_signal_row(signal_data)
+                symbol, confidence, rr_ratio, leverage = row[0], row[5], row[6], row[20]
+                
+                print(f"   📊 DATOS A GUARDAR:")
+                print(f"      Symbol: {symbol}")
+                print(f"      Leverage: {leverage}x ← GUARDANDO")
+                print(f"      Confidence: {confidence:.1f}%")
+                print(f"      RR ratio: {rr_ratio:.2f}")
+                
+                # INSERCIÓN CON VALIDACIÓN COMPLETA + LEVERAGE
+                cursor.execute(INSERT_SIGNAL_SQL, row)
+                
+                signal_id = cursor.lastrowid
+                conn.commit()
+                
+                # VERIFICACIÓN INMEDIATA
+                cursor.execute("""
+                    SELECT volume_ratio, confidence, rr_ratio 
+                    FROM signals 
+                    WHERE id = ?
+                """, (signal_id,))
+                
+                verification = cursor.fetchone()
                 
-                # Verificar que volume_ratio se guardó correctamente
-                if saved_vol_ratio > 0:
-                    # print(f"   🎉 ÉXITO: Volume_ratio > 0 guardado correctamente")  # Silenciado
-                    pass
+                if verification:
+                    saved_vol_ratio, saved_conf, saved_rr = verification
+                    # print(f"   ✅ SEÑAL GUARDADA Y VERIFICADA:")  # Silenciado
+                    # print(f"      ID: {signal_id}")  # Silenciado
+                    # print(f"      Volume_ratio guardado: {saved_vol_ratio:.3f}")  # Silenciado
+                    # print(f"      Confidence guardada: {saved_conf:.1f}%")  # Silenciado
+                    # print(f"      RR ratio guardado: {saved_rr:.2f}")  # Silenciado
+                    
+                    # Verificar que volume_ratio se guardó correctamente
+                    if saved_vol_ratio > 0:
+                        # print(f"   🎉 ÉXITO: Volume_ratio > 0 guardado correctamente")  # Silenciado
+                        pass
+                    else:
+                        print(f"   ❌ ERROR: Volume_ratio sigue siendo 0 después de guardar")
                 else:
-                    print(f"   ❌ ERROR: Volume_ratio sigue siendo 0 después de guardar")
-            else:
-                print(f"   ❌ ERROR: No se pudo verificar la señal guardada")
-            
-            conn.close()
+                    print(f"   ❌ ERROR: No se pudo verificar la señal guardada")
+                
             return True
             
         except Exception as e:
@@ -218,20 +175,141 @@ class DatabaseManager:
             traceback.print_exc()
             return False
     
+    def save_signals_bulk(self, signals: List[Dict[str, Any]], verify: bool = False) -> List[Dict[str, Any]]:
+        """
+        Guarda varias señales en UNA transacción (un solo commit/fsync)
+        
+        - La validación y los valores por defecto se resuelven en Python antes de
+          tocar la base; una señal inválida no impide guardar las demás
+        - executemany para el lote; si falla una restricción se reintenta fila
+          por fila dentro de la misma transacción para aislar a la culpable
+        - verify=True relee las filas guardadas (volume_ratio > 0)
+        
+        Retorna un resultado por señal, en el mismo orden:
+        {'index', 'ok', 'id', 'error'} (+ 'verified' si verify=True)
+        """
+        results = [{'index': index, 'ok': False, 'id': None, 'error': None} for index in range(len(signals))]
+        prepared = []  # (índice, fila)
+        for index, signal_data in enumerate(signals):
+            try:
+                prepared.append((index, self._prepare_signal_row(signal_data)))
+            except (ValueError, TypeError, AttributeError) as e:
+                results[index]['error'] = f"Datos inválidos: {e}"
+        
+        if not prepared:
+            return results
+        
+        try:
+            with self.pool.transaction() as conn:
+                try:
+                    conn.execute("SAVEPOINT bulk_insert")
+                    conn.executemany(INSERT_SIGNAL_SQL, [row for _index, row in prepared])
+                    conn.execute("RELEASE bulk_insert")
+                    # Un solo INSERT con el lock de escritura tomado: los rowid son consecutivos
+                    last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+                    first_id = last_id - len(prepared) + 1
+                    for offset, (index, _row) in enumerate(prepared):
+                        results[index].update(ok=True, id=first_id + offset)
+                except sqlite3.IntegrityError:
+                    conn.execute("ROLLBACK TO bulk_insert")
+                    conn.execute("RELEASE bulk_insert")
+                    for index, row in prepared:
+                        try:
+                            cursor = conn.execute(INSERT_SIGNAL_SQL, row)
+                            results[index].update(ok=True, id=cursor.lastrowid)
+                        except sqlite3.IntegrityError as e:
+                            results[index]['error'] = str(e)
+        
+        except Exception as e:
+            print(f"   ❌ Error guardando lote de señales: {e}")
+            for index, _row in prepared:
+                results[index].update(ok=False, id=None, error=str(e))
+            return results
+        
+        saved = [result for result in results if result['ok']]
+        print(f"   ✅ Lote guardado: {len(saved)}/{len(signals)} señales en una transacción")
+        
+        if verify and saved:
+            self._verify_saved(saved)
+        return results
+    
+    def _verify_saved(self, results: List[Dict[str, Any]]):
+        """VERIFICACIÓN de un lote: la fila existe y volume_ratio > 0"""
+        ids = [result['id'] for result in results]
+        volume_ratios = {}
+        with self.pool.connection() as conn:
+            for start in range(0, len(ids), SQLITE_MAX_VARIABLES):
+                chunk = ids[start:start + SQLITE_MAX_VARIABLES]
+                rows = conn.execute(
+                    f"SELECT id, volume_ratio FROM signals WHERE id IN ({', '.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                volume_ratios.update(rows)
+        
+        for result in results:
+            saved_vol_ratio = volume_ratios.get(result['id'])
+            result['verified'] = saved_vol_ratio is not None and saved_vol_ratio > 0
+            if not result['verified']:
+                print(f"   ❌ ERROR: Señal {result['id']} no verificada (volume_ratio={saved_vol_ratio})")
+    
+    def update_signal_results_bulk(self, updates) -> List[Dict[str, Any]]:
+        """
+        Actualiza el resultado de varias señales en UNA transacción
+        `updates`: dict {signal_id: resultado} o lista de (signal_id, resultado)
+        Retorna [{'id', 'resultado', 'ok', 'error'}] en el orden recibido
+        """
+        pairs = list(updates.items()) if isinstance(updates, dict) else [tuple(pair) for pair in updates]
+        results = [{'id': signal_id, 'resultado': resultado, 'ok': False, 'error': None}
+                   for signal_id, resultado in pairs]
+        if not pairs:
+            return results
+        
+        try:
+            with self.pool.transaction() as conn:
+                # Ids existentes (dentro de la transacción: nadie puede borrarlos en el medio)
+                ids = list(dict.fromkeys(signal_id for signal_id, _resultado in pairs))
+                existing = set()
+                for start in range(0, len(ids), SQLITE_MAX_VARIABLES):
+                    chunk = ids[start:start + SQLITE_MAX_VARIABLES]
+                    existing.update(row[0] for row in conn.execute(
+                        f"SELECT id FROM signals WHERE id IN ({', '.join('?' * len(chunk))})", chunk
+                    ).fetchall())
+                
+                conn.executemany("""
+                    UPDATE signals 
+                    SET resultado = ?, fecha_actualizacion = CURRENT_TIMESTAMP
+                    WHERE id = ?
+                """, [(resultado, signal_id) for signal_id, resultado in pairs if signal_id in existing])
+        
+        except Exception as e:
+            print(f"   ❌ Error actualizando lote de resultados: {e}")
+            for result in results:
+                result['error'] = str(e)
+            return results
+        
+        for result in results:
+            if result['id'] in existing:
+                result['ok'] = True
+            else:
+                result['error'] = "Señal no encontrada"
+        
+        updated = sum(1 for result in results if result['ok'])
+        print(f"   ✅ Resultados actualizados: {updated}/{len(results)} en una transacción")
+        return results
+    
     def update_signal_result(self, signal_id: int, resultado: str) -> bool:
         """Actualiza el resultado de una señal"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                UPDATE signals 
-                SET resultado = ?, fecha_actualizacion = CURRENT_TIMESTAMP
-                WHERE id = ?
-            """, (resultado, signal_id))
-            
-            conn.commit()
-            conn.close()
+            with self.pool.connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute("""
+                    UPDATE signals 
+                    SET resultado = ?, fecha_actualizacion = CURRENT_TIMESTAMP
+                    WHERE id = ?
+                """, (resultado, signal_id))
+                
+                conn.commit()
             
             print(f"   ✅ Resultado actualizado: ID {signal_id} -> {resultado}")
             return True
@@ -243,30 +321,28 @@ class DatabaseManager:
     def get_signal_stats(self) -> Dict[str, Any]:
         """Obtiene estadísticas de señales INCLUYENDO volume_ratio"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Estadísticas básicas
-            cursor.execute("""
-                SELECT 
-                    COUNT(*) as total,
-                    COUNT(CASE WHEN resultado = 'TP1' THEN 1 END) as tp1,
-                    COUNT(CASE WHEN resultado = 'SL' THEN 1 END) as sl,
-                    AVG(confidence) as avg_confidence,
-                    AVG(rr_ratio) as avg_rr_ratio,
-                    AVG(volume_ratio) as avg_volume_ratio,
-                    MIN(volume_ratio) as min_volume_ratio,
-                    MAX(volume_ratio) as max_volume_ratio,
-                    COUNT(CASE WHEN volume_ratio > 0 THEN 1 END) as positive_volume_count
-                FROM signals
-            """)
-            
-            stats = cursor.fetchone()
-            total, tp1, sl, avg_conf, avg_rr, avg_vol, min_vol, max_vol, pos_vol = stats
-            
-            success_rate = (tp1 / total * 100) if total > 0 else 0
-            
-            conn.close()
+            with self.pool.connection() as conn:
+                cursor = conn.cursor()
+                
+                # Estadísticas básicas
+                cursor.execute("""
+                    SELECT 
+                        COUNT(*) as total,
+                        COUNT(CASE WHEN resultado = 'TP1' THEN 1 END) as tp1,
+                        COUNT(CASE WHEN resultado = 'SL' THEN 1 END) as sl,
+                        AVG(confidence) as avg_confidence,
+                        AVG(rr_ratio) as avg_rr_ratio,
+                        AVG(volume_ratio) as avg_volume_ratio,
+                        MIN(volume_ratio) as min_volume_ratio,
+                        MAX(volume_ratio) as max_volume_ratio,
+                        COUNT(CASE WHEN volume_ratio > 0 THEN 1 END) as positive_volume_count
+                    FROM signals
+                """)
+                
+                stats = cursor.fetchone()
+                total, tp1, sl, avg_conf, avg_rr, avg_vol, min_vol, max_vol, pos_vol = stats
+                
+                success_rate = (tp1 / total * 100) if total > 0 else 0
             
             return {
                 'total_signals': total,
@@ -289,32 +365,31 @@ class DatabaseManager:
     def fix_existing_volume_ratios(self) -> int:
         """Corrige volume_ratios existentes que sean 0 o NULL"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Contar registros problemáticos
-            cursor.execute("""
-                SELECT COUNT(*) FROM signals 
-                WHERE volume_ratio = 0 OR volume_ratio IS NULL
-            """)
-            problematic_count = cursor.fetchone()[0]
-            
-            if problematic_count > 0:
-                print(f"   🔧 Corrigiendo {problematic_count} registros con volume_ratio problemático")
+            with self.pool.connection() as conn:
+                cursor = conn.cursor()
                 
-                # Corregir a 1.0 (valor neutro)
+                # Contar registros problemáticos
                 cursor.execute("""
-                    UPDATE signals 
-                    SET volume_ratio = 1.0, 
-                        strategy_version = 'VOLUME_RATIO_FIXED',
-                        fecha_actualizacion = CURRENT_TIMESTAMP
+                    SELECT COUNT(*) FROM signals 
                     WHERE volume_ratio = 0 OR volume_ratio IS NULL
                 """)
+                problematic_count = cursor.fetchone()[0]
+                
+                if problematic_count > 0:
+                    print(f"   🔧 Corrigiendo {problematic_count} registros con volume_ratio problemático")
+                    
+                    # Corregir a 1.0 (valor neutro)
+                    cursor.execute("""
+                        UPDATE signals 
+                        SET volume_ratio = 1.0, 
+                            strategy_version = 'VOLUME_RATIO_FIXED',
+                            fecha_actualizacion = CURRENT_TIMESTAMP
+                        WHERE volume_ratio = 0 OR volume_ratio IS NULL
+                    """)
+                    
+                    conn.commit()
+                    print(f"   ✅ {problematic_count} registros corregidos (volume_ratio = 1.0)")
                 
-                conn.commit()
-                print(f"   ✅ {problematic_count} registros corregidos (volume_ratio = 1.0)")
-            
-            conn.close()
             return problematic_count
             
         except Exception as e:
@@ -331,9 +406,48 @@ def get_database_manager():
         _db_manager = DatabaseManager()
     return _db_manager
 
+# Escritor único (write-behind)
+_signal_writer = None
+_signal_writer_lock = threading.Lock()
+
+def _sync_after_commit(kind, results):
+    """El escritor sincroniza a GitHub UNA vez por lote de señales nuevas"""
+    if kind == OP_SAVE:
+        sync_db_to_github()
+
+def get_signal_writer():
+    """Escritor único de señales (se crea al primer uso y vacía su cola al salir del proceso)"""
+    global _signal_writer
+    if _signal_writer is None:
+        with _signal_writer_lock:
+            if _signal_writer is None:
+                db = get_database_manager()
+                _signal_writer = SignalWriter(
+                    db.save_signals_bulk,
+                    db.update_signal_results_bulk,
+                    max_batch=WRITE_BEHIND_MAX_BATCH,
+                    max_delay=WRITE_BEHIND_MAX_DELAY,
+                    on_commit=_sync_after_commit
+                )
+                atexit.register(_signal_writer.close)
+    return _signal_writer
+
+def flush_signal_writes(timeout=None):
+    """Espera a que las escrituras encoladas estén en la base (no-op sin write-behind)"""
+    if _signal_writer is None:
+        return True
+    return _signal_writer.flush(timeout)
+
 # Funciones de compatibilidad
 def save_signal_to_db(signal_data):
-    """Guarda señal usando database manager REPARADO y sincroniza a GitHub"""
+    """
+    Guarda señal usando database manager REPARADO y sincroniza a GitHub
+    Con write-behind solo la encola: True = aceptada (usar submit_signal_to_db para el resultado)
+    """
+    if WRITE_BEHIND_ENABLED:
+        get_signal_writer().submit_signal(signal_data)
+        return True
+    
     db = get_database_manager()
     success = db.save_signal(signal_data)
     
@@ -346,6 +460,19 @@ def save_signal_to_db(signal_data):
     
     return success
 
+def save_signals_to_db(signals):
+    """Guarda un lote de señales (una transacción) y sincroniza a GitHub UNA vez"""
+    db = get_database_manager()
+    results = db.save_signals_bulk(signals)
+    
+    if any(result['ok'] for result in results):
+        try:
+            sync_db_to_github()
+        except Exception as e:
+            print(f"   ⚠️  Error sincronizando a GitHub: {e}")
+    
+    return results
+
 def sync_db_to_github():
     """Sincroniza signals.db a GitHub automáticamente"""
     import subprocess
@@ -360,6 +487,9 @@ def sync_db_to_github():
         if not os.path.exists('signals.db'):
             return False
         
+        # Volcar el WAL al archivo principal: git solo sube signals.db
+        checkpoint('signals.db')
+        
         # Agregar signals.db
         subprocess.run(['git', 'add', 'signals.db'], capture_output=True, check=False)
         
@@ -388,11 +518,31 @@ def sync_db_to_github():
         print(f"   ⚠️  Error en sincronización: {str(e)[:100]}")
         return False
 
+def submit_signal_to_db(signal_data):
+    """Encola la señal en el escritor único; Future -> {'ok', 'id', 'error'}"""
+    return get_signal_writer().submit_signal(signal_data)
+
 def update_signal_result(signal_id, resultado):
-    """Actualiza resultado usando database manager REPARADO"""
+    """
+    Actualiza resultado usando database manager REPARADO
+    Con write-behind solo lo encola: True = aceptado (usar submit_signal_result para el resultado)
+    """
+    if WRITE_BEHIND_ENABLED:
+        get_signal_writer().submit_result(signal_id, resultado)
+        return True
+    
     db = get_database_manager()
     return db.update_signal_result(signal_id, resultado)
 
+def submit_signal_result(signal_id, resultado):
+    """Encola la actualización en el escritor único; Future -> {'ok', 'id', 'error'}"""
+    return get_signal_writer().submit_result(signal_id, resultado)
+
+def update_signal_results(updates):
+    """Actualiza varios resultados en una transacción usando database manager REPARADO"""
+    db = get_database_manager()
+    return db.update_signal_results_bulk(updates)
+
 def get_signal_statistics():
     """Obtiene estadísticas usando database manager REPARADO"""
     db = get_database_manager()
@@ -432,6 +582,7 @@ def test_volume_ratio_saving():
     }
     
     success = save_signal_to_db(test_signal)
+    flush_signal_writes()  # Con write-behind la señal puede estar todavía en cola
     
     if success:
         # Verificar estadísticas
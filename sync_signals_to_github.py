@@ -8,6 +8,8 @@ import subprocess
 import os
 from datetime import datetime
 
+from core.db_connection import checkpoint
+
 def sync_signals_db():
     """Sincroniza signals.db a GitHub"""
     
@@ -28,6 +30,9 @@ def sync_signals_db():
         
         print("✅ signals.db encontrado")
         
+        # Volcar el WAL al archivo principal: git solo sube signals.db
+        checkpoint('signals.db')
+        
         # 1. Agregar signals.db
         print("\n📤 Agregando signals.db a Git...")
         result = subprocess.run(['git', 'add', 'signals.db'], capture_output=True, text=True)
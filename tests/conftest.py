@@ -0,0 +1,47 @@
+# tests/conftest.py - Fixtures compartidas: copia temporal de signals.db (la base real nunca se toca)
+import os
+import shutil
+import sqlite3
+
+import pytest
+
+from database_manager_REPAIRED import DatabaseManager
+
+SHIPPED_DB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'signals.db')
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Copia de la signals.db del repo (mismo esquema que producción)"""
+    path = str(tmp_path / 'signals.db')
+    shutil.copyfile(SHIPPED_DB, path)
+    return path
+
+
+@pytest.fixture
+def db(db_path):
+    """DatabaseManager sobre la copia (con las migraciones aplicadas)"""
+    manager = DatabaseManager(db_path)
+    yield manager
+    manager.pool.close_all()
+
+
+def insert_signals(db_path, rows):
+    """Inserta filas crudas: [(symbol, signal_type, status, created_at)]"""
+    conn = sqlite3.connect(db_path)
+    conn.executemany("""
+        INSERT INTO signals (symbol, signal_type, entry, tp1, sl, confidence, status, created_at)
+        VALUES (?, ?, 100.0, 102.0, 98.0, 70.0, ?, ?)
+    """, rows)
+    conn.commit()
+    conn.close()
+
+
+def make_signal(i, prefix='TEST'):
+    """Señal como la arma el bot (entrada de save_signal)"""
+    return {
+        'symbol': f'{prefix}_{i}', 'signal': 'LONG' if i % 2 else 'SHORT',
+        'entry': 100.0 + i, 'tp': 102.0 + i, 'sl': 98.0 + i, 'confidence': 70.0, 'rr': 1.5,
+        'latest_indicators': {'rsi': 45.0, 'volume_ratio': 1.0 + i % 5},
+        'fix_version': prefix
+    }
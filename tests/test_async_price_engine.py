@@ -0,0 +1,163 @@
+# tests/test_async_price_engine.py - Motor asyncio contra un servidor HTTP local: orden, controles, deadline y cancelación
+import asyncio
+
+import pytest
+
+aiohttp = pytest.importorskip('aiohttp')
+from aiohttp import web
+
+from core.async_price_engine import AsyncPriceEngine
+
+SYMBOL = 'BTC/USDT:USDT'
+
+
+def _api(name, path, weight=1, timeout=1):
+    return {
+        'name': name, 'weight': weight, 'timeout': timeout, 'price_path': 'price',
+        'url_template': 'http://127.0.0.1:{port}/' + path + '/{{symbol}}',
+        'format_symbol': lambda s: s.replace('/USDT:USDT', 'USDT')
+    }
+
+
+APIS = {
+    'ok': _api('Ok', 'ok', weight=2),
+    'fail': _api('Fail', 'fail'),
+    'slow': _api('Slow', 'slow', timeout=0.2),
+    'hang': _api('Hang', 'hang', timeout=5),
+}
+
+
+class Recorder:
+    """Callbacks del motor que anotan lo que reciben"""
+
+    def __init__(self, allow=True):
+        self.allow = allow
+        self.admitted = []
+        self.released = []
+        self.responses = []
+        self.errors = []
+
+    def engine(self, apis, order, **kwargs):
+        return AsyncPriceEngine(
+            apis, api_order=lambda mexc_symbol: list(order),
+            admit=lambda api_id, weight: self.admitted.append((api_id, weight)) or self.allow,
+            release=self.released.append,
+            on_response=lambda api_id, response, latency, mexc_symbol: self.responses.append((api_id, response.status)),
+            on_error=lambda api_id, mexc_symbol, timed_out: self.errors.append((api_id, timed_out)),
+            **kwargs
+        )
+
+
+async def _ok(request):
+    assert request.match_info['symbol'] == 'BTCUSDT'  # format_symbol aplicado
+    return web.json_response({'price': '101.5'})
+
+
+async def _fail(request):
+    return web.json_response({'error': 'boom'}, status=500)
+
+
+async def _slow(request):
+    await asyncio.sleep(1)
+    return web.json_response({'price': '1'})
+
+
+def run_with_server(scenario):
+    """Levanta el servidor local, completa los url_template con su puerto y corre scenario(apis)"""
+    async def main():
+        app = web.Application()
+        app.router.add_get('/ok/{symbol}', _ok)
+        app.router.add_get('/fail/{symbol}', _fail)
+        app.router.add_get('/slow/{symbol}', _slow)
+        app.router.add_get('/hang/{symbol}', _slow)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        apis = {api_id: dict(config, url_template=config['url_template'].format(port=port))
+                for api_id, config in APIS.items()}
+        try:
+            return await scenario(apis)
+        finally:
+            await runner.cleanup()
+    return asyncio.run(main())
+
+
+async def _closing(engine, coro):
+    try:
+        return await coro
+    finally:
+        await engine.close()
+
+
+def test_order_comes_from_api_order_not_priority():
+    engine = AsyncPriceEngine(APIS, api_order=lambda mexc_symbol: ['ok', 'fail'])
+    assert engine._sorted_apis(SYMBOL) == ['ok', 'fail']
+    # La asignada solo se adelanta si api_order la dejó (breaker abierto, no listada...)
+    assert engine._sorted_apis(SYMBOL, 'fail') == ['fail', 'ok']
+    assert AsyncPriceEngine(APIS, api_order=lambda s: ['ok'])._sorted_apis(SYMBOL, 'fail') == ['ok']
+
+
+def test_fallback_follows_api_order_and_reports_responses():
+    recorder = Recorder()
+
+    async def scenario(apis):
+        engine = recorder.engine(apis, ['fail', 'ok'])
+        return await _closing(engine, engine.get_current_price(SYMBOL))
+
+    assert run_with_server(scenario) == (101.5, 'Ok')
+    assert recorder.admitted == [('fail', 1), ('ok', 2)]  # Con el peso de cada API, en orden
+    assert recorder.responses == [('fail', 500), ('ok', 200)]
+    assert recorder.errors == [] and recorder.released == []
+
+
+def test_timeout_and_connection_errors_reach_on_error():
+    recorder = Recorder()
+
+    async def scenario(apis):
+        apis['closed'] = dict(apis['ok'], url_template='http://127.0.0.1:9/{symbol}')
+        engine = recorder.engine(apis, ['slow', 'closed'])
+        return await _closing(engine, engine.get_current_price(SYMBOL))
+
+    price, _status = run_with_server(scenario)
+    assert price is None
+    assert recorder.errors == [('slow', True), ('closed', False)]
+    assert recorder.released == []  # Ya se informó el error: nada que devolver
+
+
+def test_deadline_cancels_and_releases_admitted_request():
+    recorder = Recorder()
+
+    async def scenario(apis):
+        engine = recorder.engine(apis, ['hang'])
+        return await _closing(engine, engine.get_current_prices([SYMBOL], deadline=0.2))
+
+    assert run_with_server(scenario) == {SYMBOL: None}
+    assert recorder.admitted == [('hang', 1)]
+    assert recorder.released == ['hang']  # Lugar en vuelo y prueba half-open devueltos
+    assert recorder.responses == [] and recorder.errors == []
+
+
+def test_snapshot_hit_skips_admit_and_request():
+    recorder = Recorder()
+
+    async def scenario(apis):
+        engine = recorder.engine(apis, ['ok'], snapshot_lookup=lambda api_id, mexc_symbol: (True, 42.0))
+        return await _closing(engine, engine.fetch_price('ok', SYMBOL))
+
+    assert run_with_server(scenario) == (42.0, 'Ok')
+    assert recorder.admitted == [] and recorder.responses == []
+
+
+def test_denied_admit_never_hits_the_network():
+    recorder = Recorder(allow=False)
+
+    async def scenario(apis):
+        engine = recorder.engine(apis, ['ok'])
+        result = await _closing(engine, engine.fetch_price('ok', SYMBOL))
+        return result, engine.request_count
+
+    (price, status), request_count = run_with_server(scenario)
+    assert price is None and 'rate limit' in status
+    assert request_count == 0 and recorder.responses == []
@@ -0,0 +1,78 @@
+# tests/test_bulk_ingest.py - save_signals_bulk / update_signal_results_bulk: resultado por fila y una transacción por lote
+import sqlite3
+import time
+
+from tests.conftest import make_signal
+
+
+def _count(db_path, where="1 = 1", params=()):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM signals WHERE {where}", params).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_bulk_save_reports_each_row(db, db_path):
+    signals = [make_signal(i, 'BULK') for i in range(50)]
+    results = db.save_signals_bulk(signals, verify=True)
+
+    assert [result['index'] for result in results] == list(range(50))
+    assert all(result['ok'] and result['verified'] and result['error'] is None for result in results)
+    ids = [result['id'] for result in results]
+    assert ids == list(range(ids[0], ids[0] + 50))
+    assert _count(db_path, "symbol LIKE 'BULK_%'") == 50
+
+
+def test_bulk_save_skips_invalid_rows(db, db_path):
+    signals = [make_signal(0, 'OK'), {'symbol': 'BAD', 'entry': 'abc'}, make_signal(2, 'OK')]
+    results = db.save_signals_bulk(signals)
+
+    assert [result['ok'] for result in results] == [True, False, True]
+    assert results[1]['id'] is None
+    assert 'Datos inválidos' in results[1]['error']
+    assert _count(db_path) == 2
+
+
+def test_bulk_save_defaults_and_corrections(db, db_path):
+    signal = make_signal(0, 'DEFAULTS')
+    signal['latest_indicators'] = {'volume_ratio': 0}
+    signal['leverage'] = 99
+    result = db.save_signals_bulk([signal])[0]
+
+    conn = sqlite3.connect(db_path)
+    volume_ratio, rsi, leverage = conn.execute(
+        "SELECT volume_ratio, rsi, leverage FROM signals WHERE id = ?", (result['id'],)
+    ).fetchone()
+    conn.close()
+    # La signals.db del repo declara algunas columnas como TEXT: comparar como número
+    assert (float(volume_ratio), float(rsi), int(leverage)) == (1.0, 50.0, 5)
+
+
+def test_bulk_update_reports_missing_ids(db, db_path):
+    ids = [result['id'] for result in db.save_signals_bulk([make_signal(i, 'UPD') for i in range(10)])]
+
+    results = db.update_signal_results_bulk({**{signal_id: 'TP1' for signal_id in ids}, -1: 'SL'})
+    assert sum(result['ok'] for result in results) == 10
+    assert results[-1] == {'id': -1, 'resultado': 'SL', 'ok': False, 'error': 'Señal no encontrada'}
+    assert _count(db_path, "resultado = 'TP1' AND fecha_actualizacion IS NOT NULL") == 10
+
+    # También acepta pares (id, resultado)
+    results = db.update_signal_results_bulk([(ids[0], 'SL')])
+    assert results[0]['ok']
+    assert _count(db_path, "resultado = 'SL'") == 1
+
+
+def test_bulk_save_is_faster_than_row_by_row(db, db_path):
+    count = 300
+    start = time.perf_counter()
+    assert all(db.save_signal(make_signal(i, 'SINGLE')) for i in range(count))
+    single_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = db.save_signals_bulk([make_signal(i, 'BULK') for i in range(count)], verify=True)
+    bulk_time = time.perf_counter() - start
+
+    assert all(result['ok'] for result in results)
+    assert _count(db_path) == 2 * count
+    assert bulk_time < single_time / 2
@@ -0,0 +1,33 @@
+# tests/test_circuit_breaker.py - La prueba half-open que no llega a salir no bloquea el exchange
+from core.circuit_breaker import HALF_OPEN, CircuitBreaker
+
+
+def _half_open_breaker():
+    breaker = CircuitBreaker('test', min_requests=1, open_timeout=0, probe_timeout=60)
+    breaker.record_failure()  # Abre; con open_timeout=0 la próxima consulta pasa a half-open
+    return breaker
+
+
+def test_probe_is_single_while_in_flight():
+    breaker = _half_open_breaker()
+    assert breaker.allow_request()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow_request()
+
+
+def test_released_probe_can_be_taken_again():
+    breaker = _half_open_breaker()
+    assert breaker.allow_request()
+    # El rate limiter rechazó la petición: la prueba se devuelve sin resultado
+    breaker.release_probe()
+    assert breaker.allow_request()
+    assert breaker.state == HALF_OPEN
+
+
+def test_probe_outcome_still_closes_breaker():
+    breaker = _half_open_breaker()
+    assert breaker.allow_request()
+    breaker.release_probe()
+    assert breaker.allow_request()
+    breaker.record_success(0.1)
+    assert breaker.get_stats()['state'] == 'closed'
@@ -0,0 +1,97 @@
+# tests/test_db_indexes.py - Las consultas calientes usan su índice (EXPLAIN QUERY PLAN) y la paginación no pierde filas
+import sqlite3
+
+import pytest
+
+from core import db_schema
+from core.db_indexes import SIGNAL_INDEXES, check_query_plans, plan_expectations
+from core.signal_pages import build_page_query, encode_cursor
+from tests.conftest import insert_signals
+
+QUERIES = [label for label, _query, _params, _index in plan_expectations()]
+
+
+def _plans(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return {result['query']: result for result in check_query_plans(conn)}
+    finally:
+        conn.close()
+
+
+def _managed_indexes(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return {row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx_signals_%'"
+        )}
+    finally:
+        conn.close()
+
+
+def test_migration_creates_managed_indexes(db, db_path):
+    assert _managed_indexes(db_path) == set(SIGNAL_INDEXES)
+
+
+def test_upgrade_from_v4_matches_fresh_migration(db_path, monkeypatch):
+    # Base que quedó en la versión 4 (publicada con idx_signals_status_recent)
+    monkeypatch.setattr(db_schema, 'MIGRATIONS', db_schema.MIGRATIONS[:4])
+    monkeypatch.setattr(db_schema, 'SCHEMA_VERSION', 4)
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    db_schema.migrate(conn)
+    assert 'idx_signals_status_recent' in _managed_indexes(db_path)
+
+    monkeypatch.undo()
+    assert db_schema.migrate(conn) == [5]
+    conn.close()
+    assert _managed_indexes(db_path) == set(SIGNAL_INDEXES)
+
+
+@pytest.mark.parametrize('label', QUERIES)
+def test_plan_uses_index_on_shipped_db(db, db_path, label):
+    # La base del repo está vacía: sin sqlite_stat1 el plan depende solo de los índices
+    result = _plans(db_path)[label]
+    assert result['ok'], f"{label}: se esperaba {result['index']}, plan: {result['plan']}"
+
+
+@pytest.mark.parametrize('label', QUERIES)
+def test_plan_uses_index_with_statistics(db, db_path, label):
+    rows = [
+        (f'SYM{i % 50}', 'LONG' if i % 2 else 'SHORT', 'active' if i % 20 == 0 else 'closed',
+         f'2024-01-{1 + i % 28:02d} {i % 24:02d}:{i % 60:02d}:00')
+        for i in range(5000)
+    ]
+    insert_signals(db_path, rows)
+    conn = sqlite3.connect(db_path)
+    conn.execute("ANALYZE signals")
+    conn.commit()
+    conn.close()
+
+    result = _plans(db_path)[label]
+    assert result['ok'], f"{label}: se esperaba {result['index']}, plan: {result['plan']}"
+
+
+@pytest.mark.parametrize('status, expected', [('active', 30), ('closed', 45), ('all', 75)])
+def test_keyset_pages_return_every_row_once(db, db_path, status, expected):
+    # Varias filas con el mismo created_at: el desempate por id no puede saltear ni repetir
+    rows = [(f'SYM{i}', 'LONG', 'active' if i % 5 < 2 else 'closed', f'2024-01-01 00:00:{i // 3:02d}')
+            for i in range(75)]
+    insert_signals(db_path, rows)
+
+    conn = sqlite3.connect(db_path)
+    seen = []
+    cursor = None
+    pages = 0
+    while True:
+        query, params = build_page_query(['id', 'created_at'], {'status': status}, cursor, 7)
+        page = conn.execute(query, params).fetchall()
+        pages += 1
+        seen += [row[0] for row in page[:7]]
+        if len(page) <= 7:
+            break
+        cursor = encode_cursor(page[6][1], page[6][0])
+    conn.close()
+
+    assert len(seen) == expected
+    assert len(set(seen)) == expected
+    assert pages == expected // 7 + 1
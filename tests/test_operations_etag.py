@@ -0,0 +1,71 @@
+# tests/test_operations_etag.py - Un 304 no publica precios (ni DB ni exchanges); solo el fallo de caché lo hace
+import time
+
+import pytest
+
+import app as api
+
+
+@pytest.fixture
+def client(monkeypatch):
+    synced = []
+    monkeypatch.setattr(api, 'sync_quote_table', lambda: synced.append(True))
+    monkeypatch.setattr(api, 'get_active_signals', lambda: [])
+    monkeypatch.setattr(api.QUOTE_REFRESHER, 'is_running', lambda: False)
+    monkeypatch.setattr(api, 'CACHE_TTL', 3600)  # Ventana de precios fija salvo que la prueba la acorte
+    return api.app.test_client(), synced
+
+
+@pytest.mark.parametrize('path', ['/api/operations', '/api/statistics'])
+def test_not_modified_skips_quote_sync(client, path):
+    test_client, synced = client
+    first = test_client.get(path)
+    assert first.status_code == 200
+    assert len(synced) == 1
+
+    cached = test_client.get(path, headers={'If-None-Match': first.headers['ETag']})
+    assert cached.status_code == 304
+    assert len(synced) == 1  # El ETag sale de la versión publicada, sin sync previo
+
+
+def test_etag_follows_published_quote_seq(client):
+    test_client, synced = client
+    etag = test_client.get('/api/operations').headers['ETag']
+    api.QUOTE_TABLE.update_many({'ETAGTEST': float(len(synced))})  # Un precio nuevo avanza el seq
+
+    changed = test_client.get('/api/operations', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+
+
+@pytest.mark.parametrize('path', ['/api/operations', '/api/statistics'])
+def test_revalidation_gets_new_prices_after_cache_ttl(client, monkeypatch, path):
+    test_client, synced = client
+    monkeypatch.setattr(api, 'CACHE_TTL', 0.05)
+    # Sin commits en la DB: solo los precios se mueven (los publica el sync del fallo de caché)
+    monkeypatch.setattr(api, 'sync_quote_table',
+                        lambda: synced.append(True) or api.QUOTE_TABLE.update_many({'ETAGTEST': 1.0 + len(synced)}))
+
+    etag = test_client.get(path).headers['ETag']
+    time.sleep(0.1)
+
+    refreshed = test_client.get(path, headers={'If-None-Match': etag})
+    assert refreshed.status_code == 200
+    assert refreshed.headers['ETag'] != etag
+    assert len(synced) == 2
+
+
+@pytest.mark.parametrize('path', ['/api/statistics', '/api/operations?status=closed', '/api/operations?status=all'])
+def test_closed_signal_commits_invalidate_etag(client, monkeypatch, path):
+    test_client, _synced = client
+    commits = [0]
+    monkeypatch.setattr(api.SIGNAL_VERSIONS, 'commit_mark', lambda: commits[0])
+    monkeypatch.setattr(api, 'load_signal_page', lambda filters, page_cursor, limit: ([], None))
+
+    etag = test_client.get(path).headers['ETag']
+    assert test_client.get(path, headers={'If-None-Match': etag}).status_code == 304
+
+    commits[0] += 1  # p. ej. se re-calificó el resultado de una señal cerrada (la versión no se mueve)
+    changed = test_client.get(path, headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
@@ -0,0 +1,81 @@
+# tests/test_quote_refresher.py - watch() no multiplica la carga upstream: solo símbolos nuevos, caché negativa y wakeups acotados
+import time
+
+from core.quote_refresher import QuoteRefresher, QuoteTable
+from tests.conftest import insert_signals
+
+
+class FakeExchange:
+    """fetch_prices que registra cada llamada; 'DEAD' no tiene precio"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, symbols):
+        self.calls.append(list(symbols))
+        return {symbol: (None if symbol == 'DEAD' else 1.5) for symbol in symbols}
+
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def _refresher(db_path, exchange, **kwargs):
+    refresher = QuoteRefresher(db_path, exchange, QuoteTable(), interval=30, **kwargs)
+    refresher.start()
+    assert _wait_for(lambda: refresher.refresh_count == 1)
+    return refresher
+
+
+def test_watch_fetches_only_new_symbols(db, db_path):
+    insert_signals(db_path, [('BTC', 'LONG', 'active', '2024-01-01 00:00:00'),
+                             ('ETH', 'LONG', 'active', '2024-01-01 00:00:01')])
+    exchange = FakeExchange()
+    refresher = _refresher(db_path, exchange)
+    try:
+        assert exchange.calls == [['BTC', 'ETH']]
+
+        refresher.watch(['BTC', 'SOL'])  # BTC ya está en el ciclo normal
+        assert _wait_for(lambda: len(exchange.calls) == 2)
+        assert exchange.calls[1] == ['SOL']
+        assert refresher.quote_table.get('SOL')[0] == 1.5
+    finally:
+        refresher.stop()
+
+
+def test_unresolved_symbols_are_negative_cached(db, db_path):
+    exchange = FakeExchange()
+    refresher = _refresher(db_path, exchange, min_wakeup_interval=0)  # Sin señales activas: el ciclo no pide nada
+    try:
+        refresher.watch(['DEAD'])
+        assert _wait_for(lambda: len(exchange.calls) == 1)
+
+        # Cada poll del dashboard vuelve a pedir DEAD: no debe llegar al exchange
+        for _ in range(20):
+            refresher.watch(['DEAD'])
+        time.sleep(0.2)
+        assert len(exchange.calls) == 1
+        assert refresher.get_stats()['unresolved'] == 1
+    finally:
+        refresher.stop()
+
+
+def test_forced_wakeups_are_rate_limited(db, db_path):
+    exchange = FakeExchange()
+    refresher = _refresher(db_path, exchange, min_wakeup_interval=30)
+    try:
+        refresher.watch(['AAA'])
+        assert _wait_for(lambda: len(exchange.calls) == 1)
+
+        # Ya hubo un ciclo forzado en este intervalo: BBB espera al ciclo normal
+        refresher.watch(['BBB'])
+        time.sleep(0.2)
+        assert len(exchange.calls) == 1
+        assert refresher.forced_count == 1
+    finally:
+        refresher.stop()
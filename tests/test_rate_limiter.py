@@ -0,0 +1,101 @@
+# tests/test_rate_limiter.py - Los headers de uso del servidor solo aprietan el bucket
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from core.rate_limiter import RateLimiter
+
+
+def _response(headers, status_code=200):
+    return SimpleNamespace(status_code=status_code, headers=headers)
+
+
+@pytest.fixture(params=['memory', 'shared'])
+def limiter(request, tmp_path):
+    shared_path = str(tmp_path / 'buckets.db') if request.param == 'shared' else None
+    limiter = RateLimiter(safety=1.0, shared_path=shared_path)
+    for api_id in ('binance_futures', 'bybit_futures', 'gate_futures'):
+        limiter.register(api_id, 600)
+    return limiter
+
+
+def test_low_server_usage_does_not_refill_bucket(limiter):
+    for _ in range(500):
+        assert limiter.try_acquire('binance_futures')
+    before = limiter.available('binance_futures')
+
+    # El servidor dice 10/2400 usado: antes esto rellenaba el bucket casi entero
+    limiter.update_from_response('binance_futures', _response({'X-MBX-USED-WEIGHT-1M': '10'}))
+    assert limiter.available('binance_futures') == pytest.approx(before, abs=1)
+
+
+def test_high_server_usage_tightens_bucket(limiter):
+    assert limiter.try_acquire('binance_futures')
+    # 1800/2400 usado por otros clientes de la misma IP: queda 1/4 de la capacidad
+    limiter.update_from_response('binance_futures', _response({'X-MBX-USED-WEIGHT-1M': '1800'}))
+    assert limiter.available('binance_futures') == pytest.approx(150, abs=1)
+
+
+def test_in_flight_requests_are_discounted(limiter):
+    for _ in range(41):
+        assert limiter.try_acquire('binance_futures')
+    # Responde la primera; las otras 40 ya salieron y el servidor no las contó
+    limiter.update_from_response('binance_futures', _response({'X-MBX-USED-WEIGHT-1M': '1800'}))
+    assert limiter.available('binance_futures') == pytest.approx(150 - 40 * 600 / 2400, abs=1)
+
+
+def test_bybit_endpoint_window_is_ignored(limiter):
+    for _ in range(500):
+        assert limiter.try_acquire('bybit_futures')
+    before = limiter.available('bybit_futures')
+    limiter.update_from_response('bybit_futures', _response({'X-Bapi-Limit-Status': '9', 'X-Bapi-Limit': '10'}))
+    assert limiter.available('bybit_futures') == pytest.approx(before, abs=1)
+
+
+def test_short_window_only_blocks_when_exhausted(limiter):
+    for _ in range(500):
+        assert limiter.try_acquire('gate_futures')
+        limiter.update_from_response('gate_futures', _response({}))  # Respondidas: nada en vuelo
+    before = limiter.available('gate_futures')
+
+    full = {'X-Gate-RateLimit-Requests-Remain': '199', 'X-Gate-RateLimit-Limit': '200'}
+    limiter.update_from_response('gate_futures', _response(full))
+    assert limiter.available('gate_futures') == pytest.approx(before, abs=1)
+
+    exhausted = {'X-Gate-RateLimit-Requests-Remain': '0', 'X-Gate-RateLimit-Limit': '200'}
+    limiter.update_from_response('gate_futures', _response(exhausted))
+    assert limiter.available('gate_futures') == 0
+    assert not limiter.try_acquire('gate_futures')
+
+
+def test_released_requests_stop_counting_in_flight(limiter):
+    for _ in range(41):
+        assert limiter.try_acquire('binance_futures')
+    for _ in range(40):
+        limiter.release('binance_futures')  # Canceladas por el deadline: nunca llegaron al servidor
+    limiter.update_from_response('binance_futures', _response({'X-MBX-USED-WEIGHT-1M': '1800'}))
+    assert limiter.available('binance_futures') == pytest.approx(150, abs=1)
+
+
+def test_short_window_block_keeps_minute_budget(limiter):
+    for _ in range(100):
+        assert limiter.try_acquire('gate_futures')
+        limiter.update_from_response('gate_futures', _response({}))
+    before = limiter.available('gate_futures')
+
+    # Ventana de 10s agotada: frena hasta el Retry-After sin vaciar el bucket por minuto
+    exhausted = {'X-Gate-RateLimit-Requests-Remain': '0', 'X-Gate-RateLimit-Limit': '200', 'Retry-After': '0.2'}
+    limiter.update_from_response('gate_futures', _response(exhausted))
+    assert not limiter.try_acquire('gate_futures')
+
+    time.sleep(0.3)
+    assert limiter.available('gate_futures') >= before
+    assert limiter.try_acquire('gate_futures')
+
+
+def test_rate_limited_status_drains_bucket(limiter):
+    assert limiter.try_acquire('binance_futures')
+    limiter.update_from_response('binance_futures', _response({'Retry-After': '0.2'}, status_code=429))
+    time.sleep(0.3)
+    assert limiter.available('binance_futures') < 10  # Un 429 sí vacía: se rellena desde cero
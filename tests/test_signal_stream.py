@@ -0,0 +1,45 @@
+# tests/test_signal_stream.py - Ids de evento con época: reanudar solo dentro del mismo arranque
+import re
+
+from core.signal_stream import StreamHub
+
+SIGNALS = [{'id': 1, 'symbol': 'BTC', 'status': 'active'}]
+
+
+def _hub(epoch=None):
+    hub = StreamHub(lambda: [dict(signal) for signal in SIGNALS], lambda symbols: {'BTC': 100.0},
+                    lambda signals, prices: signals, heartbeat=1, epoch=epoch)
+    hub._tick(None)  # Estado inicial sin hilo productor
+    with hub._cond:
+        hub._publish('prices', {'BTC': 101.0})
+        hub._publish('prices', {'BTC': 102.0})
+    return hub
+
+
+def _first_frame(hub, last_event_id):
+    stream = hub.subscribe(last_event_id)
+    try:
+        return next(stream).decode()
+    finally:
+        stream.close()
+
+
+def test_resume_within_same_epoch_sends_only_newer_events():
+    hub = _hub()
+    frame = _first_frame(hub, f"{hub.epoch}-1")
+    assert 'event: snapshot' not in frame
+    assert re.findall(r'^id: (.+)$', frame, re.M) == [f"{hub.epoch}-2"]
+
+
+def test_event_id_from_previous_boot_gets_snapshot():
+    old = _hub(epoch='a1')
+    restarted = _hub(epoch='b2')  # Mismo seq, otro arranque
+    frame = _first_frame(restarted, f"{old.epoch}-1")
+    assert 'event: snapshot' in frame
+    assert f"id: {restarted.epoch}-2" in frame
+
+
+def test_bare_or_invalid_ids_get_snapshot():
+    hub = _hub()
+    for raw in ('1', 'garbage', f"{hub.epoch}-x", f"{hub.epoch}-99", None):
+        assert 'event: snapshot' in _first_frame(hub, raw)
@@ -0,0 +1,35 @@
+# tests/test_signal_versions.py - Versión de señales activas + precios y marca de commits sobre señales cerradas
+import sqlite3
+
+from core.quote_refresher import QuoteTable
+from core.signal_versions import SignalVersionTracker
+from tests.conftest import insert_signals
+
+
+def _active_loader(db_path):
+    def load():
+        conn = sqlite3.connect(db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            return [dict(row) for row in conn.execute(
+                "SELECT id, symbol, status FROM signals WHERE status = 'active'"
+            )]
+        finally:
+            conn.close()
+    return load
+
+
+def test_closed_only_commits_move_commit_mark_not_version(db_path):
+    tracker = SignalVersionTracker(db_path, _active_loader(db_path), QuoteTable())
+    version = tracker.current()
+    mark = tracker.commit_mark()
+
+    insert_signals(db_path, [('OLD', 'LONG', 'closed', '2024-01-01 00:00:00')])
+    assert tracker.current() == version  # Ninguna señal activa cambió
+    assert tracker.commit_mark() > mark
+
+    mark = tracker.commit_mark()
+    insert_signals(db_path, [('NEW', 'LONG', 'active', '2024-01-02 00:00:00')])
+    assert tracker.current() > version
+    assert tracker.commit_mark() > mark
+
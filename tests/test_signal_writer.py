@@ -0,0 +1,124 @@
+# tests/test_signal_writer.py - Escritor único: group commit, orden, flush/close y modo write-behind
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import database_manager_REPAIRED as manager
+from core.signal_writer import SignalWriter, SignalWriterClosed
+from tests.conftest import make_signal
+
+
+def _count(db_path, where="1 = 1"):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM signals WHERE {where}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_concurrent_submits_are_group_committed(db, db_path):
+    writer = SignalWriter(db.save_signals_bulk, db.update_signal_results_bulk)
+    chunks = [[make_signal(thread * 100 + i, 'WRITER') for i in range(100)] for thread in range(8)]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [future for chunk_futures in executor.map(
+            lambda chunk: [writer.submit_signal(signal) for signal in chunk], chunks
+        ) for future in chunk_futures]
+    assert writer.close()
+
+    results = [future.result(timeout=5) for future in futures]
+    assert all(result['ok'] for result in results)
+    assert len({result['id'] for result in results}) == 800
+    assert _count(db_path, "symbol LIKE 'WRITER_%'") == 800
+
+    stats = writer.get_stats()
+    assert stats['written'] == 800
+    assert stats['batches'] < 800 / 10  # Lotes, no una transacción por señal
+
+
+def test_update_after_insert_keeps_queue_order(db, db_path):
+    # Ventana larga: el INSERT y el UPDATE caen en el mismo lote
+    writer = SignalWriter(db.save_signals_bulk, db.update_signal_results_bulk, max_delay=0.2)
+    saved = writer.submit_signal(make_signal(0, 'ORDER'))
+    # El id se conoce recién al escribir: el UPDATE usa el siguiente id libre
+    conn = sqlite3.connect(db_path)
+    next_id = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM signals").fetchone()[0]
+    conn.close()
+    updated = writer.submit_result(next_id, 'TP1')
+    assert writer.flush(timeout=5)
+
+    assert saved.result()['id'] == next_id
+    assert updated.result()['ok']
+    assert _count(db_path, "resultado = 'TP1'") == 1
+    assert writer.get_stats()['batches'] == 1
+    writer.close()
+
+
+def test_close_drains_queue_and_rejects_new_writes(db, db_path):
+    writer = SignalWriter(db.save_signals_bulk, db.update_signal_results_bulk, max_delay=0.5)
+    futures = [writer.submit_signal(make_signal(i, 'DRAIN')) for i in range(50)]
+    assert writer.close(timeout=5)
+
+    assert all(future.done() and future.result()['ok'] for future in futures)
+    assert _count(db_path) == 50
+    with pytest.raises(SignalWriterClosed):
+        writer.submit_signal(make_signal(99, 'LATE'))
+
+
+def test_failed_batch_resolves_every_future():
+    def broken_save(signals):
+        raise sqlite3.OperationalError("database is locked")
+
+    writer = SignalWriter(broken_save, broken_save)
+    futures = [writer.submit_signal({}) for _ in range(3)]
+    writer.close()
+
+    for future in futures:
+        result = future.result(timeout=5)
+        assert not result['ok'] and 'locked' in result['error']
+    assert writer.get_stats()['failed'] == 3
+
+
+def test_writer_is_faster_than_concurrent_direct_writes(db, db_path):
+    signals = [make_signal(i, 'SPEED') for i in range(800)]
+    chunks = [signals[i::8] for i in range(8)]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        direct_ok = sum(executor.map(lambda chunk: sum(db.save_signal(signal) for signal in chunk), chunks))
+    direct_time = time.perf_counter() - start
+
+    writer = SignalWriter(db.save_signals_bulk, db.update_signal_results_bulk)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        for chunk in chunks:
+            executor.submit(lambda chunk=chunk: [writer.submit_signal(signal) for signal in chunk])
+    assert writer.close()
+    writer_time = time.perf_counter() - start
+
+    assert direct_ok == 800
+    assert writer.get_stats()['written'] == 800
+    assert _count(db_path) == 1600
+    assert writer_time < direct_time
+
+
+def test_write_behind_mode_keeps_compat_functions(db, db_path, monkeypatch):
+    synced = threading.Event()
+    monkeypatch.setattr(manager, '_db_manager', db)
+    monkeypatch.setattr(manager, '_signal_writer', None)
+    monkeypatch.setattr(manager, 'WRITE_BEHIND_ENABLED', True)
+    monkeypatch.setattr(manager, 'sync_db_to_github', synced.set)  # Nada de git push en las pruebas
+
+    assert manager.save_signal_to_db(make_signal(0, 'COMPAT')) is True
+    future = manager.submit_signal_to_db(make_signal(1, 'COMPAT'))
+    signal_id = future.result(timeout=5)['id']
+    assert manager.update_signal_result(signal_id, 'SL') is True
+    assert manager.flush_signal_writes(timeout=5)
+
+    assert _count(db_path, "symbol LIKE 'COMPAT_%'") == 2
+    assert _count(db_path, "resultado = 'SL'") == 1
+    assert synced.is_set()  # Un sync a GitHub por lote de señales nuevas
+    assert manager._signal_writer.close()